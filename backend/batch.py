@@ -0,0 +1,68 @@
+"""
+Precompute roadmaps offline so the online path can serve them from the store.
+
+    python batch.py transitions.jsonl --concurrency 8 --rpm 120
+
+Each input line is a CareerFormData JSON object. Results go to the store at
+PRECOMPUTED_ROADMAPS_PATH; re-running after a crash resumes where it stopped.
+"""
+import argparse
+import asyncio
+import json
+import logging
+from typing import List
+
+from dotenv import load_dotenv
+
+from models import CareerFormData
+from services.job_scraper import JobScraper
+from services.roadmap_batch import BatchRunner
+from services.roadmap_generator import RoadmapGenerator
+
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_forms(path: str) -> List[CareerFormData]:
+    with open(path, encoding="utf-8") as f:
+        return [CareerFormData.model_validate_json(line) for line in f if line.strip()]
+
+
+async def report_progress(runner: BatchRunner, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        logger.info(f"Progress: {runner.report()}")
+
+
+async def run(args: argparse.Namespace) -> None:
+    forms = load_forms(args.input)
+    job_scraper = JobScraper()
+    await job_scraper.warm_up()
+    # Same skill-gap prompts as the API, so precomputed roadmaps match live ones
+    generator = RoadmapGenerator(target_skills=job_scraper.in_demand_skills)
+    runner = BatchRunner(generator, generator.precomputed, args.concurrency, args.rpm)
+
+    progress = asyncio.create_task(report_progress(runner, args.progress_interval))
+    try:
+        report = await runner.run(forms)
+    finally:
+        progress.cancel()
+        await generator.client.aclose()
+        await job_scraper.aclose()
+
+    print(json.dumps(report, indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file of CareerFormData objects")
+    parser.add_argument("--concurrency", type=int, default=None, help="parallel LLM calls (BATCH_CONCURRENCY)")
+    parser.add_argument("--rpm", type=float, default=None, help="max requests per minute (BATCH_REQUESTS_PER_MINUTE)")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="seconds between progress logs")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Helpers shared by the benchmark scripts: launching the stub and the backend
+as subprocesses and summarising latency samples.
+"""
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_FORM = {
+    "currentRole": "Software Engineer",
+    "currentSkills": "Python, JavaScript, SQL",
+    "dreamJob": "Data Scientist",
+    "experience": "3-5 years",
+    "timeline": "6 months",
+}
+
+
+def wait_until_up(url: str, timeout: float = 20.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Server at {url} did not come up within {timeout}s")
+
+
+@contextmanager
+def run_stub(port: int, latency: float, model_latency: str = "", chunk_chars: int = 0) -> Iterator[str]:
+    """
+    Start the stub OpenAI server and yield its base URL
+    """
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "benchmarks", "stub_openai.py"),
+         "--port", str(port), "--latency", str(latency), "--model-latency", model_latency,
+         "--chunk-chars", str(chunk_chars)],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        wait_until_up(f"http://127.0.0.1:{port}/docs")
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+@contextmanager
+def run_backend(port: int, openai_base_url: str, extra_env: Optional[Dict[str, str]] = None,
+                extra_args: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Start the FastAPI backend with uvicorn and yield its base URL
+    """
+    env = dict(os.environ, OPENAI_BASE_URL=openai_base_url, OPENAI_API_KEY="stub")
+    env.update(extra_env or {})
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"]
+        + (extra_args or []),
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        wait_until_up(f"http://127.0.0.1:{port}/health")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Latency summary in milliseconds
+    """
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
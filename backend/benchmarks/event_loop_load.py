@@ -0,0 +1,74 @@
+"""
+Load test: keep many roadmap generations in flight against a slow stub LLM and
+check that /health and /job-insights stay fast while they are pending.
+
+    python benchmarks/event_loop_load.py --roadmaps 50 --latency 3
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from common import SAMPLE_FORM, run_backend, run_stub, summarize
+
+
+async def probe(client: httpx.AsyncClient, path: str, stop: asyncio.Event, interval: float) -> list:
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def run(base_url: str, roadmaps: int, interval: float) -> dict:
+    limits = httpx.Limits(max_connections=roadmaps + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as client:
+        stop = asyncio.Event()
+        probes = [
+            asyncio.create_task(probe(client, "/health", stop, interval)),
+            asyncio.create_task(probe(client, "/job-insights/data%20scientist", stop, interval)),
+        ]
+
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/generate-roadmap", json=dict(SAMPLE_FORM, additionalInfo=f"request {i}"))
+            for i in range(roadmaps)
+        ])
+        roadmap_elapsed = time.perf_counter() - start
+
+        stop.set()
+        health_samples, insights_samples = await asyncio.gather(*probes)
+
+    return {
+        "roadmaps": roadmaps,
+        "roadmap_errors": sum(1 for r in responses if r.status_code != 200),
+        "roadmap_wall_time_s": round(roadmap_elapsed, 2),
+        "health_latency": summarize(health_samples),
+        "job_insights_latency": summarize(insights_samples),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--roadmaps", type=int, default=50, help="concurrent /generate-roadmap requests")
+    parser.add_argument("--latency", type=float, default=3.0, help="stub completion latency in seconds")
+    parser.add_argument("--interval", type=float, default=0.05, help="probe interval in seconds")
+    parser.add_argument("--stub-port", type=int, default=8100)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    with run_stub(args.stub_port, args.latency) as stub_url:
+        env = {"LLM_MAX_CONCURRENCY": str(args.roadmaps), "LLM_MAX_CONNECTIONS": str(args.roadmaps)}
+        with run_backend(args.port, stub_url, extra_env=env) as base_url:
+            result = asyncio.run(run(base_url, args.roadmaps, args.interval))
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
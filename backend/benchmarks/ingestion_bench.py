@@ -0,0 +1,122 @@
+"""
+Benchmark the job-postings ingestion pipeline against a local fixture job board.
+
+Serves benchmarks/fixtures/job_board.html from two local hosts (127.0.0.1 and
+localhost), with a robots.txt that disallows one page, and reports pages/sec
+and parse time per page.
+
+    python benchmarks/ingestion_bench.py --pages 40 --host-rps 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.job_ingestion import IngestionPipeline, JobSource, PostingStore  # noqa: E402
+from services.role_index import RoleIndex  # noqa: E402
+
+FIXTURE = os.path.join(BACKEND_DIR, "benchmarks", "fixtures", "job_board.html")
+ROBOTS = "User-agent: *\nDisallow: /search?q=blocked\n"
+SELECTORS = {
+    "posting": "article.job-card",
+    "title": ".job-title",
+    "link": ".job-title a",
+    "company": ".company",
+    "location": ".location",
+    "salary": ".salary",
+    "posted_date": ".posted",
+    "requirements": ".requirements li",
+    "description": ".summary",
+}
+ROLES = ["software engineer", "data scientist", "product manager", "ux designer", "devops engineer", "cybersecurity analyst"]
+
+
+def serve_fixtures(port: int, page_size_multiplier: int) -> ThreadingHTTPServer:
+    with open(FIXTURE, encoding="utf-8") as f:
+        template = f.read()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path == "/robots.txt":
+                body = ROBOTS
+            else:
+                query = parse_qs(parts.query)
+                page = query.get("page", ["1"])[0]
+                location = query.get("l", ["Remote"])[0]
+                # Repeat the result block so pages have realistic size; company names keep each page's postings unique
+                body = "".join(
+                    template.replace("{page}", f"{page}-{copy}")
+                    .replace("{location}", location)
+                    .replace('class="company">', f'class="company">Branch {page}-{copy} of ')
+                    for copy in range(page_size_multiplier)
+                )
+            encoded = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run(args: argparse.Namespace) -> dict:
+    sources = [
+        JobSource(
+            name=f"fixture-{host}",
+            url=f"http://{host}:{args.port}/search?q={{query}}&l={{location}}&page={{page}}",
+            selectors=SELECTORS,
+            pages=args.pages // 2,
+            industry="technology",
+        )
+        for host in ("127.0.0.1", "localhost")
+    ]
+    sources.append(JobSource("fixture-blocked", f"http://127.0.0.1:{args.port}/search?q=blocked&page={{page}}", SELECTORS))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PostingStore(os.path.join(tmp, "postings.db"))
+        pipeline = IngestionPipeline(sources, store, RoleIndex(ROLES), headers={"User-Agent": "PathPilotBench"})
+        try:
+            report = await pipeline.run("data scientist", "Remote")
+            rerun = await pipeline.run("data scientist", "Remote")
+        finally:
+            await pipeline.aclose()
+        report["storedPostings"] = len(store)
+        report["rerunDuplicates"] = rerun["duplicates"]
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40, help="total pages across both hosts")
+    parser.add_argument("--page-size", type=int, default=5, help="copies of the fixture result block per page")
+    parser.add_argument("--host-rps", type=float, default=50.0, help="per-host request rate limit")
+    parser.add_argument("--workers", type=int, default=2, help="parser worker processes")
+    parser.add_argument("--port", type=int, default=8200)
+    args = parser.parse_args()
+
+    os.environ["INGEST_HOST_RPS"] = str(args.host_rps)
+    os.environ["INGEST_PARSE_WORKERS"] = str(args.workers)
+    server = serve_fixtures(args.port, args.page_size)
+    try:
+        print(json.dumps(asyncio.run(run(args)), indent=2))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+"""
+Load and latency suite for the backend, for comparing service changes run to run.
+
+Starts the stub OpenAI server (configurable completion latency and streamed
+chunk size) and the backend with fresh caches, then runs each scenario:
+
+  rps=N          open loop, N requests/second for --duration seconds; latency is
+                 measured from each request's scheduled start, so a stalled
+                 server is not hidden by the load generator slowing down
+  concurrency=N  closed loop, N clients each sending back to back
+
+Every scenario drives the same endpoint mix (--mix): distinct roadmaps (cache
+misses unless --repeat-roadmaps), job insights and trending skills, plus
+optionally streamed roadmaps (latency to the first step). Per endpoint it
+reports p50/p95/p99, throughput and errors; event-loop lag comes from the
+backend's own lag monitor in /metrics, next to a /health probe measured from
+outside.
+
+Results are written as JSON. With --baseline, p95 latency and throughput are
+compared against an earlier results file and the script exits 1 when any
+endpoint regressed by more than --tolerance.
+
+    python benchmarks/load_suite.py --scenarios rps=20 rps=50 concurrency=16 --duration 20 \\
+        --latency 1.0 --output results.json --baseline previous.json
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from common import BACKEND_DIR, SAMPLE_FORM, run_backend, run_stub, summarize
+
+JOB_TITLES = ["data scientist", "software engineer", "product manager", "ux designer", "devops engineer", "plumber"]
+INDUSTRIES = ["technology", "healthcare", "finance", "education", "retail"]
+ENDPOINTS = ("roadmap", "roadmapStream", "jobInsights", "trendingSkills")
+
+_SAMPLE = re.compile(r'^(?P<name>[a-z_]+)(?:\{(?P<labels>[^}]*)\})? (?P<value>\S+)$')
+
+
+class Workload:
+    """
+    Endpoint mix and request payloads; request n of a run is the same every time
+    """
+
+    def __init__(self, mix: Dict[str, float], repeat_roadmaps: int, run_id: str):
+        self.mix = mix
+        self.repeat_roadmaps = repeat_roadmaps
+        self.run_id = run_id
+        # Smooth weighted round-robin: a fixed, evenly interleaved cycle of endpoints
+        weights = {endpoint: max(1, int(round(weight * 20))) for endpoint, weight in mix.items()}
+        total = sum(weights.values())
+        current = dict.fromkeys(weights, 0)
+        self.slots: List[str] = []
+        for _ in range(total):
+            for endpoint, weight in weights.items():
+                current[endpoint] += weight
+            chosen = max(current, key=current.get)
+            current[chosen] -= total
+            self.slots.append(chosen)
+
+    def request(self, n: int) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+        endpoint = self.slots[n % len(self.slots)]
+        if endpoint in ("roadmap", "roadmapStream"):
+            variant = n % self.repeat_roadmaps if self.repeat_roadmaps else n
+            form = dict(SAMPLE_FORM, additionalInfo=f"load {self.run_id} {variant}")
+            path = "/generate-roadmap/stream" if endpoint == "roadmapStream" else "/generate-roadmap"
+            return endpoint, "POST", path, form
+        if endpoint == "jobInsights":
+            return endpoint, "GET", f"/job-insights/{JOB_TITLES[n % len(JOB_TITLES)]}", None
+        return endpoint, "GET", f"/trending-skills/{INDUSTRIES[n % len(INDUSTRIES)]}", None
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, endpoint: str, status: int, seconds: float) -> None:
+        self.statuses[endpoint][status] += 1
+        if status == 200:
+            self.samples[endpoint].append(seconds)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints = {}
+        for endpoint, statuses in self.statuses.items():
+            total = sum(statuses.values())
+            endpoints[endpoint] = {
+                "requests": total,
+                "errors": total - statuses[200],
+                "statusCodes": {str(code): count for code, count in sorted(statuses.items())},
+                "throughputRps": round(statuses[200] / elapsed, 2),
+                "latency": summarize(self.samples[endpoint]),
+            }
+        return endpoints
+
+
+async def send(client: httpx.AsyncClient, workload: Workload, recorder: Recorder, n: int, started: float) -> None:
+    endpoint, method, path, body = workload.request(n)
+    try:
+        if endpoint == "roadmapStream":
+            # Time to the first roadmap step, then drain the rest of the stream
+            status, first_step = 0, None
+            async with client.stream(method, path, json=body) as response:
+                status = response.status_code
+                async for line in response.aiter_lines():
+                    if first_step is None and '"type": "step"' in line:
+                        first_step = time.perf_counter()
+            recorder.record(endpoint, status if first_step else 599, (first_step or time.perf_counter()) - started)
+        else:
+            response = await client.request(method, path, json=body)
+            recorder.record(endpoint, response.status_code, time.perf_counter() - started)
+    except httpx.HTTPError:
+        recorder.record(endpoint, 599, time.perf_counter() - started)
+
+
+async def open_loop(client: httpx.AsyncClient, workload: Workload, rps: float, duration: float) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    interval = 1.0 / rps
+    tasks = []
+    start = time.perf_counter()
+    for n in range(int(rps * duration)):
+        scheduled = start + n * interval
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(client, workload, recorder, n, scheduled)))
+    await asyncio.gather(*tasks)
+    return recorder, time.perf_counter() - start
+
+
+async def closed_loop(client: httpx.AsyncClient, workload: Workload, concurrency: int, duration: float) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    counter = itertools.count()
+    deadline = time.perf_counter() + duration
+
+    async def client_loop() -> None:
+        while time.perf_counter() < deadline:
+            await send(client, workload, recorder, next(counter), time.perf_counter())
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client_loop() for _ in range(concurrency)])
+    return recorder, time.perf_counter() - start
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> List[float]:
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            await client.get("/health")
+            samples.append(time.perf_counter() - start)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+    return samples
+
+
+async def scrape_loop_lag(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """
+    The backend's event_loop_lag_seconds histogram: buckets, sum and count
+    """
+    text = (await client.get("/metrics")).text
+    lag: Dict[str, Any] = {"buckets": {}, "sum": 0.0, "count": 0}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match is None or not match["name"].startswith("pathpilot_event_loop_lag_seconds"):
+            continue
+        value = float(match["value"])
+        if match["name"].endswith("_bucket"):
+            lag["buckets"][re.search(r'le="([^"]+)"', match["labels"]).group(1)] = value
+        elif match["name"].endswith("_sum"):
+            lag["sum"] = value
+        elif match["name"].endswith("_count"):
+            lag["count"] = value
+    return lag
+
+
+def lag_summary(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Event-loop lag during a scenario, from the difference of two histogram scrapes.
+    Percentiles are bucket upper bounds, so they are conservative.
+    """
+    count = after["count"] - before["count"]
+    if count <= 0:
+        return {"samples": 0}
+    deltas = [(bound, after["buckets"][bound] - before["buckets"].get(bound, 0)) for bound in after["buckets"]]
+
+    def upper_bound(pct: float) -> Optional[float]:
+        for bound, cumulative in deltas:
+            if cumulative >= pct / 100 * count:
+                return None if bound == "+Inf" else round(float(bound) * 1000, 2)
+        return None
+
+    return {
+        "samples": int(count),
+        "mean_ms": round((after["sum"] - before["sum"]) / count * 1000, 2),
+        "p50_ms_le": upper_bound(50),
+        "p99_ms_le": upper_bound(99),
+    }
+
+
+async def run_scenario(base_url: str, scenario: str, args: argparse.Namespace, workload: Workload) -> Dict[str, Any]:
+    kind, value = scenario.split("=")
+    connections = int(value) if kind == "concurrency" else max(64, int(float(value) * 10))
+    limits = httpx.Limits(max_connections=connections + 2)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        lag_before = await scrape_loop_lag(client)
+        stop = asyncio.Event()
+        health = asyncio.create_task(probe_health(client, stop, args.probe_interval))
+        if kind == "rps":
+            recorder, elapsed = await open_loop(client, workload, float(value), args.duration)
+        else:
+            recorder, elapsed = await closed_loop(client, workload, int(value), args.duration)
+        stop.set()
+        health_samples = await health
+        lag_after = await scrape_loop_lag(client)
+
+    endpoints = recorder.report(elapsed)
+    completed = sum(endpoint["throughputRps"] for endpoint in endpoints.values())
+    return {
+        "scenario": scenario,
+        "elapsedSeconds": round(elapsed, 2),
+        "throughputRps": round(completed, 2),
+        "endpoints": endpoints,
+        "eventLoopLag": lag_summary(lag_before, lag_after),
+        "healthProbe": summarize(health_samples),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_ms: float) -> List[Dict[str, Any]]:
+    """
+    Endpoints whose p95 latency rose, or throughput fell, by more than `tolerance` against the baseline;
+    p95 changes under `min_delta_ms` are treated as noise
+    """
+    previous = {run["scenario"]: run for run in baseline.get("scenarios", [])}
+    regressions = []
+    for run in results["scenarios"]:
+        before = previous.get(run["scenario"])
+        if before is None:
+            continue
+        for endpoint, now in run["endpoints"].items():
+            old = before["endpoints"].get(endpoint)
+            if old is None:
+                continue
+            checks = (
+                ("p95_ms", old["latency"]["p95_ms"], now["latency"]["p95_ms"], 1),
+                ("throughputRps", old["throughputRps"], now["throughputRps"], -1),
+            )
+            for metric, old_value, new_value, direction in checks:
+                if not old_value or (metric == "p95_ms" and abs(new_value - old_value) < min_delta_ms):
+                    continue
+                change = (new_value - old_value) / old_value
+                if change * direction > tolerance:
+                    regressions.append({
+                        "scenario": run["scenario"],
+                        "endpoint": endpoint,
+                        "metric": metric,
+                        "baseline": old_value,
+                        "current": new_value,
+                        "change": round(change, 3),
+                    })
+    return regressions
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for entry in text.split(","):
+        endpoint, _, weight = entry.partition("=")
+        if endpoint not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in --mix: {endpoint} (choose from {', '.join(ENDPOINTS)})")
+        mix[endpoint] = float(weight or 1)
+    total = sum(mix.values())
+    return {endpoint: weight / total for endpoint, weight in mix.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", default=["rps=10", "rps=25", "concurrency=16"],
+                        help="rps=N (open loop) and/or concurrency=N (closed loop)")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per scenario")
+    parser.add_argument("--mix", default="roadmap=2,jobInsights=1,trendingSkills=1",
+                        help=f"endpoint weights; endpoints: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--repeat-roadmaps", type=int, default=0,
+                        help="cycle through this many distinct roadmap requests (0: every roadmap is new)")
+    parser.add_argument("--latency", type=float, default=1.0, help="stub seconds per completion")
+    parser.add_argument("--model-latency", default="", help="per-model stub latency, e.g. gpt-4=3")
+    parser.add_argument("--chunk-chars", type=int, default=16, help="stub characters per streamed chunk")
+    parser.add_argument("--workers", type=int, default=1, help="backend worker processes (WEB_CONCURRENCY)")
+    parser.add_argument("--keep-llm-limits", action="store_true",
+                        help="keep LLM admission limits from the environment instead of disabling them")
+    parser.add_argument("--timeout", type=float, default=120.0, help="client timeout per request")
+    parser.add_argument("--probe-interval", type=float, default=0.1, help="seconds between /health probes")
+    parser.add_argument("--output", default="load_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore p95 changes smaller than this")
+    parser.add_argument("--stub-port", type=int, default=8100)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    for scenario in args.scenarios:
+        if not re.fullmatch(r"(rps|concurrency)=\d+(\.\d+)?", scenario):
+            raise SystemExit(f"Bad scenario {scenario!r}: use rps=N or concurrency=N")
+    mix = parse_mix(args.mix)
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "gitRevision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "scenarios": [],
+    }
+
+    with run_stub(args.stub_port, args.latency, model_latency=args.model_latency, chunk_chars=args.chunk_chars) as stub_url:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                "WEB_CONCURRENCY": str(args.workers),
+                "ROADMAP_CACHE_PATH": os.path.join(tmp, "roadmap_cache.db"),
+                "PRECOMPUTED_ROADMAPS_PATH": os.path.join(tmp, "precomputed.db"),
+                "JOB_POSTINGS_PATH": os.path.join(tmp, "postings.db"),
+                "SHARED_STATE_PATH": os.path.join(tmp, "shared_state.db") if args.workers > 1 else "",
+                "LLM_MAX_CONCURRENCY": "256",
+                "LLM_MAX_CONNECTIONS": "256",
+            }
+            if not args.keep_llm_limits:
+                env.update(LLM_REQUESTS_PER_MINUTE="0", LLM_TOKENS_PER_MINUTE="0")
+            extra_args = ["--workers", str(args.workers)] if args.workers > 1 else []
+            with run_backend(args.port, stub_url, extra_env=env, extra_args=extra_args) as base_url:
+                for index, scenario in enumerate(args.scenarios):
+                    workload = Workload(mix, args.repeat_roadmaps, f"{index}-{scenario}")
+                    run = asyncio.run(run_scenario(base_url, scenario, args, workload))
+                    results["scenarios"].append(run)
+                    print(f"{scenario}: {run['throughputRps']} req/s, loop lag {run['eventLoopLag']}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results["regressions"] = compare(results, json.load(f), args.tolerance, args.min_delta_ms)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if results.get("regressions"):
+        print(f"{len(results['regressions'])} regression(s) against {args.baseline}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: RoadmapParser versus the original find/rfind + json.loads extraction
+over a corpus of recorded model outputs (benchmarks/fixtures/llm_outputs.jsonl).
+
+"Usable" for the old path means json.loads succeeded and produced steps; every
+other output fell through to placeholder phases and was re-generated. For the
+parser, usable means it reached the acceptance score.
+
+    python benchmarks/parser_bench.py --rounds 200 --min-score 0.75
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services.roadmap_parser import RoadmapParser  # noqa: E402
+
+CORPUS = os.path.join(BACKEND_DIR, "benchmarks", "fixtures", "llm_outputs.jsonl")
+
+
+def legacy_parse(text: str):
+    """
+    The extraction RoadmapGenerator._parse_roadmap_response used before the parser
+    """
+    start_idx = text.find("{")
+    end_idx = text.rfind("}") + 1
+    if start_idx == -1 or end_idx == 0:
+        return None
+    try:
+        roadmap = json.loads(text[start_idx:end_idx])
+    except json.JSONDecodeError:
+        return None
+    return roadmap.get("steps") if isinstance(roadmap, dict) else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--rounds", type=int, default=200, help="passes over the corpus for timing")
+    parser.add_argument("--min-score", type=float, default=0.75)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    outputs = [record["output"] for record in records]
+    total_bytes = sum(len(output.encode("utf-8")) for output in outputs)
+    roadmap_parser = RoadmapParser()
+
+    by_kind = defaultdict(lambda: {"outputs": 0, "legacyUsable": 0, "parserAccepted": 0, "meanScore": 0.0})
+    for record in records:
+        stats = by_kind[record["kind"]]
+        parsed = roadmap_parser.parse(record["output"])
+        stats["outputs"] += 1
+        stats["legacyUsable"] += bool(legacy_parse(record["output"]))
+        stats["parserAccepted"] += parsed.acceptable(args.min_score)
+        stats["meanScore"] += parsed.score
+    for stats in by_kind.values():
+        stats["meanScore"] = round(stats["meanScore"] / stats["outputs"], 3)
+
+    timings = {}
+    for name, fn in (("legacy", legacy_parse), ("parser", roadmap_parser.parse)):
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            for output in outputs:
+                fn(output)
+        elapsed = time.perf_counter() - start
+        timings[name] = {
+            "outputsPerSecond": round(len(outputs) * args.rounds / elapsed),
+            "mbPerSecond": round(total_bytes * args.rounds / elapsed / 1e6, 2),
+            "usPerOutput": round(elapsed / (len(outputs) * args.rounds) * 1e6, 1),
+        }
+
+    legacy_usable = sum(stats["legacyUsable"] for stats in by_kind.values())
+    accepted = sum(stats["parserAccepted"] for stats in by_kind.values())
+    print(json.dumps({
+        "outputs": len(outputs),
+        "legacyUsable": legacy_usable,
+        "parserAccepted": accepted,
+        "regenerationsAvoided": accepted - legacy_usable,
+        "throughput": timings,
+        "byKind": dict(by_kind),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
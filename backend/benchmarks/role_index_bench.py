@@ -0,0 +1,101 @@
+"""
+Micro-benchmark: RoleIndex lookups versus the original linear scan over role keys.
+
+The linear scan returns on the first key sharing any word with the query, so
+on hits it often stops early (with an order-dependent, frequently wrong match);
+misses show its full O(keys x words) cost.
+
+    python benchmarks/role_index_bench.py --roles 20000 --queries 2000
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.role_index import RoleIndex  # noqa: E402
+
+DOMAINS = [
+    "software", "data", "cloud", "security", "network", "product", "marketing", "sales", "finance",
+    "healthcare", "mobile", "frontend", "backend", "platform", "machine learning", "game", "embedded",
+    "research", "operations", "support", "quality", "content", "brand", "growth", "legal", "hr",
+    "supply chain", "robotics", "biomedical", "civil", "mechanical", "electrical", "ux", "ui", "devops",
+]
+SPECIALTIES = [
+    "", "payments", "search", "ads", "infrastructure", "analytics", "compliance", "retail", "gaming",
+    "automotive", "energy", "education", "insurance", "logistics", "media", "telecom", "travel",
+    "banking", "fraud", "identity", "storage", "video", "audio", "maps", "privacy", "pricing",
+    "billing", "onboarding", "localization", "accessibility", "observability", "networking",
+]
+ROLES = [
+    "engineer", "developer", "analyst", "scientist", "manager", "designer", "architect", "consultant",
+    "specialist", "administrator", "coordinator", "director", "strategist", "researcher", "technician",
+]
+
+
+def synthetic_titles(count: int) -> list:
+    combos = [
+        " ".join(part for part in (specialty, domain, role) if part)
+        for specialty, domain, role in itertools.product(SPECIALTIES, DOMAINS, ROLES)
+    ]
+    random.Random(7).shuffle(combos)
+    return combos[:count]
+
+
+def linear_scan(keys: list, job_title: str):
+    """
+    The lookup JobScraper.get_market_insights used before the index
+    """
+    normalized_title = job_title.lower().strip()
+    for key in keys:
+        if key in normalized_title or any(word in normalized_title for word in key.split()):
+            return key
+    return None
+
+
+def time_lookups(fn, queries: list) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--roles", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    titles = synthetic_titles(args.roles)
+    rng = random.Random(11)
+    hit_queries = [f"Senior {rng.choice(titles).title()}" for _ in range(args.queries // 2)]
+    partial_queries = [f"{rng.choice(DOMAINS)} {rng.choice(ROLES)} lead" for _ in range(args.queries // 2)]
+    miss_queries = [f"chief {rng.choice(['happiness', 'vibes', 'wizard'])} officer" for _ in range(args.queries // 4)]
+    queries = hit_queries + partial_queries
+
+    start = time.perf_counter()
+    index = RoleIndex(titles)
+    build_seconds = time.perf_counter() - start
+
+    scan_seconds = time_lookups(lambda query: linear_scan(titles, query), queries)
+    index_seconds = time_lookups(index.best_match, queries)
+    scan_miss_seconds = time_lookups(lambda query: linear_scan(titles, query), miss_queries)
+    index_miss_seconds = time_lookups(index.best_match, miss_queries)
+
+    print(json.dumps({
+        "roles": len(index),
+        "queries": len(queries),
+        "index_build_ms": round(build_seconds * 1000, 2),
+        "linear_scan_us_per_lookup": round(scan_seconds * 1e6, 2),
+        "index_us_per_lookup": round(index_seconds * 1e6, 2),
+        "linear_scan_miss_us_per_lookup": round(scan_miss_seconds * 1e6, 2),
+        "index_miss_us_per_lookup": round(index_miss_seconds * 1e6, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Scaling benchmark: throughput of the backend at increasing WEB_CONCURRENCY.
+
+For each worker count the backend is started with a fresh shared state
+directory, then driven for a fixed time by a closed loop of clients posting
+distinct roadmap requests (each one a cache miss answered by a zero-latency
+stub, so the work is the backend's own CPU) mixed with cached /job-insights
+reads. A final burst of identical senior-level requests, which route to the
+quality model the stub answers slowly, checks that coalescing still holds
+across processes: the stub should see one completion for the whole burst.
+
+    python benchmarks/scaling_bench.py --workers 1 2 4 --duration 10 --concurrency 64
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import tempfile
+import time
+
+import httpx
+
+from common import SAMPLE_FORM, run_backend, run_stub, summarize
+
+
+async def drive(base_url: str, duration: float, concurrency: int, run_id: int) -> dict:
+    counter = itertools.count()
+    samples = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            n = next(counter)
+            start = time.perf_counter()
+            if n % 4 == 3:
+                response = await client.get("/job-insights/data%20scientist")
+            else:
+                response = await client.post(
+                    "/generate-roadmap", json=dict(SAMPLE_FORM, additionalInfo=f"run {run_id} request {n}")
+                )
+            if response.status_code != 200:
+                errors += 1
+            samples.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[client_loop(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "requestsPerSecond": round(len(samples) / elapsed, 1),
+        "latency": summarize(samples),
+    }
+
+
+async def burst(base_url: str, stub_url: str, size: int, run_id: int) -> dict:
+    stub_stats = stub_url.replace("/v1", "/stub/stats")
+    async with httpx.AsyncClient(base_url=base_url, limits=httpx.Limits(max_connections=size), timeout=60.0) as client:
+        before = (await client.get(stub_stats)).json()["completions"]
+        form = dict(SAMPLE_FORM, experience="10+ years", additionalInfo=f"burst {run_id}")
+        responses = await asyncio.gather(*[client.post("/generate-roadmap", json=form) for _ in range(size)])
+        after = (await client.get(stub_stats)).json()["completions"]
+    return {
+        "requests": size,
+        "errors": sum(1 for r in responses if r.status_code != 200),
+        "upstreamCompletions": after - before,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent client loops")
+    parser.add_argument("--burst", type=int, default=32, help="identical requests in the coalescing check")
+    parser.add_argument("--quality-model", default="gpt-4", help="model the burst is routed to")
+    parser.add_argument("--stub-port", type=int, default=8100)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    results = {"cpus": os.cpu_count(), "runs": []}
+    # Only the quality model is slow, so the burst's requests overlap while the load stays CPU-bound
+    with run_stub(args.stub_port, 0.0, model_latency=f"{args.quality_model}=0.5") as stub_url:
+        for run_id, workers in enumerate(args.workers):
+            with tempfile.TemporaryDirectory() as tmp:
+                env = {
+                    "WEB_CONCURRENCY": str(workers),
+                    "SHARED_STATE_PATH": os.path.join(tmp, "shared_state.db"),
+                    "ROADMAP_CACHE_BACKEND": "sqlite",
+                    "ROADMAP_CACHE_PATH": os.path.join(tmp, "roadmap_cache.db"),
+                    "PRECOMPUTED_ROADMAPS_PATH": os.path.join(tmp, "precomputed.db"),
+                    "JOB_POSTINGS_PATH": os.path.join(tmp, "postings.db"),
+                    "LLM_MAX_CONCURRENCY": str(args.concurrency),
+                    "LLM_MAX_CONNECTIONS": str(args.concurrency),
+                }
+                with run_backend(args.port, stub_url, extra_env=env) as base_url:
+                    load = asyncio.run(drive(base_url, args.duration, args.concurrency, run_id))
+                    coalescing = asyncio.run(burst(base_url, stub_url, args.burst, run_id))
+                results["runs"].append({"workers": workers, **load, "coalescing": coalescing})
+
+    baseline = results["runs"][0]["requestsPerSecond"] or 1.0
+    for run in results["runs"]:
+        run["speedup"] = round(run["requestsPerSecond"] / baseline, 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark: batched skill-gap scoring versus scoring one skill pair at a time.
+
+Builds a synthetic skill vocabulary, then times SkillGapAnalyzer.similarity
+for a role's in-demand skills and for a large batch of queries against the
+whole vocabulary, next to a per-pair loop using the same vectorizer.
+
+    python benchmarks/skill_gap_bench.py --skills 5000 --queries 1000
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.skill_gap import SkillGapAnalyzer  # noqa: E402
+
+TOOLS = [
+    "python", "java", "javascript", "typescript", "go", "rust", "sql", "react", "angular", "vue", "django",
+    "flask", "spring", "kubernetes", "docker", "terraform", "aws", "azure", "google cloud", "spark", "kafka",
+    "airflow", "tableau", "power bi", "excel", "figma", "tensorflow", "pytorch", "pandas", "numpy",
+    "postgresql", "mongodb", "redis", "graphql", "linux", "git", "jenkins", "ansible", "snowflake", "dbt",
+]
+QUALIFIERS = [
+    "", "advanced", "applied", "distributed", "cloud", "data", "web", "mobile", "api", "security",
+    "performance", "testing", "automation", "analytics", "modeling", "architecture", "operations",
+    "design", "programming", "administration", "engineering", "migration", "monitoring", "tuning",
+]
+
+
+def synthetic_skills(count: int) -> list:
+    combos = [" ".join(part for part in pair if part) for pair in itertools.product(TOOLS, QUALIFIERS)]
+    combos += [f"{left} {right}" for left, right in itertools.permutations(TOOLS, 2)]
+    combos += [f"{tool} {first} {second}" for tool, first, second in itertools.product(TOOLS, QUALIFIERS[1:], QUALIFIERS[1:]) if first != second]
+    random.Random(7).shuffle(combos)
+    return combos[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--skills", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--pairs", type=int, default=20000, help="pairs timed in the per-pair loop")
+    args = parser.parse_args()
+
+    analyzer = SkillGapAnalyzer()
+    vocabulary = synthetic_skills(args.skills)
+    rng = random.Random(11)
+    role_skills = rng.sample(vocabulary, 6)
+    queries = [rng.choice(vocabulary) for _ in range(args.queries)]
+
+    start = time.perf_counter()
+    analyzer.vectorizer.transform(vocabulary)
+    vectorize_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analyzer.similarity(role_skills, vocabulary)
+    role_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = analyzer.similarity(queries, vocabulary)
+    batch_seconds = time.perf_counter() - start
+
+    pairs = [(rng.choice(queries), rng.choice(vocabulary)) for _ in range(args.pairs)]
+    start = time.perf_counter()
+    for query, candidate in pairs:
+        left, right = analyzer.vectorizer.transform([query, candidate])
+        float(np.dot(left, right))
+    pair_seconds = (time.perf_counter() - start) / len(pairs)
+
+    print(json.dumps({
+        "skills": len(vocabulary),
+        "queries": len(queries),
+        "vectorize_ms": round(vectorize_seconds * 1000, 2),
+        "role_vs_vocabulary_ms": round(role_seconds * 1000, 2),
+        "batch_ms": round(batch_seconds * 1000, 2),
+        "batch_ns_per_pair": round(batch_seconds / scores.size * 1e9, 2),
+        "per_pair_loop_ns_per_pair": round(pair_seconds * 1e9, 2),
+        "matches_above_threshold": int((scores >= analyzer.threshold).sum()),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
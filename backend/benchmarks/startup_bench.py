@@ -0,0 +1,201 @@
+"""
+Startup benchmark: how long the backend takes to import, to answer /health,
+to report /ready and to serve its first roadmap.
+
+Each run starts a fresh backend process (fresh temp databases) against the
+stub OpenAI server and polls from the moment the process is spawned:
+
+  importMs        `import main` in a clean interpreter (python -X importtime)
+  healthMs        spawn until /health answers (liveness)
+  readyMs         spawn until /ready answers 200 (warm-up finished)
+  firstRequestMs  the first /generate-roadmap after ready
+
+The slowest imports under main and the per-step warm-up timings reported by
+/ready are included, so a new heavy import or a slow warm-up step shows up by
+name. With --baseline, median timings are compared against an earlier
+results file and the script exits 1 when any grew by more than --tolerance.
+
+    python benchmarks/startup_bench.py --runs 5 --output startup.json --baseline previous.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from common import BACKEND_DIR, SAMPLE_FORM, run_stub
+
+METRICS = ("importMs", "healthMs", "readyMs", "firstRequestMs")
+
+
+def measure_imports(top: int) -> Tuple[float, List[Dict[str, Any]]]:
+    """
+    Cumulative import time of main and its slowest direct imports, in milliseconds
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        env=dict(os.environ, ROADMAP_CACHE_BACKEND="memory"),
+    )
+    total = 0.0
+    children = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip())) // 2
+        if name.strip() == "main" and depth == 0:
+            total = int(cumulative) / 1000
+        elif depth == 1:
+            children.append({"module": name.strip(), "ms": round(int(cumulative) / 1000, 1)})
+    children.sort(key=lambda child: child["ms"], reverse=True)
+    return round(total, 1), children[:top]
+
+
+def poll(client: httpx.Client, url: str, started: float, timeout: float) -> float:
+    """
+    Seconds from `started` until `url` answers 200
+    """
+    deadline = started + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.005)
+    raise RuntimeError(f"{url} did not answer 200 within {timeout}s")
+
+
+def measure_boot(port: int, stub_url: str, timeout: float) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            OPENAI_BASE_URL=stub_url,
+            OPENAI_API_KEY="stub",
+            ROADMAP_CACHE_PATH=os.path.join(tmp, "roadmap_cache.db"),
+            PRECOMPUTED_ROADMAPS_PATH=os.path.join(tmp, "precomputed.db"),
+            JOB_POSTINGS_PATH=os.path.join(tmp, "postings.db"),
+            USER_ROADMAPS_PATH=os.path.join(tmp, "user_roadmaps.db"),
+        )
+        base_url = f"http://127.0.0.1:{port}"
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=env,
+        )
+        try:
+            with httpx.Client(timeout=5.0) as client:
+                health = poll(client, f"{base_url}/health", started, timeout)
+                ready = poll(client, f"{base_url}/ready", started, timeout)
+                warmup = client.get(f"{base_url}/ready").json()
+
+                request_start = time.perf_counter()
+                response = client.post(f"{base_url}/generate-roadmap", json=SAMPLE_FORM, timeout=60.0)
+                first_request = time.perf_counter() - request_start
+                response.raise_for_status()
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    return {
+        "healthMs": round(health * 1000, 1),
+        "readyMs": round(ready * 1000, 1),
+        "firstRequestMs": round(first_request * 1000, 1),
+        "warmupStepsMs": warmup.get("stepsMs", {}),
+    }
+
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    summary = {}
+    for metric in METRICS:
+        values = [run[metric] for run in runs]
+        summary[metric] = {
+            "median": round(statistics.median(values), 1),
+            "min": round(min(values), 1),
+            "max": round(max(values), 1),
+        }
+    return summary
+
+
+def compare(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta_ms: float) -> List[Dict[str, Any]]:
+    """
+    Timings whose median grew by more than `tolerance` (and at least `min_delta_ms`) against the baseline
+    """
+    regressions = []
+    for metric, now in summary.items():
+        old = baseline.get("summary", {}).get(metric)
+        if not old or not old["median"] or now["median"] - old["median"] < min_delta_ms:
+            continue
+        change = (now["median"] - old["median"]) / old["median"]
+        if change > tolerance:
+            regressions.append({
+                "metric": metric, "baseline": old["median"], "current": now["median"], "change": round(change, 3)
+            })
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per completion")
+    parser.add_argument("--top-imports", type=int, default=10, help="how many of the slowest imports to list")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for /health and /ready")
+    parser.add_argument("--output", default="startup_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--min-delta-ms", type=float, default=20.0, help="ignore changes smaller than this")
+    parser.add_argument("--stub-port", type=int, default=8100)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    runs = []
+    slowest_imports: List[Dict[str, Any]] = []
+    with run_stub(args.stub_port, args.latency) as stub_url:
+        for index in range(args.runs):
+            import_ms, slowest_imports = measure_imports(args.top_imports)
+            run = {"importMs": import_ms, **measure_boot(args.port, stub_url, args.timeout)}
+            runs.append(run)
+            print(
+                f"run {index + 1}: import {run['importMs']}ms, health {run['healthMs']}ms, "
+                f"ready {run['readyMs']}ms, first request {run['firstRequestMs']}ms",
+                file=sys.stderr
+            )
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        },
+        "summary": summarize_runs(runs),
+        "slowestImports": slowest_imports,
+        "runs": runs,
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results["regressions"] = compare(results["summary"], json.load(f), args.tolerance, args.min_delta_ms)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if results.get("regressions"):
+        print(f"{len(results['regressions'])} regression(s) against {args.baseline}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
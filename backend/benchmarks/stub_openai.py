@@ -0,0 +1,125 @@
+"""
+Minimal OpenAI-compatible chat completion server for local load testing.
+
+Run it and point the backend at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+
+Per-model latency overrides (e.g. --model-latency gpt-4=6,gpt-3.5-turbo=0.5)
+make the model router's tiers and hedging observable.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+STUB_ROADMAP = {
+    "steps": [
+        {
+            "phase": f"Phase {i}",
+            "duration": "2 months",
+            "skills": ["Python", "SQL", "Statistics"],
+            "courses": ["Course A", "Course B"],
+            "projects": ["Project A", "Project B"],
+            "description": f"Stub description for phase {i}"
+        }
+        for i in range(1, 5)
+    ]
+}
+
+app = FastAPI(title="Stub OpenAI")
+completions_served = 0
+
+
+@app.get("/stub/stats")
+async def stub_stats():
+    """
+    How many completions the stub has answered, so benchmarks can count upstream calls
+    """
+    return {"completions": completions_served}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    global completions_served
+    completions_served += 1
+    body = await request.json()
+    latency = model_latency(body.get("model", ""))
+    content = json.dumps(STUB_ROADMAP, indent=2)
+
+    if body.get("stream"):
+        return StreamingResponse(stream_chunks(body, content, latency), media_type="text/event-stream")
+
+    await asyncio.sleep(latency)
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }
+        ],
+        "usage": {"prompt_tokens": 400, "completion_tokens": 600, "total_tokens": 1000}
+    }
+
+
+def model_latency(model: str) -> float:
+    """
+    Seconds per completion for a model, from STUB_MODEL_LATENCY or the STUB_LATENCY default
+    """
+    for entry in os.getenv("STUB_MODEL_LATENCY", "").split(","):
+        name, _, seconds = entry.partition("=")
+        if name.strip() == model and seconds:
+            return float(seconds)
+    return float(os.getenv("STUB_LATENCY", "2.0"))
+
+
+async def stream_chunks(body: dict, content: str, latency: float):
+    """
+    Emit the completion in small chunks spread evenly across the configured latency
+    """
+    chunk_size = int(os.getenv("STUB_CHUNK_CHARS", "16"))
+    pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)]
+    delay = latency / len(pieces)
+
+    for piece in pieces + [None]:
+        await asyncio.sleep(delay if piece is not None else 0)
+        chunk = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"content": piece} if piece is not None else {},
+                    "finish_reason": None if piece is not None else "stop"
+                }
+            ]
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=2.0, help="seconds per completion")
+    parser.add_argument("--model-latency", default="", help="per-model overrides, e.g. gpt-4=6,gpt-3.5-turbo=0.5")
+    parser.add_argument("--chunk-chars", type=int, default=0, help="characters per streamed chunk (default 16)")
+    args = parser.parse_args()
+
+    os.environ["STUB_LATENCY"] = str(args.latency)
+    if args.model_latency:
+        os.environ["STUB_MODEL_LATENCY"] = args.model_latency
+    if args.chunk_chars:
+        os.environ["STUB_CHUNK_CHARS"] = str(args.chunk_chars)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -1,14 +1,36 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import gzip
+import hashlib
+import json
 import os
+import time
+import uuid
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import openai
+from models import (
+    INSIGHTS_BATCH_MAX_ITEMS as INSIGHTS_BATCH_ITEMS_LIMIT, CareerFormData, JobInsightsBatchRequest, MarketInsights,
+    RoadmapBatchRequest, RoadmapResponse, RoadmapStep, SkillsUpdate, StepProgressUpdate, TrendingSkillsBatchRequest,
+    UserRoadmap
+)
+from services.admission import AdmissionRejected
+from services.metrics import EventLoopLagMonitor, MetricsMiddleware, latency_family, metrics, stat_family
+from services.roadmap_batch import BatchRunner
 from services.roadmap_generator import RoadmapGenerator
 from services.job_scraper import JobScraper
+from services.shared_state import SharedStateStore, create_shared_state, worker_count
+from services.user_roadmaps import UserRoadmapRepository, affected_phases, create_user_roadmap_repository
+from services.warmup import StartupWarmup
 import logging
 
+try:
+    import msgpack
+except ImportError:  # optional: batch responses are JSON only without it
+    msgpack = None
+
 # Load environment variables
 load_dotenv()
 
@@ -16,10 +38,27 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the services, start background monitors and warm-up once serving, and release pools on shutdown
+    """
+    build_services()
+    loop_lag_monitor.start()
+    warmup.start()
+    yield
+    await warmup.stop()
+    await loop_lag_monitor.stop()
+    await roadmap_generator.client.aclose()
+    await job_scraper.aclose()
+    if shared_state is not None:
+        shared_state.close()
+
 app = FastAPI(
     title="AI Career Roadmap Generator API",
     description="Generate personalized career roadmaps with AI-powered insights",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -31,38 +70,134 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-roadmap_generator = RoadmapGenerator()
-job_scraper = JobScraper()
-
-# Pydantic models
-class CareerFormData(BaseModel):
-    currentRole: str
-    currentSkills: str
-    dreamJob: str
-    experience: str
-    timeline: str
-    additionalInfo: Optional[str] = None
-
-class RoadmapStep(BaseModel):
-    phase: str
-    duration: str
-    skills: List[str]
-    courses: List[str]
-    projects: List[str]
-    description: str
-
-class MarketInsights(BaseModel):
-    averageSalary: str
-    jobGrowth: str
-    topCompanies: List[str]
-    inDemandSkills: List[str]
-
-class RoadmapResponse(BaseModel):
-    title: str
-    timeline: str
-    steps: List[RoadmapStep]
-    marketInsights: MarketInsights
+# Request counts and latency per route; send "X-Profile: 1" to get the stage breakdown back
+app.add_middleware(MetricsMiddleware)
+
+# Per-stage deadlines for /generate-roadmap (seconds)
+ROADMAP_STAGE_TIMEOUT = float(os.getenv("ROADMAP_STAGE_TIMEOUT", "90"))
+INSIGHTS_STAGE_TIMEOUT = float(os.getenv("INSIGHTS_STAGE_TIMEOUT", "5"))
+
+# HTTP caching of insight lookups (seconds)
+INSIGHTS_CACHE_MAX_AGE = int(os.getenv("INSIGHTS_CACHE_MAX_AGE", "3600"))
+
+# Bulk insight lookups: most inputs per request (the request models reject more than
+# INSIGHTS_BATCH_ITEMS_LIMIT outright), and smallest body worth gzipping (bytes)
+INSIGHTS_BATCH_MAX_ITEMS = min(int(os.getenv("INSIGHTS_BATCH_MAX_ITEMS", "1000")), INSIGHTS_BATCH_ITEMS_LIMIT)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+
+# Services, built by build_services() when the app starts rather than on import: they open
+# (and may create) SQLite databases, which `import main` should not do
+shared_state: Optional[SharedStateStore] = None
+job_scraper: JobScraper
+roadmap_generator: RoadmapGenerator
+user_roadmaps: UserRoadmapRepository
+
+def build_services() -> None:
+    """
+    Create this process's services; with WEB_CONCURRENCY > 1 each worker process builds its own
+    copies, coordinated through the shared SQLite state store
+    """
+    global shared_state, job_scraper, roadmap_generator, user_roadmaps
+    shared_state = create_shared_state()
+    job_scraper = JobScraper(shared_state)
+    # Prompts name the target role's in-demand skills the person is missing
+    roadmap_generator = RoadmapGenerator(shared_state, target_skills=job_scraper.in_demand_skills)
+    user_roadmaps = create_user_roadmap_repository()
+    warmup.step("llmClient", roadmap_generator.warm_up)
+    warmup.step("insightRollups", job_scraper.warm_up)
+
+# Offline precomputation jobs started through the API, by job id in start order;
+# finished jobs are dropped after BATCH_JOB_TTL seconds or beyond BATCH_JOBS_MAX jobs
+batch_jobs: Dict[str, BatchRunner] = {}
+BATCH_JOB_TTL = float(os.getenv("BATCH_JOB_TTL", "3600"))
+BATCH_JOBS_MAX = int(os.getenv("BATCH_JOBS_MAX", "100"))
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """
+    The LLM budget is exhausted: tell the client when to come back instead of queueing forever
+    """
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many roadmap requests, please retry later", "reason": exc.reason, "retryAfter": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Samples how late the event loop runs timers; exported in /metrics
+loop_lag_monitor = EventLoopLagMonitor()
+
+# One-off work moved off the import path and out of the first requests; /ready reports when it is done
+warmup = StartupWarmup()
+
+async def run_stage(
+    name: str,
+    stage: Awaitable[Any],
+    timeout: float,
+    fallback: Callable[[], Any],
+    timings: Dict[str, float]
+) -> Any:
+    """
+    Await a pipeline stage under a deadline, recording its duration in milliseconds
+    """
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(stage, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Stage '{name}' missed its {timeout}s deadline, using fallback")
+        return fallback()
+    finally:
+        timings[name] = (time.perf_counter() - start) * 1000
+        metrics.observe_stage(name, timings[name] / 1000)
+
+def format_server_timing(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
+
+def cacheable_json(request: Request, payload: Any) -> Response:
+    """
+    Return payload with a strong content-hash ETag, or an empty 304 if the client already has it
+    """
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={INSIGHTS_CACHE_MAX_AGE}",
+    }
+
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Whether an If-None-Match header lists etag; "*" matches anything, and weak validators
+    (W/"...") match by their opaque tag, as If-None-Match uses weak comparison
+    """
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in tags:
+        return True
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+def compact_response(request: Request, payload: Any) -> Response:
+    """
+    Encode payload as msgpack when the client accepts it (and msgpack is installed), else compact JSON;
+    gzip it when the client accepts gzip and the body is large enough to benefit
+    """
+    if msgpack is not None and "application/msgpack" in request.headers.get("accept", ""):
+        body, media_type = msgpack.packb(payload), "application/msgpack"
+    else:
+        body, media_type = json.dumps(payload, separators=(",", ":")).encode("utf-8"), "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= COMPRESS_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+def check_batch_size(count: int) -> None:
+    if count > INSIGHTS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"Too many inputs: {count} (at most {INSIGHTS_BATCH_MAX_ITEMS} per request)"
+        )
 
 @app.get("/")
 async def root():
@@ -72,6 +207,88 @@ async def root():
 async def health_check():
     return {"status": "healthy", "message": "API is running"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness for load balancers: 503 until startup warm-up has finished, unlike /health which only shows liveness
+    """
+    status = warmup.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@app.get("/stats")
+async def get_stats():
+    """
+    Service-level counters for caches and other runtime state
+    """
+    return {
+        "roadmapCache": roadmap_generator.cache.stats(),
+        "precomputedRoadmaps": len(roadmap_generator.precomputed),
+        "singleFlight": {
+            "roadmap": roadmap_generator.single_flight.stats(),
+            "marketInsights": job_scraper.single_flight.stats(),
+        },
+        "modelRouting": roadmap_generator.router.stats(),
+        "llmAdmission": roadmap_generator.client.admission.stats() if roadmap_generator.client.admission else None,
+        "startup": warmup.status(),
+        "worker": {
+            "pid": os.getpid(),
+            "workers": worker_count(),
+            "sharedState": shared_state.path if shared_state else None,
+            "roadmapLeases": roadmap_generator.leases.stats() if roadmap_generator.leases else None,
+        },
+    }
+
+def service_metrics():
+    """
+    Export the counters services already keep for /stats alongside the registry's own metrics
+    """
+    cache = roadmap_generator.cache.stats()
+    router = roadmap_generator.router
+    families = [
+        stat_family("roadmap_cache_entries", "gauge", "Roadmaps held in the cache", cache["entries"]),
+        stat_family("roadmap_cache_lookups_total", "counter", "Roadmap cache lookups by result", {
+            "hit": cache["hits"], "miss": cache["misses"],
+        }, "result"),
+        stat_family("roadmap_cache_removals_total", "counter", "Roadmaps dropped from the cache", {
+            "eviction": cache["evictions"], "expiration": cache["expirations"],
+        }, "reason"),
+        stat_family("precomputed_roadmaps", "gauge", "Roadmaps in the precomputed store", len(roadmap_generator.precomputed)),
+        stat_family("single_flight_calls_total", "counter", "Calls entering single-flight coalescing", {
+            "roadmap": roadmap_generator.single_flight.calls, "marketInsights": job_scraper.single_flight.calls,
+        }, "flight"),
+        stat_family("single_flight_coalesced_total", "counter", "Calls that joined an in-flight call", {
+            "roadmap": roadmap_generator.single_flight.coalesced, "marketInsights": job_scraper.single_flight.coalesced,
+        }, "flight"),
+        stat_family("model_routing_decisions_total", "counter", "Roadmap requests by routed tier", dict(router.decisions), "tier"),
+        stat_family("model_routing_outcomes_total", "counter", "Hedges, failovers, secondary wins and fallbacks", dict(router.outcomes), "outcome"),
+        latency_family("model_latency_seconds", "Model call latency by tier", "tier", router.latency),
+    ]
+
+    admission = roadmap_generator.client.admission
+    if admission is not None:
+        families += [
+            stat_family("llm_queue_depth", "gauge", "LLM calls waiting for admission", admission.stats()["queueDepth"]),
+            stat_family("llm_admission_total", "counter", "LLM admission decisions", dict(admission.counts), "outcome"),
+            latency_family("llm_admission_wait_seconds", "Time LLM calls waited for admission", "queue", {"llm": admission.wait_ms}),
+        ]
+    families += [
+        stat_family("ready", "gauge", "Whether startup warm-up has finished", warmup.ready),
+        stat_family(
+            "warmup_step_seconds", "gauge", "Duration of each startup warm-up step",
+            {name: ms / 1000 for name, ms in warmup.timings.items()}, "step"
+        ),
+    ]
+    return families
+
+metrics.collector(service_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prometheus metrics for this worker process
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 @app.post("/generate-roadmap", response_model=RoadmapResponse)
 async def generate_roadmap(form_data: CareerFormData):
     """
@@ -79,59 +296,329 @@ async def generate_roadmap(form_data: CareerFormData):
     """
     try:
         logger.info(f"Generating roadmap for transition: {form_data.currentRole} -> {form_data.dreamJob}")
-        
-        # Generate the roadmap using AI
-        roadmap = await roadmap_generator.generate_roadmap(
-            current_role=form_data.currentRole,
-            current_skills=form_data.currentSkills,
-            dream_job=form_data.dreamJob,
-            experience=form_data.experience,
-            timeline=form_data.timeline,
-            additional_info=form_data.additionalInfo
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+
+        # Roadmap generation and market insights are independent, so run them concurrently
+        roadmap, market_insights = await asyncio.gather(
+            run_stage(
+                "roadmap",
+                roadmap_generator.generate_roadmap(
+                    current_role=form_data.currentRole,
+                    current_skills=form_data.currentSkills,
+                    dream_job=form_data.dreamJob,
+                    experience=form_data.experience,
+                    timeline=form_data.timeline,
+                    additional_info=form_data.additionalInfo
+                ),
+                ROADMAP_STAGE_TIMEOUT,
+                lambda: roadmap_generator._generate_fallback_roadmap(
+                    form_data.currentRole, form_data.dreamJob, form_data.timeline
+                ),
+                timings
+            ),
+            run_stage(
+                "insights",
+                job_scraper.get_market_insights(form_data.dreamJob),
+                INSIGHTS_STAGE_TIMEOUT,
+                lambda: job_scraper._get_fallback_insights(form_data.dreamJob),
+                timings
+            )
         )
         
-        # Get market insights for the target role
-        market_insights = await job_scraper.get_market_insights(form_data.dreamJob)
-        
-        # Combine roadmap with market insights
-        response = RoadmapResponse(
+        # Combine roadmap with market insights; validated and encoded once here rather
+        # than again through response_model, so the cost shows up as its own stage
+        serialize_start = time.perf_counter()
+        roadmap_response = RoadmapResponse(
             title=f"Career Roadmap: {form_data.currentRole} → {form_data.dreamJob}",
             timeline=form_data.timeline,
             steps=roadmap["steps"],
             marketInsights=market_insights
         )
-        
-        logger.info("Roadmap generated successfully")
-        return response
-        
+        body = roadmap_response.model_dump_json()
+        timings["serialize"] = (time.perf_counter() - serialize_start) * 1000
+        metrics.observe_stage("serialize", timings["serialize"] / 1000)
+
+        timings["total"] = (time.perf_counter() - start) * 1000
+        critical_stage = max(("roadmap", "insights"), key=lambda name: timings[name])
+        logger.info(
+            f"Roadmap generated successfully in {timings['total']:.1f}ms "
+            f"(roadmap {timings['roadmap']:.1f}ms, insights {timings['insights']:.1f}ms, critical path: {critical_stage})"
+        )
+        return Response(
+            content=body,
+            media_type="application/json",
+            headers={"Server-Timing": format_server_timing(timings)}
+        )
+
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error generating roadmap: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate roadmap: {str(e)}")
 
+@app.post("/generate-roadmap/stream")
+async def stream_roadmap(form_data: CareerFormData):
+    """
+    Stream a career roadmap as newline-delimited JSON events.
+
+    Emits a "meta" event, one "step" event per phase as soon as it is generated,
+    a "marketInsights" event once insights are ready, and a final "done" event
+    with stage timings.
+    """
+    logger.info(f"Streaming roadmap for transition: {form_data.currentRole} -> {form_data.dreamJob}")
+    # Refuse before the 200 is sent if the LLM queue is already full
+    if roadmap_generator.client.admission is not None:
+        roadmap_generator.client.admission.check_capacity()
+    return StreamingResponse(stream_roadmap_events(form_data), media_type="application/x-ndjson")
+
+def ndjson_event(event: Dict[str, Any]) -> str:
+    return json.dumps(event) + "\n"
+
+async def stream_roadmap_events(form_data: CareerFormData) -> AsyncIterator[str]:
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    insights_task = asyncio.create_task(run_stage(
+        "insights",
+        job_scraper.get_market_insights(form_data.dreamJob),
+        INSIGHTS_STAGE_TIMEOUT,
+        lambda: job_scraper._get_fallback_insights(form_data.dreamJob),
+        timings
+    ))
+
+    def insights_event(insights: Dict[str, Any]) -> str:
+        return ndjson_event({
+            "type": "marketInsights",
+            "marketInsights": MarketInsights.model_validate(insights).model_dump()
+        })
+
+    try:
+        yield ndjson_event({
+            "type": "meta",
+            "title": f"Career Roadmap: {form_data.currentRole} → {form_data.dreamJob}",
+            "timeline": form_data.timeline
+        })
+
+        insights_sent = False
+        index = 0
+        async for step in roadmap_generator.stream_roadmap(
+            current_role=form_data.currentRole,
+            current_skills=form_data.currentSkills,
+            dream_job=form_data.dreamJob,
+            experience=form_data.experience,
+            timeline=form_data.timeline,
+            additional_info=form_data.additionalInfo
+        ):
+            if index == 0:
+                timings["firstStep"] = (time.perf_counter() - start) * 1000
+            yield ndjson_event({"type": "step", "index": index, "step": step.model_dump()})
+            index += 1
+
+            if not insights_sent and insights_task.done():
+                yield insights_event(insights_task.result())
+                insights_sent = True
+        timings["roadmap"] = (time.perf_counter() - start) * 1000
+
+        if not insights_sent:
+            yield insights_event(await insights_task)
+
+        timings["total"] = (time.perf_counter() - start) * 1000
+        yield ndjson_event({"type": "done", "timings": {name: round(value, 1) for name, value in timings.items()}})
+        logger.info(f"Roadmap streamed successfully, first step after {timings.get('firstStep', 0):.1f}ms")
+
+    except AdmissionRejected as e:
+        logger.warning(f"Roadmap stream rejected by admission control: {str(e)}")
+        yield ndjson_event({"type": "error", "detail": "Too many roadmap requests, please retry later", "retryAfter": e.retry_after})
+    except Exception as e:
+        logger.error(f"Error streaming roadmap: {str(e)}")
+        yield ndjson_event({"type": "error", "detail": f"Failed to generate roadmap: {str(e)}"})
+    finally:
+        if not insights_task.done():
+            insights_task.cancel()
+
+def prune_batch_jobs() -> None:
+    """
+    Forget finished batch jobs that expired, then the oldest finished ones over the limit
+    """
+    now = time.monotonic()
+    finished = [job_id for job_id, runner in batch_jobs.items() if runner.finished_at is not None]
+    expired = {job_id for job_id in finished if now - batch_jobs[job_id].finished_at > BATCH_JOB_TTL}
+    overflow = len(batch_jobs) - len(expired) - BATCH_JOBS_MAX
+    if overflow > 0:
+        expired.update([job_id for job_id in finished if job_id not in expired][:overflow])
+    for job_id in expired:
+        del batch_jobs[job_id]
+
+@app.post("/generate-roadmap/batch", status_code=202)
+async def start_roadmap_batch(batch: RoadmapBatchRequest):
+    """
+    Precompute roadmaps for a list of form submissions in the background
+    """
+    job_id = uuid.uuid4().hex
+    runner = BatchRunner(
+        roadmap_generator,
+        roadmap_generator.precomputed,
+        concurrency=batch.concurrency,
+        requests_per_minute=batch.requestsPerMinute,
+        # Other workers answer progress polls for this job from the shared store
+        on_progress=(lambda report: shared_state.submit(shared_state.put_json, f"batch:{job_id}", report)) if shared_state else None
+    )
+    runner.task = asyncio.create_task(runner.run(batch.items))
+    prune_batch_jobs()
+    batch_jobs[job_id] = runner
+    logger.info(f"Started roadmap batch {job_id} with {len(batch.items)} items")
+    return {"jobId": job_id, "status": runner.status, "total": len(batch.items)}
+
+@app.get("/generate-roadmap/batch/{job_id}")
+async def get_roadmap_batch(job_id: str):
+    """
+    Report progress and throughput of a roadmap batch job
+    """
+    runner = batch_jobs.get(job_id)
+    if runner is not None:
+        return {"jobId": job_id, **runner.report()}
+
+    report = await shared_state.run(shared_state.get_json, f"batch:{job_id}") if shared_state else None
+    if report is None:
+        raise HTTPException(status_code=404, detail=f"Unknown batch job: {job_id}")
+    return {"jobId": job_id, **report}
+
+@app.post("/users/{user_id}/roadmaps", response_model=UserRoadmap, status_code=201)
+async def create_user_roadmap(user_id: str, form_data: CareerFormData):
+    """
+    Generate a roadmap and save it for the user so progress can be tracked
+    """
+    roadmap = await roadmap_generator.generate_roadmap(
+        current_role=form_data.currentRole,
+        current_skills=form_data.currentSkills,
+        dream_job=form_data.dreamJob,
+        experience=form_data.experience,
+        timeline=form_data.timeline,
+        additional_info=form_data.additionalInfo
+    )
+    if roadmap["source"] == "fallback" or roadmap.get("degraded"):
+        # A generic or topped-up roadmap is not worth tracking progress against
+        logger.warning(f"Not saving a {roadmap['source']} roadmap for user {user_id}")
+        raise HTTPException(status_code=502, detail="Could not generate a complete roadmap; nothing was saved")
+    steps = [RoadmapStep.model_validate(step) for step in roadmap["steps"]]
+    title = f"Career Roadmap: {form_data.currentRole} → {form_data.dreamJob}"
+    stored = await asyncio.to_thread(user_roadmaps.create, user_id, form_data, title, steps)
+    logger.info(f"Saved roadmap {stored.id} for user {user_id} ({roadmap['source']})")
+    return stored.to_model()
+
+@app.get("/users/{user_id}/roadmaps", response_model=List[UserRoadmap])
+async def list_user_roadmaps(user_id: str):
+    """
+    The user's saved roadmaps, newest first
+    """
+    return [stored.to_model() for stored in await asyncio.to_thread(user_roadmaps.list_for_user, user_id)]
+
+@app.get("/users/{user_id}/roadmaps/{roadmap_id}", response_model=UserRoadmap)
+async def get_user_roadmap(user_id: str, roadmap_id: str):
+    stored = await asyncio.to_thread(user_roadmaps.get, user_id, roadmap_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown roadmap: {roadmap_id}")
+    return stored.to_model()
+
+@app.put("/users/{user_id}/roadmaps/{roadmap_id}/steps/{index}", response_model=UserRoadmap)
+async def update_step_progress(user_id: str, roadmap_id: str, index: int, update: StepProgressUpdate):
+    """
+    Mark a roadmap phase (0-based index) as completed or not
+    """
+    stored = await asyncio.to_thread(user_roadmaps.set_step_completed, user_id, roadmap_id, index, update.completed)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown roadmap or step: {roadmap_id}/{index}")
+    return stored.to_model()
+
+@app.patch("/users/{user_id}/roadmaps/{roadmap_id}/skills", response_model=UserRoadmap)
+async def update_roadmap_skills(user_id: str, roadmap_id: str, update: SkillsUpdate):
+    """
+    Update the user's current skills and regenerate only the uncompleted phases the change affects
+    """
+    stored = await asyncio.to_thread(user_roadmaps.get, user_id, roadmap_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Unknown roadmap: {roadmap_id}")
+
+    form = stored.form.model_copy(update={"currentSkills": update.currentSkills})
+    phases = affected_phases(stored.steps, stored.completed, stored.form.currentSkills, update.currentSkills)
+    replaced = {}
+    if phases:
+        result = await roadmap_generator.regenerate_phases(
+            current_role=form.currentRole,
+            current_skills=form.currentSkills,
+            dream_job=form.dreamJob,
+            experience=form.experience,
+            timeline=form.timeline,
+            additional_info=form.additionalInfo,
+            steps=stored.steps,
+            phases=phases
+        )
+        replaced = result["replaced"]
+    logger.info(
+        f"Skills update for roadmap {roadmap_id}: {len(phases)} affected phase(s), {len(replaced)} regenerated"
+    )
+    if set(replaced) != set(phases):
+        # Saving the new skills over stale phases would hide that they still need rewriting
+        missing = sorted(set(phases) - set(replaced))
+        raise HTTPException(
+            status_code=502,
+            detail=f"Could not regenerate phase(s) {', '.join(str(phase) for phase in missing)}; skills were not updated"
+        )
+
+    updated = await asyncio.to_thread(user_roadmaps.update, stored, form, replaced)
+    return updated.to_model(regenerated=sorted(replaced))
+
 @app.get("/job-insights/{job_title}")
-async def get_job_insights(job_title: str):
+async def get_job_insights(job_title: str, request: Request):
     """
     Get market insights for a specific job title
     """
     try:
         insights = await job_scraper.get_market_insights(job_title)
-        return insights
+        return cacheable_json(request, insights)
     except Exception as e:
         logger.error(f"Error fetching job insights: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch job insights: {str(e)}")
 
 @app.get("/trending-skills/{industry}")
-async def get_trending_skills(industry: str):
+async def get_trending_skills(industry: str, request: Request):
     """
     Get trending skills for a specific industry
     """
     try:
         skills = await job_scraper.get_trending_skills(industry)
-        return {"industry": industry, "trending_skills": skills}
+        return cacheable_json(request, {"industry": industry, "trending_skills": skills})
     except Exception as e:
         logger.error(f"Error fetching trending skills: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch trending skills: {str(e)}")
 
+@app.post("/job-insights/batch")
+async def get_job_insights_batch(batch: JobInsightsBatchRequest, request: Request):
+    """
+    Market insights for many job titles in one request, keyed by title; duplicate titles are resolved once
+    """
+    check_batch_size(len(batch.jobTitles))
+    try:
+        results = await job_scraper.get_market_insights_batch(batch.jobTitles)
+        return compact_response(request, {"results": results})
+    except Exception as e:
+        logger.error(f"Error fetching job insights batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch job insights: {str(e)}")
+
+@app.post("/trending-skills/batch")
+async def get_trending_skills_batch(batch: TrendingSkillsBatchRequest, request: Request):
+    """
+    Trending skills for many industries in one request, keyed by industry; duplicate industries are resolved once
+    """
+    check_batch_size(len(batch.industries))
+    try:
+        results = await job_scraper.get_trending_skills_batch(batch.industries)
+        return compact_response(request, {"results": results})
+    except Exception as e:
+        logger.error(f"Error fetching trending skills batch: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to fetch trending skills: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Several workers need an import string so each process can load the app itself
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=worker_count())
@@ -0,0 +1,70 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# Upper bounds on what a single roadmap batch request may ask for
+ROADMAP_BATCH_MAX_ITEMS = 1000
+BATCH_MAX_CONCURRENCY = 16
+BATCH_MAX_REQUESTS_PER_MINUTE = 600
+# ...and on the inputs of a bulk insights lookup
+INSIGHTS_BATCH_MAX_ITEMS = 1000
+
+class CareerFormData(BaseModel):
+    currentRole: str
+    currentSkills: str
+    dreamJob: str
+    experience: str
+    timeline: str
+    additionalInfo: Optional[str] = None
+
+class RoadmapStep(BaseModel):
+    phase: str
+    duration: str
+    skills: List[str]
+    courses: List[str]
+    projects: List[str]
+    description: str
+
+class MarketInsights(BaseModel):
+    averageSalary: str
+    jobGrowth: str
+    topCompanies: List[str]
+    inDemandSkills: List[str]
+
+class RoadmapResponse(BaseModel):
+    title: str
+    timeline: str
+    steps: List[RoadmapStep]
+    marketInsights: MarketInsights
+
+class RoadmapBatchRequest(BaseModel):
+    items: List[CareerFormData] = Field(max_length=ROADMAP_BATCH_MAX_ITEMS)
+    concurrency: Optional[int] = Field(None, ge=1, le=BATCH_MAX_CONCURRENCY)
+    requestsPerMinute: Optional[float] = Field(None, gt=0, le=BATCH_MAX_REQUESTS_PER_MINUTE)
+
+class JobInsightsBatchRequest(BaseModel):
+    jobTitles: List[str] = Field(max_length=INSIGHTS_BATCH_MAX_ITEMS)
+
+class TrendingSkillsBatchRequest(BaseModel):
+    industries: List[str] = Field(max_length=INSIGHTS_BATCH_MAX_ITEMS)
+
+class TrackedRoadmapStep(RoadmapStep):
+    completed: bool = False
+
+class UserRoadmap(BaseModel):
+    id: str
+    userId: str
+    title: str
+    timeline: str
+    form: CareerFormData
+    steps: List[TrackedRoadmapStep]
+    progress: float
+    createdAt: float
+    updatedAt: float
+    # Set on skills updates: positions of the phases that were rewritten
+    regeneratedPhases: Optional[List[int]] = None
+
+class StepProgressUpdate(BaseModel):
+    completed: bool
+
+class SkillsUpdate(BaseModel):
+    currentSkills: str
@@ -0,0 +1,387 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import math
+import os
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from services.metrics import LatencyHistogram
+from services.shared_state import SharedStateStore
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+WAIT_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Priority of LLM calls made from the current task; batch workers lower it. Work shared
+# by several callers holds a SharedPriority instead of an int.
+llm_priority: contextvars.ContextVar = contextvars.ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+class SharedPriority:
+    """
+    Priority of work done on behalf of several callers: the most important one's so far.
+    Queued calls made at this priority are re-ordered when it is raised.
+    """
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self._listeners: List[Callable[[], None]] = []
+
+    def raise_to(self, priority: int) -> None:
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        for listener in list(self._listeners):
+            listener()
+
+    def subscribe(self, listener: Callable[[], None]) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+
+def priority_value(priority: Union[int, SharedPriority]) -> int:
+    return priority.priority if isinstance(priority, SharedPriority) else priority
+
+
+def share_llm_priority(context: contextvars.Context) -> None:
+    """
+    SingleFlight hook: run shared work at the priority of the most important caller waiting on it
+    """
+    caller = priority_value(llm_priority.get())
+    shared = context.run(llm_priority.get)
+    if isinstance(shared, SharedPriority):
+        shared.raise_to(caller)
+    else:
+        # The starter's context copy: swap in a holder later callers can raise
+        context.run(llm_priority.set, SharedPriority(min(caller, shared)))
+
+
+class AdmissionRejected(Exception):
+    """
+    An LLM call was refused or shed by admission control; retry after `retry_after` seconds
+    """
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"LLM admission rejected ({reason}), retry after {retry_after:.0f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RateBuckets:
+    """
+    Process-local request and token buckets, refilled continuously at their per-minute rates
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float, burst_seconds: float):
+        self.request_rate = requests_per_minute / 60
+        self.token_rate = tokens_per_minute / 60
+        self.request_capacity = max(1.0, self.request_rate * burst_seconds)
+        self.token_capacity = max(1.0, self.token_rate * burst_seconds)
+        self.requests = self.request_capacity
+        self.tokens = self.token_capacity
+        self.updated_at = time.monotonic()
+
+    async def try_acquire(self, tokens: float) -> float:
+        """
+        Take one request and `tokens` tokens; returns 0 on success, else seconds until they are available
+        """
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.requests = min(self.request_capacity, self.requests + elapsed * self.request_rate)
+        self.tokens = min(self.token_capacity, self.tokens + elapsed * self.token_rate)
+
+        wait = _shortfall(1, self.requests, self.request_rate, self.request_capacity)
+        wait = max(wait, _shortfall(tokens, self.tokens, self.token_rate, self.token_capacity))
+        if wait > 0:
+            return wait
+        if self.request_rate:
+            self.requests -= 1
+        if self.token_rate:
+            self.tokens -= min(tokens, self.token_capacity)
+        return 0.0
+
+    def adjust(self, tokens: float) -> None:
+        """
+        Return unused estimated tokens (positive) or charge an overrun (negative)
+        """
+        if self.token_rate:
+            self.tokens = min(self.token_capacity, self.tokens + tokens)
+
+
+class SharedRateBuckets:
+    """
+    Request and token buckets held in the shared state store, so every worker draws from one budget
+    """
+
+    def __init__(self, store: SharedStateStore, name: str, requests_per_minute: float, tokens_per_minute: float, burst_seconds: float):
+        self.store = store
+        self.name = name
+        self.request_rate = requests_per_minute / 60
+        self.token_rate = tokens_per_minute / 60
+        self.request_capacity = max(1.0, self.request_rate * burst_seconds)
+        self.token_capacity = max(1.0, self.token_rate * burst_seconds)
+
+    async def try_acquire(self, tokens: float) -> float:
+        # The transaction may wait on another worker's write lock, so it runs on the store's thread
+        return await self.store.run(
+            self.store.take_from_buckets,
+            self.name,
+            self.request_rate, self.request_capacity,
+            self.token_rate, self.token_capacity,
+            min(tokens, self.token_capacity) if self.token_rate else 0.0
+        )
+
+    def adjust(self, tokens: float) -> None:
+        if self.token_rate:
+            self.store.submit(self.store.adjust_bucket_tokens, self.name, tokens, self.token_capacity)
+
+
+def _shortfall(amount: float, available: float, rate: float, capacity: float) -> float:
+    if not rate:
+        return 0.0
+    missing = min(amount, capacity) - available
+    return missing / rate if missing > 0 else 0.0
+
+
+class _Waiter:
+    def __init__(self, priority: Union[int, SharedPriority], seq: int, tokens: float, future: "asyncio.Future[None]"):
+        self.source = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.future = future
+
+    @property
+    def priority(self) -> int:
+        return priority_value(self.source)
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdmissionTicket:
+    def __init__(self, tokens: float):
+        self.tokens = tokens
+
+
+class AdmissionController:
+    """
+    Admission control in front of the LLM client.
+
+    Each call takes one request and its estimated tokens from the rate buckets.
+    When the buckets are empty, calls wait in a bounded priority queue that is
+    drained in (priority, arrival) order as the buckets refill. A full queue
+    sheds its lowest-priority waiter for a more important arrival, or rejects
+    the arrival; calls that would wait longer than `max_wait` are rejected
+    up front. Rejections carry a Retry-After estimate. One drain task admits
+    queued calls, so bucket checks that go to the shared store never block
+    the event loop.
+    """
+
+    def __init__(self, buckets: Any, max_queue: int, max_wait: float):
+        self.buckets = buckets
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._queue: List[_Waiter] = []
+        self._depth = 0
+        self._queued_tokens = 0.0
+        self._seq = itertools.count()
+        self._drainer: Optional["asyncio.Task[None]"] = None
+        self._wake: Optional[asyncio.Event] = None
+
+        self.counts: Counter = Counter()
+        self.max_depth_seen = 0
+        self.wait_ms = LatencyHistogram(WAIT_BUCKETS_MS)
+
+    async def acquire(self, tokens: float, priority: Optional[int] = None) -> AdmissionTicket:
+        """
+        Wait for budget for one LLM call of about `tokens` tokens
+        """
+        source = llm_priority.get() if priority is None else priority
+        start = time.monotonic()
+
+        if not self._depth and await self.buckets.try_acquire(tokens) == 0:
+            self.counts["admitted"] += 1
+            self.wait_ms.observe(0.0)
+            return AdmissionTicket(tokens)
+
+        self._make_room(priority_value(source))
+        retry_after = self.retry_after(tokens)
+        if retry_after > self.max_wait:
+            self._reject("overBudget", retry_after)
+
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        waiter = _Waiter(source, next(self._seq), tokens, future)
+        heapq.heappush(self._queue, waiter)
+        self._depth += 1
+        self._queued_tokens += tokens
+        self.max_depth_seen = max(self.max_depth_seen, self._depth)
+        self.counts["queued"] += 1
+        if isinstance(source, SharedPriority):
+            # An interactive caller joining shared work moves its queued call up
+            source.subscribe(self._reorder)
+        self._pump()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self._reject("waitTimeout", self.retry_after(tokens))
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        finally:
+            if isinstance(source, SharedPriority):
+                source.unsubscribe(self._reorder)
+
+        self.counts["admitted"] += 1
+        self.wait_ms.observe((time.monotonic() - start) * 1000)
+        return AdmissionTicket(tokens)
+
+    def settle(self, ticket: AdmissionTicket, actual_tokens: Optional[int]) -> None:
+        """
+        Correct the token bucket once the call's real usage is known
+        """
+        if actual_tokens is not None:
+            self.buckets.adjust(ticket.tokens - actual_tokens)
+
+    def check_capacity(self, priority: Optional[int] = None) -> None:
+        """
+        Fail fast when a new call at this priority would be rejected, e.g. before starting a stream
+        """
+        priority = priority_value(llm_priority.get() if priority is None else priority)
+        if self._depth >= self.max_queue and not any(
+            waiter.priority > priority and not waiter.future.done() for waiter in self._queue
+        ):
+            self._reject("queueFull", self.retry_after(0))
+
+    def retry_after(self, tokens: float) -> float:
+        """
+        Rough time for the queue ahead (plus this call) to drain at the bucket rates
+        """
+        estimates = [1.0]
+        if self.buckets.request_rate:
+            estimates.append((self._depth + 1) / self.buckets.request_rate)
+        if self.buckets.token_rate:
+            estimates.append((self._queued_tokens + tokens) / self.buckets.token_rate)
+        return max(estimates)
+
+    def _make_room(self, priority: int) -> None:
+        if self._depth < self.max_queue:
+            return
+        live = [waiter for waiter in self._queue if not waiter.future.done()]
+        worst = max(live) if live else None
+        if worst is None or worst.priority <= priority:
+            self._reject("queueFull", self.retry_after(0))
+        # Shed the least important waiter to make room for this call
+        self.counts["shed"] += 1
+        self._dequeue(worst)
+        worst.future.set_exception(AdmissionRejected("shed", math.ceil(self.retry_after(worst.tokens))))
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        if not waiter.future.done():
+            self._dequeue(waiter)
+            waiter.future.cancel()
+        elif not waiter.future.cancelled() and waiter.future.exception() is None:
+            # Admitted at the same moment it gave up; hand the budget back
+            self.buckets.adjust(waiter.tokens)
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        # The heap entry stays behind and is skipped once its future is done
+        self._depth -= 1
+        self._queued_tokens -= waiter.tokens
+
+    def _reorder(self) -> None:
+        heapq.heapify(self._queue)
+        self._pump()
+
+    def _pump(self) -> None:
+        """
+        Make sure the queue is being drained, waking the drain task to re-check its head
+        """
+        loop = asyncio.get_running_loop()
+        if self._drainer is None or self._drainer.done() or self._drainer.get_loop() is not loop:
+            self._wake = asyncio.Event()
+            self._drainer = loop.create_task(self._drain())
+        else:
+            self._wake.set()
+
+    async def _drain(self) -> None:
+        """
+        Admit waiters from the head of the queue while the buckets allow, then sleep until they refill
+        """
+        while self._queue:
+            head = self._queue[0]
+            if head.future.done():
+                heapq.heappop(self._queue)
+                continue
+            self._wake.clear()
+            wait = await self.buckets.try_acquire(head.tokens)
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if head.future.done():
+                # Gave up or was shed while the buckets were checked; hand its budget back
+                self.buckets.adjust(head.tokens)
+                continue
+            # The entry stays in the heap (a newer, more important waiter may be on top) and is
+            # skipped once its future is done
+            self._dequeue(head)
+            head.future.set_result(None)
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        self.counts[f"rejected.{reason}"] += 1
+        raise AdmissionRejected(reason, math.ceil(retry_after))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queueDepth": self._depth,
+            "maxQueueDepthSeen": self.max_depth_seen,
+            "maxQueue": self.max_queue,
+            "admitted": self.counts["admitted"],
+            "queued": self.counts["queued"],
+            "shed": self.counts["shed"],
+            "rejected": {
+                key.split(".", 1)[1]: count for key, count in self.counts.items() if key.startswith("rejected.")
+            },
+            "waitMs": self.wait_ms.snapshot(),
+        }
+
+
+def create_admission_controller(shared_state: Optional[SharedStateStore] = None) -> Optional[AdmissionController]:
+    """
+    Build admission control from LLM_* environment settings; returns None when both limits are off
+    """
+    rpm = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+    tpm = float(os.getenv("LLM_TOKENS_PER_MINUTE", "150000"))
+    if rpm <= 0 and tpm <= 0:
+        return None
+    burst = float(os.getenv("LLM_BURST_SECONDS", "10"))
+
+    if shared_state is not None:
+        buckets: Any = SharedRateBuckets(shared_state, "llm", max(rpm, 0), max(tpm, 0), burst)
+    else:
+        buckets = RateBuckets(max(rpm, 0), max(tpm, 0), burst)
+    controller = AdmissionController(
+        buckets,
+        max_queue=int(os.getenv("LLM_QUEUE_MAX", "100")),
+        max_wait=float(os.getenv("LLM_QUEUE_MAX_WAIT", "30"))
+    )
+    logger.info(
+        f"LLM admission: {rpm:.0f} requests/min, {tpm:.0f} tokens/min, queue {controller.max_queue}, "
+        f"max wait {controller.max_wait:.0f}s{' (shared)' if shared_state is not None else ''}"
+    )
+    return controller
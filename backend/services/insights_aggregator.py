@@ -0,0 +1,171 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
+
+from services.job_ingestion import PostingStore
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ROW_COLUMNS = ["id", "role", "industry", "company", "salary_min", "salary_max", "requirements", "fetched_at"]
+SALARY_PERCENTILES = [10, 25, 50, 75, 90]
+GROWTH_WINDOW_SECONDS = 30 * 24 * 3600
+TOP_N = 6
+
+# Requirement lines that describe seniority or credentials rather than a skill
+_NON_SKILL = re.compile(r"\byears?\b|\bdegree\b|\bexperience\b|\bbachelor|\bmaster", re.IGNORECASE)
+
+
+class _GroupState:
+    """
+    Running totals for one role or industry, merged from each batch of new postings
+    """
+
+    def __init__(self):
+        # Groups only exist once postings are folded in, which imports numpy with pandas
+        import numpy as np
+
+        self.postings = 0
+        self.salaries = np.empty(0)
+        self.fetched_at = np.empty(0)
+        self.companies: Counter = Counter()
+        self.skills: Counter = Counter()
+        self.skill_labels: Dict[str, str] = {}
+
+
+class InsightsAggregator:
+    """
+    Incrementally maintained per-role and per-industry rollups over stored job postings.
+
+    refresh() reads only postings added since the last call, folds them into the
+    running totals with vectorized pandas group-bys, and rebuilds the rollups of
+    the groups they touched. Request handlers read the rollups with a dict lookup;
+    job growth is relative to the time of the read, so it is worked out then from
+    the group's sorted posting times rather than frozen into the rollup.
+    """
+
+    def __init__(self, store: PostingStore, min_postings: int = 5):
+        self.store = store
+        self.min_postings = min_postings
+        self.watermark = 0
+        self.role_rollups: Dict[str, Dict[str, Any]] = {}
+        self.industry_rollups: Dict[str, Dict[str, Any]] = {}
+        self._roles: Dict[str, _GroupState] = {}
+        self._industries: Dict[str, _GroupState] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> int:
+        """
+        Fold postings added since the last refresh into the rollups; returns how many were processed
+        """
+        with self._lock:
+            processed = 0
+            while True:
+                rows = self.store.rows_since(self.watermark)
+                if not rows:
+                    break
+                # pandas is only needed once there are postings to fold in
+                import pandas as pd
+
+                df = pd.DataFrame(rows, columns=ROW_COLUMNS)
+                self.watermark = int(df["id"].max())
+                processed += len(df)
+
+                df["salary_mid"] = df[["salary_min", "salary_max"]].mean(axis=1)
+                df["requirements"] = df["requirements"].map(json.loads)
+
+                for key in self._merge(df, "role", self._roles):
+                    self.role_rollups[key] = self._rollup(self._roles[key])
+                for key in self._merge(df, "industry", self._industries):
+                    self.industry_rollups[key] = self._rollup(self._industries[key])
+
+            if processed:
+                logger.info(f"Aggregated {processed} new postings into insights rollups")
+            return processed
+
+    def has_new_postings(self) -> bool:
+        """
+        Whether postings were stored (possibly by another process) since the last refresh
+        """
+        return self.store.max_id() > self.watermark
+
+    def _merge(self, df: "pd.DataFrame", column: str, groups: Dict[str, _GroupState]) -> Set[str]:
+        import numpy as np
+
+        df = df[df[column].notna()]
+        if df.empty:
+            return set()
+
+        for key, group in df.groupby(column):
+            state = groups.setdefault(key, _GroupState())
+            state.postings += len(group)
+            state.salaries = np.concatenate([state.salaries, group["salary_mid"].dropna().to_numpy()])
+            # Kept sorted so growth windows are two binary searches at read time
+            state.fetched_at = np.sort(np.concatenate([state.fetched_at, group["fetched_at"].to_numpy(dtype=float)]))
+
+        for (key, company), count in df.groupby([column, "company"]).size().items():
+            groups[key].companies[company] += int(count)
+
+        skills = df[[column, "requirements"]].explode("requirements").dropna()
+        skills = skills[~skills["requirements"].str.contains(_NON_SKILL)]
+        skills = skills.assign(skill=skills["requirements"].str.strip().str.lower())
+        for (key, skill, label), count in skills.groupby([column, "skill", "requirements"]).size().items():
+            state = groups[key]
+            state.skills[skill] += int(count)
+            state.skill_labels.setdefault(skill, label.strip())
+
+        return set(df[column].unique())
+
+    def _rollup(self, state: _GroupState) -> Dict[str, Any]:
+        import numpy as np
+
+        rollup: Dict[str, Any] = {
+            "postings": state.postings,
+            "topCompanies": [company for company, _ in state.companies.most_common(TOP_N)],
+            "inDemandSkills": [state.skill_labels[skill] for skill, _ in state.skills.most_common(TOP_N)],
+            "averageSalary": None,
+            "salaryPercentiles": None,
+        }
+
+        if len(state.salaries):
+            percentiles = np.percentile(state.salaries, SALARY_PERCENTILES)
+            rollup["salaryPercentiles"] = {f"p{p}": round(float(v)) for p, v in zip(SALARY_PERCENTILES, percentiles)}
+            rollup["averageSalary"] = f"${percentiles[1]:,.0f} - ${percentiles[3]:,.0f}"
+        return rollup
+
+    def role_insights(self, role: str) -> Optional[Dict[str, Any]]:
+        return self._insights(self.role_rollups, self._roles, role)
+
+    def industry_insights(self, industry: str) -> Optional[Dict[str, Any]]:
+        return self._insights(self.industry_rollups, self._industries, industry)
+
+    def _insights(
+        self, rollups: Dict[str, Dict[str, Any]], groups: Dict[str, _GroupState], key: str
+    ) -> Optional[Dict[str, Any]]:
+        rollup = rollups.get(key)
+        if not rollup or rollup["postings"] < self.min_postings:
+            return None
+        return dict(rollup, jobGrowth=job_growth(groups[key].fetched_at, time.time()))
+
+
+def job_growth(fetched_at: "np.ndarray", now: float) -> Optional[str]:
+    """
+    Change in posting volume over the last 30 days against the 30 days before, from sorted fetch times
+    """
+    import numpy as np
+
+    window_start, prior_start = np.searchsorted(
+        fetched_at, [now - GROWTH_WINDOW_SECONDS, now - 2 * GROWTH_WINDOW_SECONDS], side="right"
+    )
+    recent = len(fetched_at) - int(window_start)
+    prior = int(window_start) - int(prior_start)
+    if not prior:
+        return None
+    return f"{(recent - prior) / prior * 100:+.0f}% (posting volume, last 30 days)"
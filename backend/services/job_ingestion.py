@@ -0,0 +1,433 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus, urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+_SALARY_AMOUNT = re.compile(r"\$\s*(\d+(?:[.,]\d+)*)\s*(k)?", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+class JobSource:
+    """
+    A job board to ingest from: a search URL template plus CSS selectors for its result pages.
+
+    The URL template may use {query}, {location} and {page}. Selectors are
+    relative to each posting element; "requirements" selects a list.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        selectors: Dict[str, str],
+        pages: int = 1,
+        industry: Optional[str] = None
+    ):
+        self.name = name
+        self.url = url
+        self.selectors = selectors
+        self.pages = pages
+        self.industry = industry
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JobSource":
+        return cls(
+            name=data["name"],
+            url=data["url"],
+            selectors=data["selectors"],
+            pages=data.get("pages", 1),
+            industry=data.get("industry")
+        )
+
+    def page_urls(self, query: str, location: str) -> List[str]:
+        return [
+            self.url.format(query=quote_plus(query), location=quote_plus(location), page=page)
+            for page in range(1, self.pages + 1)
+        ]
+
+
+def load_job_sources(path: Optional[str] = None) -> List[JobSource]:
+    """
+    Load job sources from the JSON file at JOB_SOURCES_PATH, if it exists
+    """
+    path = path or os.getenv("JOB_SOURCES_PATH", "job_sources.json")
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [JobSource.from_dict(source) for source in json.load(f)]
+
+
+def parse_postings_page(html: str, selectors: Dict[str, str], page_url: str) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Extract raw postings from one result page; returns the postings and the parse time in seconds.
+
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    from bs4 import BeautifulSoup
+
+    start = time.perf_counter()
+    soup = BeautifulSoup(html, "html.parser")
+    postings = []
+    for element in soup.select(selectors["posting"]):
+        def text(field: str) -> str:
+            selector = selectors.get(field)
+            node = element.select_one(selector) if selector else None
+            return _WHITESPACE.sub(" ", node.get_text(" ", strip=True)) if node else ""
+
+        link_selector = selectors.get("link")
+        link = element.select_one(link_selector) if link_selector else None
+        requirements_selector = selectors.get("requirements")
+        postings.append({
+            "title": text("title"),
+            "company": text("company"),
+            "location": text("location"),
+            "salary": text("salary"),
+            "posted_date": text("posted_date"),
+            "description": text("description"),
+            "requirements": [
+                _WHITESPACE.sub(" ", node.get_text(" ", strip=True))
+                for node in (element.select(requirements_selector) if requirements_selector else [])
+            ],
+            "url": urljoin(page_url, link["href"]) if link is not None and link.get("href") else page_url,
+        })
+    return postings, time.perf_counter() - start
+
+
+def parse_salary_range(salary: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Parse "$90,000 - $130,000", "$90k-$130k" or "$45/hr" into annual min/max amounts
+    """
+    amounts = []
+    for number, thousands in _SALARY_AMOUNT.findall(salary or ""):
+        value = float(number.replace(",", ""))
+        amounts.append(value * 1000 if thousands else value)
+    if not amounts:
+        return None, None
+    if re.search(r"/\s*(hr|hour)|hourly|per hour", salary, re.IGNORECASE):
+        amounts = [amount * 2080 for amount in amounts]
+    return min(amounts), max(amounts)
+
+
+def posting_dedupe_key(title: str, company: str, location: str) -> str:
+    normalized = "|".join(_WHITESPACE.sub(" ", value.lower()).strip() for value in (title, company, location))
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+class HostRateLimiter:
+    """
+    Enforce a minimum interval between requests to the same host
+    """
+
+    def __init__(self, requests_per_second: float, shared: Optional[Any] = None):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.shared = shared
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host: str) -> None:
+        if not self.interval:
+            return
+        if self.shared is not None:
+            # Every worker process draws from the same per-host schedule
+            delay = await self.shared.run(self.shared.reserve_slot, f"host:{host}", self.interval)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class RobotsPolicy:
+    """
+    Fetch and cache robots.txt per host and answer whether a URL may be crawled
+    """
+
+    def __init__(self, client: "httpx.AsyncClient", user_agent: str):
+        self.client = client
+        self.user_agent = user_agent
+        self._parsers: Dict[str, RobotFileParser] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def allowed(self, url: str) -> bool:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            if origin not in self._parsers:
+                self._parsers[origin] = await self._fetch(origin)
+        return self._parsers[origin].can_fetch(self.user_agent, url)
+
+    async def _fetch(self, origin: str) -> RobotFileParser:
+        import httpx
+
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = await self.client.get(f"{origin}/robots.txt")
+            if response.status_code >= 500:
+                parser.disallow_all = True
+            elif response.status_code >= 400:
+                parser.allow_all = True
+            else:
+                parser.parse(response.text.splitlines())
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not fetch robots.txt for {origin}, skipping host: {str(e)}")
+            parser.disallow_all = True
+        return parser
+
+
+class PostingStore:
+    """
+    SQLite store of normalized, de-duplicated job postings
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS job_postings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                dedupe_key TEXT NOT NULL UNIQUE,
+                source TEXT NOT NULL,
+                title TEXT NOT NULL,
+                company TEXT NOT NULL,
+                location TEXT NOT NULL,
+                salary TEXT NOT NULL,
+                salary_min REAL,
+                salary_max REAL,
+                requirements TEXT NOT NULL,
+                description TEXT NOT NULL,
+                posted_date TEXT NOT NULL,
+                url TEXT NOT NULL,
+                role TEXT,
+                industry TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS job_postings_role ON job_postings (role)")
+
+    def add_many(self, postings: List[Dict[str, Any]]) -> int:
+        """
+        Insert postings, ignoring ones already stored; returns how many were new
+        """
+        rows = [
+            (
+                posting["dedupe_key"], posting["source"], posting["title"], posting["company"],
+                posting["location"], posting["salary"], posting["salary_min"], posting["salary_max"],
+                json.dumps(posting["requirements"]), posting["description"], posting["posted_date"],
+                posting["url"], posting["role"], posting["industry"], posting["fetched_at"],
+            )
+            for posting in postings
+        ]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO job_postings (dedupe_key, source, title, company, location, salary, "
+                "salary_min, salary_max, requirements, description, posted_date, url, role, industry, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute("COMMIT")
+            return self._conn.total_changes - before
+
+    def search(self, role: Optional[str], title: str, location: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Most recent postings for a canonical role (or, without one, a title substring)
+        """
+        clauses, params = [], []
+        if role:
+            clauses.append("role = ?")
+            params.append(role)
+        else:
+            clauses.append("LOWER(title) LIKE ?")
+            params.append(f"%{title.lower()}%")
+        if location:
+            clauses.append("LOWER(location) LIKE ?")
+            params.append(f"%{location.lower()}%")
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, company, location, salary, requirements, posted_date, url FROM job_postings "
+                f"WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?",
+                params
+            ).fetchall()
+        return [
+            {
+                "title": title,
+                "company": company,
+                "location": location,
+                "salary": salary,
+                "requirements": json.loads(requirements),
+                "posted_date": posted_date,
+                "url": url,
+            }
+            for title, company, location, salary, requirements, posted_date, url in rows
+        ]
+
+    def rows_since(self, after_id: int, limit: int = 50000) -> List[Tuple[Any, ...]]:
+        """
+        Postings with id greater than after_id, oldest first, as aggregation input rows
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, role, industry, company, salary_min, salary_max, requirements, fetched_at "
+                "FROM job_postings WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id, limit)
+            ).fetchall()
+
+    def max_id(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM job_postings").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM job_postings").fetchone()[0]
+
+
+class IngestionPipeline:
+    """
+    Fetch result pages from every configured source concurrently, parse them in a
+    worker pool, then normalize, de-duplicate and store the postings.
+    """
+
+    def __init__(
+        self,
+        sources: List[JobSource],
+        store: PostingStore,
+        role_index: Any,
+        headers: Optional[Dict[str, str]] = None,
+        parse_executor: Optional[Executor] = None,
+        shared_state: Optional[Any] = None
+    ):
+        self.sources = sources
+        self.store = store
+        self.role_index = role_index
+        self.headers = headers or {}
+        self.user_agent = self.headers.get("User-Agent", "*")
+
+        self.rate_limiter = HostRateLimiter(float(os.getenv("INGEST_HOST_RPS", "1.0")), shared_state)
+        self._client: Optional["httpx.AsyncClient"] = None
+        self._robots: Optional[RobotsPolicy] = None
+        self._executor = parse_executor
+        self._owns_executor = parse_executor is None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        # Built on first crawl: most deployments configure no sources and never need it
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                follow_redirects=True,
+                timeout=httpx.Timeout(float(os.getenv("INGEST_TIMEOUT", "15")), connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=int(os.getenv("INGEST_MAX_CONNECTIONS", "20")),
+                    max_keepalive_connections=int(os.getenv("INGEST_MAX_KEEPALIVE_CONNECTIONS", "10")),
+                ),
+            )
+        return self._client
+
+    @property
+    def robots(self) -> RobotsPolicy:
+        if self._robots is None:
+            self._robots = RobotsPolicy(self.client, self.user_agent)
+        return self._robots
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=int(os.getenv("INGEST_PARSE_WORKERS", "2")))
+        return self._executor
+
+    async def run(self, query: str, location: str) -> Dict[str, Any]:
+        """
+        Ingest postings for a search across all sources and report throughput
+        """
+        start = time.perf_counter()
+        jobs = [(source, url) for source in self.sources for url in source.page_urls(query, location)]
+        results = await asyncio.gather(*[self._ingest_page(source, url) for source, url in jobs])
+
+        pages = [result for result in results if result is not None]
+        postings = [posting for page_postings, _ in pages for posting in page_postings]
+        parse_times = sorted(parse_seconds for _, parse_seconds in pages)
+        # One transaction for the whole run, but it can still wait on another worker's write lock
+        inserted = await asyncio.to_thread(self.store.add_many, postings) if postings else 0
+        elapsed = time.perf_counter() - start
+
+        report = {
+            "pages": len(pages),
+            "failedOrSkippedPages": len(jobs) - len(pages),
+            "postingsParsed": len(postings),
+            "postingsInserted": inserted,
+            "duplicates": len(postings) - inserted,
+            "elapsedSeconds": round(elapsed, 3),
+            "pagesPerSecond": round(len(pages) / elapsed, 2) if elapsed else 0.0,
+            "parseMsPerPage": round(sum(parse_times) / len(parse_times) * 1000, 2) if parse_times else 0.0,
+            "parseMsP95": round(parse_times[int(0.95 * (len(parse_times) - 1))] * 1000, 2) if parse_times else 0.0,
+        }
+        logger.info(f"Ingested postings for '{query}': {report}")
+        return report
+
+    async def _ingest_page(self, source: JobSource, url: str) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        try:
+            if not await self.robots.allowed(url):
+                logger.info(f"robots.txt disallows {url}")
+                return None
+            await self.rate_limiter.wait(urlsplit(url).netloc)
+            response = await self.client.get(url)
+            response.raise_for_status()
+
+            loop = asyncio.get_running_loop()
+            raw_postings, parse_seconds = await loop.run_in_executor(
+                self.executor, parse_postings_page, response.text, source.selectors, url
+            )
+            return [self._normalize(raw, source) for raw in raw_postings if raw["title"]], parse_seconds
+        except Exception as e:
+            logger.error(f"Error ingesting {url}: {str(e)}")
+            return None
+
+    def _normalize(self, raw: Dict[str, Any], source: JobSource) -> Dict[str, Any]:
+        salary_min, salary_max = parse_salary_range(raw["salary"])
+        return dict(
+            raw,
+            source=source.name,
+            industry=source.industry,
+            # Postings only count towards a known role when their title clearly matches it
+            role=self.role_index.resolve(raw["title"]),
+            salary_min=salary_min,
+            salary_max=salary_max,
+            dedupe_key=posting_dedupe_key(raw["title"], raw["company"], raw["location"]),
+            fetched_at=time.time(),
+        )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
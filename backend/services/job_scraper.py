@@ -1,15 +1,23 @@
-import requests
 import asyncio
+import hashlib
 import logging
-from bs4 import BeautifulSoup
-from typing import Dict, List, Any
+import os
+import time
+from typing import Dict, List, Any, Optional
 import json
 import random
+from services.insights_aggregator import InsightsAggregator
+from services.job_ingestion import IngestionPipeline, PostingStore, load_job_sources
+from services.metrics import metrics
+from services.normalization import normalize_text
+from services.role_index import RoleIndex, role_key
+from services.shared_state import SharedStateStore
+from services.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 class JobScraper:
-    def __init__(self):
+    def __init__(self, shared_state: Optional[SharedStateStore] = None):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
@@ -53,43 +61,135 @@ class JobScraper:
                 "inDemandSkills": ["Network Security", "Incident Response", "SIEM", "Python", "Risk Assessment", "Compliance"]
             }
         }
+
+        # Built once so each lookup is an index query rather than a scan of every role
+        self.role_index = RoleIndex(self.mock_job_data.keys())
+        self.single_flight = SingleFlight("market_insights")
+        self.insight_sources = metrics.counter(
+            "market_insights_total", "Market insight lookups, by the data they were answered from", ("source",)
+        )
+
+        self.posting_store = PostingStore(os.getenv("JOB_POSTINGS_PATH", "job_postings.db"))
+        self.ingestion = IngestionPipeline(
+            load_job_sources(), self.posting_store, self.role_index, headers=self.headers,
+            shared_state=shared_state
+        )
+        self.aggregator = InsightsAggregator(
+            self.posting_store, min_postings=int(os.getenv("INSIGHTS_MIN_POSTINGS", "5"))
+        )
+
+        # With several workers, postings ingested by one reach the others' rollups on this interval
+        self.shared_state = shared_state
+        self.rollup_sync_interval = float(os.getenv("INSIGHTS_SYNC_INTERVAL", "5"))
+        self._next_rollup_sync = 0.0
     
     async def get_market_insights(self, job_title: str) -> Dict[str, Any]:
         """
         Get market insights for a specific job title
         """
+        with metrics.stage("insightsLookup"):
+            return await self.single_flight.do(
+                normalize_text(job_title), lambda: self._lookup_market_insights(job_title)
+            )
+
+    async def in_demand_skills(self, job_title: str) -> List[str]:
+        """
+        Skills employers ask for in a role, from the same lookup as its market insights;
+        empty unless the title confidently matches a known role or has posting rollups
+        """
+        await self._sync_rollups()
+        if self.role_index.best_match(job_title) is None and self.aggregator.role_insights(role_key(job_title)) is None:
+            # Generic insights only guess skills from title keywords; a gap against them misleads the prompt
+            logger.info(f"No confident role match for {job_title}, skipping in-demand skills")
+            return []
+        insights = await self.get_market_insights(job_title)
+        return insights.get("inDemandSkills", [])
+
+    async def get_market_insights_batch(self, job_titles: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Market insights for many job titles, keyed by title as given; titles that normalize alike are looked up once,
+        and through the same single-flight as single-title requests so concurrent lookups of a title are shared
+        """
+        with metrics.stage("insightsBatchLookup"):
+            await self._sync_rollups()
+            by_key: Dict[str, Dict[str, Any]] = {}
+            results: Dict[str, Dict[str, Any]] = {}
+            for job_title in job_titles:
+                key = normalize_text(job_title)
+                if key not in by_key:
+                    by_key[key] = await self.single_flight.do(
+                        key, lambda title=job_title: self._lookup_market_insights(title)
+                    )
+                results[job_title] = by_key[key]
+            logger.info(f"Resolved market insights for {len(job_titles)} titles ({len(by_key)} distinct)")
+            return results
+
+    async def _lookup_market_insights(self, job_title: str) -> Dict[str, Any]:
+        """
+        Resolve market insights for a job title from known role data or generic estimates
+        """
         try:
-            # Normalize job title for lookup
-            normalized_title = job_title.lower().strip()
-            
+            await self._sync_rollups()
+            matched_role = self.role_index.best_match(job_title)
+
+            # Prefer rollups precomputed from real postings when there are enough of them,
+            # first for the exact title and then for the known role it matched
+            rollup_role = role_key(job_title)
+            rollup = self.aggregator.role_insights(rollup_role)
+            if rollup is None and matched_role is not None:
+                rollup_role = matched_role
+                rollup = self.aggregator.role_insights(matched_role)
+            if rollup is not None:
+                logger.info(f"Found posting rollups for: {job_title} ({rollup['postings']} postings)")
+                base = self.mock_job_data.get(rollup_role) or self._get_fallback_insights(job_title)
+                self.insight_sources.inc(source="rollup")
+                return self._apply_rollup(base, rollup)
+
             # Check if we have mock data for this job
-            for key, data in self.mock_job_data.items():
-                if key in normalized_title or any(word in normalized_title for word in key.split()):
-                    logger.info(f"Found market insights for: {job_title}")
-                    return data
+            if matched_role is not None:
+                logger.info(f"Found market insights for: {job_title} (matched {matched_role})")
+                self.insight_sources.inc(source="known")
+                return self.mock_job_data[matched_role]
             
             # If no specific data found, try to scrape or return generic data
+            self.insight_sources.inc(source="generic")
             return await self._get_generic_insights(job_title)
             
         except Exception as e:
             logger.error(f"Error getting market insights: {str(e)}")
+            self.insight_sources.inc(source="fallback")
             return self._get_fallback_insights(job_title)
     
+    def _apply_rollup(self, base: Dict[str, Any], rollup: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Overlay posting-derived figures on base insights, keeping base values the rollup cannot provide
+        """
+        insights = dict(base)
+        for field in ("averageSalary", "jobGrowth", "topCompanies", "inDemandSkills"):
+            if rollup.get(field):
+                insights[field] = rollup[field]
+        insights["postings"] = rollup["postings"]
+        insights["salaryPercentiles"] = rollup["salaryPercentiles"]
+        return insights
+
     async def _get_generic_insights(self, job_title: str) -> Dict[str, Any]:
         """
         Generate generic insights for jobs not in our mock data
         """
         # In a real implementation, this would scrape job sites like Indeed, LinkedIn, etc.
-        # For now, we'll return reasonable generic data
+        # For now, we'll return reasonable generic data, seeded from the normalized title so
+        # the same title always gets the same figures and responses stay cacheable
+        seed = hashlib.sha256(role_key(job_title).encode("utf-8")).digest()
+        rng = random.Random(int.from_bytes(seed[:8], "big"))
         
-        base_salary = random.randint(60, 120)
+        base_salary = rng.randint(60, 120)
         salary_range = f"${base_salary},000 - ${base_salary + 40},000"
         
         growth_rates = ["+15% (Faster than average)", "+10% (Average growth)", "+25% (Much faster than average)"]
-        job_growth = random.choice(growth_rates)
+        job_growth = rng.choice(growth_rates)
         
         generic_companies = ["Google", "Microsoft", "Amazon", "Apple", "Meta", "IBM", "Oracle", "Salesforce"]
-        top_companies = random.sample(generic_companies, 5)
+        top_companies = rng.sample(generic_companies, 5)
         
         # Generate skills based on job title keywords
         skill_mapping = {
@@ -142,6 +242,11 @@ class JobScraper:
             }
             
             normalized_industry = industry.lower().strip()
+
+            await self._sync_rollups()
+            rollup = self.aggregator.industry_insights(normalized_industry)
+            if rollup is not None and rollup["inDemandSkills"]:
+                return rollup["inDemandSkills"]
             
             for key, skills in trending_skills.items():
                 if key in normalized_industry:
@@ -154,13 +259,37 @@ class JobScraper:
             logger.error(f"Error getting trending skills: {str(e)}")
             return ["Communication", "Problem Solving", "Digital Skills", "Adaptability", "Teamwork"]
     
+    async def get_trending_skills_batch(self, industries: List[str]) -> Dict[str, List[str]]:
+        """
+        Trending skills for many industries, keyed by industry as given; each distinct industry is looked up once
+        """
+        await self._sync_rollups()
+        by_key: Dict[str, List[str]] = {}
+        results: Dict[str, List[str]] = {}
+        for industry in industries:
+            key = industry.lower().strip()
+            if key not in by_key:
+                by_key[key] = await self.get_trending_skills(industry)
+            results[industry] = by_key[key]
+        return results
+
     async def scrape_job_postings(self, job_title: str, location: str = "Remote") -> List[Dict[str, Any]]:
         """
-        Scrape job postings from various job sites (mock implementation)
-        In production, this would scrape real job sites with proper rate limiting and respect for robots.txt
+        Ingest fresh postings for a job title from the configured job sources and return the stored matches.
+        Sources are read from JOB_SOURCES_PATH; fetching respects robots.txt and per-host rate limits.
         """
         try:
-            # Mock job postings
+            if self.ingestion.sources:
+                report = await self.ingestion.run(job_title, location)
+                if report["postingsInserted"]:
+                    await asyncio.to_thread(self.aggregator.refresh)
+
+            role = self.role_index.resolve(job_title)
+            postings = await asyncio.to_thread(self.posting_store.search, role, job_title, location)
+            if postings or self.ingestion.sources:
+                return postings
+
+            # No sources configured: keep returning demonstration postings
             mock_postings = [
                 {
                     "title": f"Senior {job_title}",
@@ -185,3 +314,25 @@ class JobScraper:
         except Exception as e:
             logger.error(f"Error scraping job postings: {str(e)}")
             return []
+
+    async def warm_up(self) -> None:
+        """
+        Load the insight rollups from stored postings; run at startup rather than on import
+        """
+        await asyncio.to_thread(self.aggregator.refresh)
+
+    async def _sync_rollups(self) -> None:
+        """
+        Fold in postings other worker processes stored since the last check
+        """
+        if self.shared_state is None or time.monotonic() < self._next_rollup_sync:
+            return
+        self._next_rollup_sync = time.monotonic() + self.rollup_sync_interval
+        if self.aggregator.has_new_postings():
+            await asyncio.to_thread(self.aggregator.refresh)
+
+    async def aclose(self) -> None:
+        """
+        Release the ingestion HTTP pool and parser workers
+        """
+        await self.ingestion.aclose()
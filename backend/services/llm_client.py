@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Optional, Tuple, Type
+
+from services.admission import AdmissionController
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+# Completion tokens charged to the budget for calls that do not set max_tokens
+DEFAULT_COMPLETION_ESTIMATE = 1000
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """
+    Rough token cost of a chat request before it is sent: prompt characters / 4 plus max_tokens
+    """
+    prompt_chars = sum(len(message.get("content") or "") for message in request.get("messages", []))
+    return prompt_chars // 4 + (request.get("max_tokens") or DEFAULT_COMPLETION_ESTIMATE)
+
+
+class HeldStream:
+    """
+    A streamed completion that holds its LLM concurrency slot until it is exhausted or closed
+    """
+
+    def __init__(self, stream: Any, release: Callable[[], None]):
+        self.stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        try:
+            async for chunk in self.stream:
+                yield chunk
+        finally:
+            await self.aclose()
+
+    async def aclose(self) -> None:
+        if self._release is None:
+            return
+        release, self._release = self._release, None
+        try:
+            response = getattr(self.stream, "response", None)
+            if response is not None:
+                await response.aclose()
+        finally:
+            release()
+
+
+class LLMClient:
+    """
+    Shared async chat-completion client backed by a pooled httpx connection pool.
+
+    All settings default to environment variables so the client can be pointed
+    at a local stub server (OPENAI_BASE_URL) for development and load testing.
+    With an admission controller, every attempt first takes its estimated
+    tokens from the shared request/token budget.
+
+    The OpenAI SDK and httpx are imported when the client is first used (or
+    warmed up at startup) rather than at import time; they are the slowest
+    imports in the app.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("LLM_MAX_RETRIES", "2"))
+        self.backoff_base = backoff_base if backoff_base is not None else float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+        self.backoff_max = backoff_max if backoff_max is not None else float(os.getenv("LLM_BACKOFF_MAX", "8.0"))
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+        self.limits = {
+            "max_connections": max_connections or int(os.getenv("LLM_MAX_CONNECTIONS", "20")),
+            "max_keepalive_connections": max_keepalive_connections or int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        }
+        self.timeout = timeout or float(os.getenv("LLM_TIMEOUT", "60"))
+        self.connect_timeout = connect_timeout or float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY", "your-openai-api-key-here")
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+        self.http_client: Optional["httpx.AsyncClient"] = None
+        self._client: Any = None
+        self._retryable_errors: Tuple[Type[BaseException], ...] = ()
+        # Startup warm-up builds the client in a thread while early requests may too
+        self._client_lock = threading.Lock()
+
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.admission = admission
+
+    @property
+    def client(self) -> Any:
+        """
+        The OpenAI SDK client and its connection pool, built on first access
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import httpx
+                    import openai
+
+                    # Errors worth retrying: the request never reached the model or the upstream
+                    # asked us to back off. Everything else (bad request, auth) fails immediately.
+                    self._retryable_errors = (
+                        openai.APIConnectionError,
+                        openai.APITimeoutError,
+                        openai.RateLimitError,
+                        openai.InternalServerError,
+                    )
+                    request_timeout = httpx.Timeout(self.timeout, connect=self.connect_timeout)
+                    self.http_client = httpx.AsyncClient(limits=httpx.Limits(**self.limits), timeout=request_timeout)
+                    self._client = openai.AsyncOpenAI(
+                        api_key=self.api_key,
+                        base_url=self.base_url,
+                        http_client=self.http_client,
+                        timeout=request_timeout,
+                        # Retries are handled here so backoff is configurable and counted
+                        max_retries=0,
+                    )
+        return self._client
+
+    async def create_chat_completion(self, **kwargs: Any) -> Any:
+        """
+        Create a chat completion, retrying transient failures with jittered exponential backoff
+        """
+        client = self.client
+        attempt = 0
+        while True:
+            ticket = None
+            if self.admission is not None:
+                ticket = await self.admission.acquire(estimate_tokens(kwargs))
+            try:
+                await self._semaphore.acquire()
+                try:
+                    response = await client.chat.completions.create(**kwargs)
+                except BaseException:
+                    self._semaphore.release()
+                    raise
+                if kwargs.get("stream"):
+                    # A stream occupies its connection until it is read to the end or closed
+                    response = HeldStream(response, self._semaphore.release)
+                else:
+                    self._semaphore.release()
+                if ticket is not None:
+                    # Streams report no usage, so their estimate stands
+                    usage = getattr(response, "usage", None)
+                    self.admission.settle(ticket, usage.total_tokens if usage else None)
+                return response
+            except self._retryable_errors as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                delay = random.uniform(delay / 2, delay)
+                attempt += 1
+                logger.warning(f"LLM call failed ({type(e).__name__}), retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """
+        Close the underlying connection pool
+        """
+        if self.http_client is not None:
+            await self.http_client.aclose()
@@ -0,0 +1,322 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; covers in-process stages (sub-millisecond) through slow LLM calls
+STAGE_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Seconds a timer fired late; anything above a few ms means blocking work on the loop
+LOOP_LAG_BUCKETS_SECONDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+# Stage durations (ms) of the current request when it asked for a profile
+_profile: contextvars.ContextVar = contextvars.ContextVar("request_profile", default=None)
+
+# (name, type, help, [(name suffix, labels, value), ...]) as produced by collectors
+Sample = Tuple[str, Dict[str, str], float]
+MetricFamily = Tuple[str, str, str, List[Sample]]
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram with fixed millisecond buckets
+    """
+
+    def __init__(self, buckets: Tuple[int, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = {}
+        running = 0
+        for bound, count in zip([str(b) for b in self.buckets] + ["+Inf"], self.counts):
+            running += count
+            cumulative[bound] = running
+        return {
+            "count": self.count,
+            "meanMs": round(self.total_ms / self.count, 1) if self.count else None,
+            "bucketsMs": cumulative,
+        }
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def collect(self) -> List[MetricFamily]:
+        samples = [("", dict(zip(self.labels, key)), value) for key, value in self.values.items()]
+        return [(self.name, "counter", self.help, samples)]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...], labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labels = labels
+        # Per label set: bucket counts (last one is +Inf), sum, count
+        self.series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def collect(self) -> List[MetricFamily]:
+        samples: List[Sample] = []
+        for key, (bucket_counts, total, count) in self.series.items():
+            samples.extend(histogram_samples(dict(zip(self.labels, key)), self.buckets, bucket_counts, total, count))
+        return [(self.name, "histogram", self.help, samples)]
+
+
+def histogram_samples(
+    labels: Dict[str, str], bounds: Tuple[float, ...], bucket_counts: List[int], total: float, count: int
+) -> List[Sample]:
+    """
+    Prometheus _bucket/_sum/_count samples from per-bucket (non-cumulative) counts, +Inf last
+    """
+    samples: List[Sample] = []
+    running = 0
+    for bound, bucket_count in zip([_format_value(bound) for bound in bounds] + ["+Inf"], bucket_counts):
+        running += bucket_count
+        samples.append(("_bucket", dict(labels, le=bound), running))
+    samples.append(("_sum", labels, total))
+    samples.append(("_count", labels, count))
+    return samples
+
+
+def latency_family(name: str, help: str, label: str, histograms: Dict[str, LatencyHistogram]) -> MetricFamily:
+    """
+    Export millisecond LatencyHistograms (one per label value) as a histogram in seconds
+    """
+    samples: List[Sample] = []
+    for value, histogram in histograms.items():
+        samples.extend(histogram_samples(
+            {label: value},
+            tuple(bound / 1000 for bound in histogram.buckets),
+            histogram.counts,
+            histogram.total_ms / 1000,
+            histogram.count
+        ))
+    return (name, "histogram", help, samples)
+
+
+def stat_family(name: str, kind: str, help: str, values: Any, label: Optional[str] = None) -> MetricFamily:
+    """
+    A counter or gauge family from a plain stats value, or a {label value: value} dict when `label` is set
+    """
+    if label is None:
+        return (name, kind, help, [("", {}, values)])
+    return (name, kind, help, [("", {label: key}, value) for key, value in values.items()])
+
+
+class MetricsRegistry:
+    """
+    In-process metrics rendered in the Prometheus text exposition format.
+
+    Counters and histograms are recorded on the hot path with a dict update;
+    collectors are called only when /metrics is scraped, so services can keep
+    their own counters and export them without double bookkeeping.
+    """
+
+    def __init__(self, prefix: str = "pathpilot"):
+        self.prefix = prefix
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Callable[[], List[MetricFamily]]] = []
+        self.stage_seconds = self.histogram(
+            "stage_duration_seconds", "Time spent in each request pipeline stage", STAGE_BUCKETS_SECONDS, ("stage",)
+        )
+
+    def counter(self, name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+        name = f"{self.prefix}_{name}"
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, help, labels)
+        return self._metrics[name]
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...], labels: Tuple[str, ...] = ()) -> Histogram:
+        name = f"{self.prefix}_{name}"
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, help, buckets, labels)
+        return self._metrics[name]
+
+    def collector(self, fn: Callable[[], List[MetricFamily]]) -> None:
+        """
+        Register a callable returning metric families (names without the prefix) at scrape time
+        """
+        self._collectors.append(fn)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a block as a pipeline stage
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_stage(name, time.perf_counter() - start)
+
+    def observe_stage(self, name: str, seconds: float) -> None:
+        self.stage_seconds.observe(seconds, stage=name)
+        profile = _profile.get()
+        if profile is not None:
+            profile[name] = profile.get(name, 0.0) + seconds * 1000
+
+    def render(self) -> str:
+        families: List[MetricFamily] = []
+        for metric in self._metrics.values():
+            families.extend(metric.collect())
+        for fn in self._collectors:
+            families.extend(
+                (f"{self.prefix}_{name}", kind, help, samples) for name, kind, help, samples in fn()
+            )
+
+        lines: List[str] = []
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(
+                f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}" for suffix, labels, value in samples
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and their latency per route.
+
+    A request sent with the profile header gets the stage breakdown recorded
+    while it ran back as an X-Stage-Timings header in Server-Timing syntax.
+    Streams start before any stage finishes, so they report timings in their
+    final event instead.
+    """
+
+    def __init__(self, app: Any, registry: Optional["MetricsRegistry"] = None, profile_header: Optional[str] = None):
+        self.app = app
+        self.registry = registry or metrics
+        self.profile_header = (profile_header or os.getenv("METRICS_PROFILE_HEADER", "x-profile")).lower().encode()
+        self.profiling_enabled = os.getenv("METRICS_PROFILING_ENABLED", "true").lower() == "true"
+        self.requests = self.registry.counter(
+            "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+        )
+        self.latency = self.registry.histogram(
+            "http_request_duration_seconds", "HTTP request latency by route", STAGE_BUCKETS_SECONDS, ("method", "route")
+        )
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile: Optional[Dict[str, float]] = None
+        if self.profiling_enabled and any(
+            name == self.profile_header and value not in (b"", b"0") for name, value in scope["headers"]
+        ):
+            profile = {}
+        token = _profile.set(profile)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile:
+                    timings = ", ".join(f"{name};dur={ms:.1f}" for name, ms in profile.items())
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-stage-timings", timings.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            self.requests.inc(method=scope["method"], route=route_path, status=str(status))
+            self.latency.observe(time.perf_counter() - start, method=scope["method"], route=route_path)
+
+
+class EventLoopLagMonitor:
+    """
+    Measure event-loop lag: how late a periodic sleep wakes up compared to its deadline
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None, interval: Optional[float] = None):
+        self.registry = registry or metrics
+        self.interval = interval if interval is not None else float(os.getenv("EVENT_LOOP_LAG_INTERVAL", "0.25"))
+        self.lag = self.registry.histogram(
+            "event_loop_lag_seconds", "How late event-loop timers fire", LOOP_LAG_BUCKETS_SECONDS
+        )
+        self.max_lag = 0.0
+        self.registry.collector(lambda: [
+            stat_family("event_loop_lag_max_seconds", "gauge", "Largest event-loop lag seen", self.max_lag)
+        ])
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            deadline = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - deadline)
+            self.lag.observe(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+
+# Process-wide registry; each worker process exports its own series
+metrics = MetricsRegistry()
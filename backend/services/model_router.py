@@ -0,0 +1,309 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from services.admission import AdmissionRejected
+from services.llm_client import LLMClient
+from services.metrics import LatencyHistogram
+from services.normalization import ROLE_ALIASES, bucket_experience, split_skills
+from services.prompt_builder import RoadmapPrompt
+from services.role_index import role_key
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_TIER = "template"
+FAST_TIER = "fast"
+QUALITY_TIER = "quality"
+
+# Where a request goes when its primary tier is slow or fails
+SECONDARY_TIERS = {
+    FAST_TIER: QUALITY_TIER,
+    QUALITY_TIER: FAST_TIER,
+}
+
+LATENCY_BUCKETS_MS = (250, 500, 1000, 2000, 5000, 10000, 20000, 30000, 60000)
+
+# Targets the fast tier is trusted with when nothing else marks the request as complex
+COMMON_ROLES = frozenset(ROLE_ALIASES.values())
+
+
+class RoutingRequest:
+    def __init__(self, current_role: str, current_skills: str, dream_job: str, experience: str, prompt: RoadmapPrompt, additional_info: Optional[str] = None):
+        self.current_role = current_role
+        self.current_skills = current_skills
+        self.dream_job = dream_job
+        self.experience = experience
+        self.additional_info = additional_info
+        self.prompt = prompt
+
+    @property
+    def transition(self) -> str:
+        return f"{role_key(self.current_role)}->{role_key(self.dream_job)}"
+
+
+class ModelReply:
+    def __init__(self, text: str, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+class RouteResult:
+    def __init__(self, reply: ModelReply, tier: str, model: str, hedged: bool):
+        self.reply = reply
+        self.tier = tier
+        self.model = model
+        self.hedged = hedged
+
+
+class ChatModelBackend:
+    """
+    One chat model behind the shared LLM client
+    """
+
+    def __init__(self, client: LLMClient, model: str, temperature: float = 0.7):
+        self.client = client
+        self.model = model
+        self.temperature = temperature
+
+    async def complete(self, request: RoutingRequest) -> ModelReply:
+        response = await self.client.create_chat_completion(
+            model=self.model,
+            messages=request.prompt.messages,
+            temperature=self.temperature,
+            max_tokens=request.prompt.max_tokens
+        )
+        usage = response.usage
+        return ModelReply(
+            response.choices[0].message.content,
+            usage.prompt_tokens if usage else None,
+            usage.completion_tokens if usage else None
+        )
+
+    async def stream(self, request: RoutingRequest) -> AsyncIterator[str]:
+        stream = await self.client.create_chat_completion(
+            model=self.model,
+            messages=request.prompt.messages,
+            temperature=self.temperature,
+            max_tokens=request.prompt.max_tokens,
+            stream=True
+        )
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        finally:
+            # Gives the connection and the client's concurrency slot back if the reader stops early
+            await stream.aclose()
+
+
+class TemplateBackend:
+    """
+    Canned roadmaps for common transitions, keyed by canonical from/to roles
+    """
+
+    model = "template"
+
+    def __init__(self, templates: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.templates = templates or {}
+
+    def has(self, request: RoutingRequest) -> bool:
+        return request.transition in self.templates
+
+    async def complete(self, request: RoutingRequest) -> ModelReply:
+        return ModelReply(json.dumps({"steps": self.templates[request.transition]}), 0, 0)
+
+    async def stream(self, request: RoutingRequest) -> AsyncIterator[str]:
+        yield (await self.complete(request)).text
+
+
+def load_roadmap_templates(path: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load template roadmaps from the JSON file at ROADMAP_TEMPLATES_PATH, if it exists
+    """
+    path = path or os.getenv("ROADMAP_TEMPLATES_PATH", "roadmap_templates.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {
+            f"{role_key(template['from'])}->{role_key(template['to'])}": template["steps"]
+            for template in json.load(f)
+        }
+
+
+class ModelRouter:
+    """
+    Route roadmap requests across model tiers.
+
+    Transitions with a template are answered from it, simple requests go to the
+    fast model and complex ones to the quality model. If the primary tier has
+    not answered within its latency SLO, the secondary tier is started as a
+    hedge and whichever answers first wins; a failed primary hands over to the
+    secondary straight away. Backends are plain objects with complete() and
+    stream(), so tests can swap in stubs.
+    """
+
+    def __init__(
+        self,
+        backends: Dict[str, Any],
+        slos: Optional[Dict[str, float]] = None,
+        mode: Optional[str] = None,
+        complex_notes_words: Optional[int] = None,
+        complex_skill_count: Optional[int] = None
+    ):
+        self.backends = backends
+        self.slos = slos if slos is not None else {
+            FAST_TIER: float(os.getenv("ROADMAP_FAST_SLO", "10")),
+            QUALITY_TIER: float(os.getenv("ROADMAP_QUALITY_SLO", "30")),
+        }
+        self.mode = mode or os.getenv("ROADMAP_ROUTING", "tiered")
+        self.complex_notes_words = complex_notes_words or int(os.getenv("ROUTING_COMPLEX_NOTES_WORDS", "40"))
+        self.complex_skill_count = complex_skill_count or int(os.getenv("ROUTING_COMPLEX_SKILL_COUNT", "15"))
+
+        self.decisions: Counter = Counter()
+        self.reasons: Counter = Counter()
+        self.outcomes: Counter = Counter()
+        self.latency = {tier: LatencyHistogram(LATENCY_BUCKETS_MS) for tier in backends}
+
+    def complexity_reasons(self, request: RoutingRequest) -> List[str]:
+        """
+        Why a request needs the quality tier; an empty list means it is simple
+        """
+        reasons = []
+        if role_key(request.dream_job) not in COMMON_ROLES:
+            reasons.append("uncommonTarget")
+        if bucket_experience(request.experience) in ("senior", "lead"):
+            reasons.append("seniority")
+        if len(split_skills(request.current_skills)) > self.complex_skill_count:
+            reasons.append("manySkills")
+        if request.additional_info and len(request.additional_info.split()) > self.complex_notes_words:
+            reasons.append("detailedNotes")
+        return reasons
+
+    def choose_tier(self, request: RoutingRequest) -> str:
+        if self.mode != "tiered" or FAST_TIER not in self.backends:
+            tier = QUALITY_TIER
+        else:
+            template = self.backends.get(TEMPLATE_TIER)
+            if template is not None and not request.additional_info and template.has(request):
+                tier = TEMPLATE_TIER
+            else:
+                reasons = self.complexity_reasons(request)
+                self.reasons.update(reasons)
+                tier = QUALITY_TIER if reasons else FAST_TIER
+
+        self.decisions[tier] += 1
+        return tier
+
+    async def complete(self, request: RoutingRequest) -> RouteResult:
+        """
+        Answer a request from its routed tier, hedging to the secondary tier on a missed SLO or failure
+        """
+        primary = self.choose_tier(request)
+        secondary = SECONDARY_TIERS.get(primary)
+        if secondary not in self.backends:
+            secondary = None
+
+        tasks = {asyncio.create_task(self._timed(primary, request)): primary}
+        hedged = False
+        first_error: Optional[BaseException] = None
+        try:
+            timeout = self.slos.get(primary) if secondary else None
+            while tasks:
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Primary is past its SLO: race the secondary against it
+                    hedged = True
+                    timeout = None
+                    self.outcomes["hedged"] += 1
+                    logger.info(f"Roadmap {primary} tier missed its {self.slos[primary]}s SLO, hedging to {secondary}")
+                    tasks[asyncio.create_task(self._timed(secondary, request))] = secondary
+                    continue
+
+                for task in done:
+                    tier = tasks.pop(task)
+                    if task.exception() is None:
+                        if tier != primary:
+                            self.outcomes["secondaryWins"] += 1
+                        return RouteResult(task.result(), tier, self.backends[tier].model, hedged)
+                    if isinstance(task.exception(), AdmissionRejected):
+                        # The other tier draws from the same LLM budget
+                        raise task.exception()
+                    first_error = first_error or task.exception()
+                    logger.warning(f"Roadmap {tier} tier failed: {task.exception()}")
+                    if tier == primary and secondary and not hedged:
+                        hedged = True
+                        timeout = None
+                        self.outcomes["failover"] += 1
+                        tasks[asyncio.create_task(self._timed(secondary, request))] = secondary
+            raise first_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stream(self, request: RoutingRequest) -> Tuple[str, AsyncIterator[str]]:
+        """
+        Pick a tier for a streamed request; streams are not hedged once they start producing output
+        """
+        tier = self.choose_tier(request)
+        return tier, self.backends[tier].stream(request)
+
+    def record_fallback(self):
+        """
+        Count a request that ended on the static fallback roadmap
+        """
+        self.outcomes["fallback"] += 1
+
+    async def _timed(self, tier: str, request: RoutingRequest) -> ModelReply:
+        start = time.perf_counter()
+        try:
+            reply = await self.backends[tier].complete(request)
+        except asyncio.CancelledError:
+            # A losing hedge was cut short; its partial latency is not a sample
+            raise
+        except Exception:
+            self.latency[tier].observe((time.perf_counter() - start) * 1000)
+            raise
+        self.latency[tier].observe((time.perf_counter() - start) * 1000)
+        return reply
+
+    def stats(self) -> Dict[str, Any]:
+        routed = sum(self.decisions.values())
+        return {
+            "mode": self.mode,
+            "models": {tier: backend.model for tier, backend in self.backends.items()},
+            "slosSeconds": self.slos,
+            "decisions": dict(self.decisions),
+            "complexityReasons": dict(self.reasons),
+            "hedged": self.outcomes["hedged"],
+            "failovers": self.outcomes["failover"],
+            "secondaryWins": self.outcomes["secondaryWins"],
+            "fallbacks": self.outcomes["fallback"],
+            "fallbackRate": round(self.outcomes["fallback"] / routed, 4) if routed else 0.0,
+            "latency": {tier: histogram.snapshot() for tier, histogram in self.latency.items()},
+        }
+
+
+def create_model_router(client: LLMClient) -> ModelRouter:
+    """
+    Build the router from environment configuration around a shared LLM client
+    """
+    backends: Dict[str, Any] = {
+        FAST_TIER: ChatModelBackend(client, os.getenv("ROADMAP_FAST_MODEL", "gpt-3.5-turbo")),
+        QUALITY_TIER: ChatModelBackend(client, os.getenv("ROADMAP_QUALITY_MODEL", "gpt-4")),
+    }
+    templates = load_roadmap_templates()
+    if templates:
+        backends[TEMPLATE_TIER] = TemplateBackend(templates)
+
+    router = ModelRouter(backends)
+    logger.info(
+        f"Model routing: {router.mode} (fast={backends[FAST_TIER].model}, "
+        f"quality={backends[QUALITY_TIER].model}, {len(templates)} templates)"
+    )
+    return router
@@ -0,0 +1,178 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Whole-title synonyms, applied after token-level abbreviation expansion
+ROLE_ALIASES = {
+    "swe": "software engineer",
+    "sde": "software engineer",
+    "software developer": "software engineer",
+    "software development engineer": "software engineer",
+    "programmer": "software engineer",
+    "ds": "data scientist",
+    "data science": "data scientist",
+    "mle": "machine learning engineer",
+    "ml engineer": "machine learning engineer",
+    "pm": "product manager",
+    "product owner": "product manager",
+    "ux": "ux designer",
+    "ui ux designer": "ux designer",
+    "ux ui designer": "ux designer",
+    "ui designer": "ux designer",
+    "user experience designer": "ux designer",
+    "devops": "devops engineer",
+    "sre": "devops engineer",
+    "site reliability engineer": "devops engineer",
+    "security analyst": "cybersecurity analyst",
+    "infosec analyst": "cybersecurity analyst",
+    "soc analyst": "cybersecurity analyst",
+}
+
+# Token-level abbreviations that show up inside longer titles ("Sr. ML Eng")
+ROLE_TOKEN_ALIASES = {
+    "sr": "senior",
+    "jr": "junior",
+    "eng": "engineer",
+    "engr": "engineer",
+    "dev": "developer",
+    "mgr": "manager",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+}
+
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "reactjs": "react",
+    "react.js": "react",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "nlp": "natural language processing",
+    "aws cloud": "aws",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "excel spreadsheets": "excel",
+}
+
+EXPERIENCE_BUCKETS = ("entry", "mid", "senior", "lead")
+
+_ROLE_PUNCTUATION = re.compile(r"[^\w+#\s]")
+_SKILL_SEPARATORS = re.compile(r"[,;|\n]+|\band\b|&")
+_WHITESPACE = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """
+    Lowercase and collapse whitespace
+    """
+    return _WHITESPACE.sub(" ", (text or "").lower()).strip()
+
+
+def canonicalize_role(role: str) -> str:
+    """
+    Map a free-text job title onto its canonical form ("Sr. SWE" -> "senior software engineer")
+    """
+    tokens = _ROLE_PUNCTUATION.sub(" ", normalize_text(role)).split()
+    expanded = " ".join(ROLE_TOKEN_ALIASES.get(token, token) for token in tokens)
+    if expanded in ROLE_ALIASES:
+        return ROLE_ALIASES[expanded]
+
+    # Resolve an alias that follows a seniority prefix, e.g. "senior swe"
+    for split_at in range(1, len(expanded.split())):
+        words = expanded.split()
+        prefix, rest = " ".join(words[:split_at]), " ".join(words[split_at:])
+        if rest in ROLE_ALIASES:
+            return f"{prefix} {ROLE_ALIASES[rest]}"
+    return expanded
+
+
+def canonicalize_skill(skill: str) -> str:
+    """
+    Canonical name of a single skill ("ReactJS" -> "react"), without splitting it on separators
+    """
+    name = normalize_text(skill).strip(" .")
+    return SKILL_ALIASES.get(name, name)
+
+
+def split_skills(skills: str) -> List[str]:
+    """
+    Split a free-text skill list into canonical skill names, de-duplicated in the order given
+    """
+    ordered: Dict[str, None] = {}
+    for raw in _SKILL_SEPARATORS.split(normalize_text(skills)):
+        skill = raw.strip(" .")
+        if skill:
+            ordered.setdefault(SKILL_ALIASES.get(skill, skill), None)
+    return list(ordered)
+
+
+def normalize_skills(skills: str) -> Tuple[str, ...]:
+    """
+    Split a free-text skill list into a sorted, de-duplicated tuple of canonical skill names
+    """
+    return tuple(sorted(split_skills(skills)))
+
+
+def bucket_experience(experience: str) -> str:
+    """
+    Collapse an experience description into entry/mid/senior/lead
+    """
+    text = normalize_text(experience)
+    for bucket in EXPERIENCE_BUCKETS:
+        if text.startswith(bucket):
+            return bucket
+    if any(word in text for word in ("junior", "beginner", "intern", "graduate", "student")):
+        return "entry"
+    if any(word in text for word in ("manager", "management", "principal", "staff", "director")):
+        return "lead"
+
+    numbers = _NUMBER.findall(text)
+    if not numbers:
+        return text or "unknown"
+    years = float(numbers[0])
+    if years < 2:
+        return "entry"
+    if years < 5:
+        return "mid"
+    if years < 8:
+        return "senior"
+    return "lead"
+
+
+def timeline_months(timeline: str) -> Optional[float]:
+    """
+    Parse a timeline such as "6-months" or "1 year" into months, or None if it has no duration
+    """
+    text = normalize_text(timeline)
+    numbers = _NUMBER.findall(text)
+    if not numbers:
+        return None
+    value = float(numbers[0])
+    if "year" in text or "yr" in text:
+        value *= 12
+    elif "week" in text:
+        value /= 4.345
+    return value
+
+
+def bucket_timeline(timeline: str) -> str:
+    """
+    Collapse a timeline into 3m/6m/12m/24m buckets ("flexible" and unparseable values pass through)
+    """
+    months = timeline_months(timeline)
+    if months is None:
+        return normalize_text(timeline) or "flexible"
+    if months <= 4:
+        return "3m"
+    if months <= 9:
+        return "6m"
+    if months <= 18:
+        return "12m"
+    return "24m"
@@ -0,0 +1,247 @@
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from models import RoadmapStep
+from services.normalization import split_skills
+from services.skill_gap import SkillGap
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_MESSAGE = (
+    "You are an expert career counselor. You write realistic, progressive, hands-on career "
+    "roadmaps tailored to a specific transition. Reply with JSON only."
+)
+
+STEP_SCHEMA = (
+    '{"steps":[{"phase":str,"duration":str,"skills":[str],"courses":[str],'
+    '"projects":[str],"description":str}]}'
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class TokenCounter:
+    """
+    Count and truncate text in model tokens, using tiktoken when it is installed
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, model: str = "gpt-4"):
+        self.model = model
+        self._encoding: Any = None
+        self._loaded = False
+
+    @property
+    def encoding(self) -> Any:
+        """
+        The tiktoken encoding, loaded on first use; None when tiktoken is not installed
+        """
+        if not self._loaded:
+            try:
+                import tiktoken
+            except ImportError:  # optional: fall back to a character-based estimate
+                tiktoken = None
+            if tiktoken is not None:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            self._loaded = True
+        return self._encoding
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text))
+        return max(1, -(-len(text) // self.CHARS_PER_TOKEN))
+
+    def truncate(self, text: str, budget: int) -> str:
+        """
+        Cut text to at most `budget` tokens, preferring a word boundary
+        """
+        if self.count(text) <= budget:
+            return text
+        if self.encoding is not None:
+            truncated = self.encoding.decode(self.encoding.encode(text)[:budget])
+        else:
+            truncated = text[:budget * self.CHARS_PER_TOKEN]
+        if " " in truncated:
+            truncated = truncated.rsplit(" ", 1)[0]
+        return truncated.rstrip(" ,;") + "…"
+
+
+class RoadmapPrompt:
+    def __init__(self, messages: List[Dict[str, str]], max_tokens: int, prompt_tokens: int, truncated: List[str]):
+        self.messages = messages
+        self.max_tokens = max_tokens
+        self.prompt_tokens = prompt_tokens
+        self.truncated = truncated
+
+
+class PromptBuilder:
+    """
+    Build compact, token-budgeted roadmap prompts.
+
+    Free-text fields are whitespace-collapsed and cut to per-field token
+    budgets: skills are de-duplicated and kept whole, in the order given, until
+    the budget runs out; additional info keeps its leading sentences. The
+    completion budget scales with the number of phases requested instead of a
+    fixed ceiling.
+    """
+
+    def __init__(
+        self,
+        phases: Optional[int] = None,
+        tokens_per_phase: Optional[int] = None,
+        max_completion_tokens: Optional[int] = None,
+        field_budget: Optional[int] = None,
+        skills_budget: Optional[int] = None,
+        additional_info_budget: Optional[int] = None,
+        model: str = "gpt-4"
+    ):
+        self.phases = phases or int(os.getenv("ROADMAP_PHASES", "4"))
+        self.tokens_per_phase = tokens_per_phase or int(os.getenv("ROADMAP_TOKENS_PER_PHASE", "260"))
+        self.max_completion_tokens = max_completion_tokens or int(os.getenv("ROADMAP_MAX_TOKENS", "2000"))
+        self.field_budget = field_budget or int(os.getenv("PROMPT_FIELD_TOKEN_BUDGET", "24"))
+        self.skills_budget = skills_budget or int(os.getenv("PROMPT_SKILLS_TOKEN_BUDGET", "120"))
+        self.additional_info_budget = additional_info_budget or int(os.getenv("PROMPT_ADDITIONAL_INFO_TOKEN_BUDGET", "150"))
+        self.counter = TokenCounter(model)
+
+    def build(
+        self,
+        current_role: str,
+        current_skills: str,
+        dream_job: str,
+        experience: str,
+        timeline: str,
+        additional_info: Optional[str] = None,
+        phases: Optional[int] = None,
+        skill_gap: Optional[SkillGap] = None
+    ) -> RoadmapPrompt:
+        phases = phases or self.phases
+        truncated: List[str] = []
+        lines = self._profile_lines(
+            current_role, current_skills, dream_job, experience, timeline, additional_info, truncated, skill_gap
+        )
+        lines.extend([
+            f"Return exactly {phases} phases as JSON: {STEP_SCHEMA}",
+            "Phases go from basics to advanced, fit the timeline, stay industry-relevant and build on "
+            "the current skills. Keep each list to 2-4 items and each description to one sentence.",
+        ])
+        return self._prompt(lines, phases, truncated)
+
+    def build_partial(
+        self,
+        current_role: str,
+        current_skills: str,
+        dream_job: str,
+        experience: str,
+        timeline: str,
+        additional_info: Optional[str],
+        steps: List[RoadmapStep],
+        rewrite: List[int],
+        skill_gap: Optional[SkillGap] = None
+    ) -> RoadmapPrompt:
+        """
+        Prompt for rewriting only the phases at `rewrite` (0-based) of an existing roadmap;
+        the other phases are summarised as fixed context
+        """
+        truncated: List[str] = []
+        lines = self._profile_lines(
+            current_role, current_skills, dream_job, experience, timeline, additional_info, truncated, skill_gap
+        )
+        lines.append(f"Existing {len(steps)}-phase roadmap:")
+        for index, step in enumerate(steps):
+            marker = "REWRITE" if index in rewrite else "keep"
+            lines.append(f"{index + 1}. [{marker}] {step.phase} ({step.duration}): {', '.join(step.skills)}")
+        numbers = ", ".join(str(index + 1) for index in rewrite)
+        lines.extend([
+            f"Return exactly {len(rewrite)} phases as JSON, replacing phase(s) {numbers} in order: {STEP_SCHEMA}",
+            "Fit them between the kept phases, skip skills the person already has, and keep each list "
+            "to 2-4 items and each description to one sentence.",
+        ])
+        return self._prompt(lines, len(rewrite), truncated)
+
+    def _profile_lines(
+        self,
+        current_role: str,
+        current_skills: str,
+        dream_job: str,
+        experience: str,
+        timeline: str,
+        additional_info: Optional[str],
+        truncated: List[str],
+        skill_gap: Optional[SkillGap] = None
+    ) -> List[str]:
+        def fit(name: str, value: Optional[str], budget: int) -> str:
+            compact = _WHITESPACE.sub(" ", value or "").strip()
+            fitted = self.counter.truncate(compact, budget)
+            if fitted != compact:
+                truncated.append(name)
+            return fitted
+
+        skills = self._fit_skills(current_skills, truncated)
+        lines = [
+            f'Career roadmap: "{fit("currentRole", current_role, self.field_budget)}" -> '
+            f'"{fit("dreamJob", dream_job, self.field_budget)}".',
+            f"Current skills: {skills or 'not specified'}",
+            f"Experience: {fit('experience', experience, self.field_budget)}",
+            f"Timeline: {fit('timeline', timeline, self.field_budget)}",
+        ]
+        if skill_gap is not None and skill_gap.missing:
+            # The gap is what the phases should teach; covered skills need no phase of their own
+            lines.append(f"Skill gap to close: {', '.join(skill_gap.missing)}")
+            if skill_gap.covered:
+                lines.append(f"Already has (do not teach): {', '.join(target for target, _, _ in skill_gap.covered)}")
+        if additional_info and additional_info.strip():
+            lines.append(f"Notes: {self._fit_sentences(additional_info, truncated)}")
+        return lines
+
+    def _prompt(self, lines: List[str], phases: int, truncated: List[str]) -> RoadmapPrompt:
+        messages = [
+            {"role": "system", "content": SYSTEM_MESSAGE},
+            {"role": "user", "content": "\n".join(lines)},
+        ]
+        prompt_tokens = sum(self.counter.count(message["content"]) for message in messages)
+        if truncated:
+            logger.info(f"Prompt fields truncated to budget: {', '.join(truncated)}")
+
+        return RoadmapPrompt(messages, self.max_tokens_for(phases), prompt_tokens, truncated)
+
+    def max_tokens_for(self, phases: int) -> int:
+        """
+        Completion budget for a roadmap with the given number of phases
+        """
+        return min(self.max_completion_tokens, phases * self.tokens_per_phase + 40)
+
+    def _fit_skills(self, current_skills: str, truncated: List[str]) -> str:
+        kept: List[str] = []
+        used = 0
+        for skill in split_skills(current_skills):
+            cost = self.counter.count(skill) + 1
+            if used + cost > self.skills_budget:
+                truncated.append("currentSkills")
+                break
+            kept.append(skill)
+            used += cost
+        return ", ".join(kept)
+
+    def _fit_sentences(self, text: str, truncated: List[str]) -> str:
+        compact = _WHITESPACE.sub(" ", text).strip()
+        kept: List[str] = []
+        used = 0
+        for sentence in _SENTENCE_END.split(compact):
+            cost = self.counter.count(sentence)
+            if used + cost > self.additional_info_budget:
+                if not kept:
+                    kept.append(self.counter.truncate(sentence, self.additional_info_budget))
+                truncated.append("additionalInfo")
+                break
+            kept.append(sentence)
+            used += cost
+        return " ".join(kept)
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from models import CareerFormData
+from services.admission import PRIORITY_BATCH, AdmissionRejected, llm_priority
+from services.roadmap_cache import roadmap_cache_key
+from services.roadmap_store import PrecomputedRoadmapStore
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPacer:
+    """
+    Space out request starts evenly so a batch stays under a requests-per-minute budget
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class BatchRunner:
+    """
+    Generate roadmaps for many form submissions with bounded concurrency and pacing,
+    writing each successful result to the precomputed store as soon as it completes.
+
+    The store doubles as the checkpoint: re-running the same input after a crash
+    skips every roadmap that was already written. Batch LLM calls queue behind
+    interactive ones and are the first to be shed; a shed item is put back on
+    the queue after the advertised Retry-After.
+    """
+
+    def __init__(
+        self,
+        generator: Any,
+        store: PrecomputedRoadmapStore,
+        concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.generator = generator
+        self.on_progress = on_progress
+        self.store = store
+        self.concurrency = concurrency or int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.requests_per_minute = (
+            requests_per_minute if requests_per_minute is not None
+            else float(os.getenv("BATCH_REQUESTS_PER_MINUTE", "60"))
+        )
+        self.task: Optional["asyncio.Task[Dict[str, Any]]"] = None
+
+        self.status = "pending"
+        self.total = 0
+        self.skipped = 0
+        self.completed = 0
+        self.failed = 0
+        self.throttled = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    async def run(self, forms: List[CareerFormData]) -> Dict[str, Any]:
+        """
+        Generate and store roadmaps for every form not already in the store
+        """
+        self.status = "running"
+        self.started_at = time.monotonic()
+        self.total = len(forms)
+        workers: List["asyncio.Task[None]"] = []
+
+        try:
+            unique: Dict[str, CareerFormData] = {}
+            for form in forms:
+                unique.setdefault(self._key(form), form)
+            done = await asyncio.to_thread(self.store.existing_keys, list(unique))
+            pending = [(key, form) for key, form in unique.items() if key not in done]
+            self.skipped = self.total - len(pending)
+            logger.info(f"Batch: {len(pending)} roadmaps to generate, {self.skipped} skipped (duplicate or already stored)")
+            self._publish()
+
+            queue: "asyncio.Queue[Any]" = asyncio.Queue()
+            for item in pending:
+                queue.put_nowait(item)
+            pacer = RequestPacer(self.requests_per_minute)
+
+            workers.extend(
+                asyncio.create_task(self._worker(queue, pacer))
+                for _ in range(min(self.concurrency, len(pending)))
+            )
+            await asyncio.gather(*workers)
+            self.status = "completed"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Batch failed: {str(e)}")
+            self.status = "failed"
+        finally:
+            # A failed or cancelled gather leaves the other workers running; stop them before reporting
+            for worker in workers:
+                worker.cancel()
+            if workers:
+                await asyncio.gather(*workers, return_exceptions=True)
+            self.finished_at = time.monotonic()
+
+        report = self.report()
+        logger.info(f"Batch {self.status}: {report}")
+        self._publish()
+        return report
+
+    async def _worker(self, queue: "asyncio.Queue[Any]", pacer: RequestPacer) -> None:
+        # Each worker runs in its own task, so this only lowers the batch's own calls
+        llm_priority.set(PRIORITY_BATCH)
+        while not queue.empty():
+            key, form = queue.get_nowait()
+            await pacer.wait()
+            try:
+                result = await self.generator.generate_roadmap(
+                    current_role=form.currentRole,
+                    current_skills=form.currentSkills,
+                    dream_job=form.dreamJob,
+                    experience=form.experience,
+                    timeline=form.timeline,
+                    additional_info=form.additionalInfo
+                )
+            except AdmissionRejected as e:
+                self.throttled += 1
+                logger.info(f"Batch: LLM budget exhausted ({e.reason}), retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+                queue.put_nowait((key, form))
+                continue
+
+            # Fallback or placeholder roadmaps are left out so a later run retries them
+            if result.get("source") == "fallback" or result.get("degraded"):
+                self.failed += 1
+                logger.warning(f"Batch: no usable roadmap for {form.currentRole} -> {form.dreamJob}")
+                self._publish()
+                continue
+
+            usage = result.get("usage", {})
+            await asyncio.to_thread(
+                self.store.put,
+                key,
+                form.model_dump(),
+                result["steps"],
+                usage.get("prompt_tokens", 0),
+                usage.get("completion_tokens", 0)
+            )
+            self.completed += 1
+            self.prompt_tokens += usage.get("prompt_tokens", 0)
+            self.completion_tokens += usage.get("completion_tokens", 0)
+            self._publish()
+
+    def _publish(self) -> None:
+        if self.on_progress is not None:
+            try:
+                self.on_progress(self.report())
+            except Exception as e:
+                logger.warning(f"Batch: could not publish progress: {str(e)}")
+
+    def _key(self, form: CareerFormData) -> str:
+        return roadmap_cache_key(
+            form.currentRole, form.currentSkills, form.dreamJob,
+            form.experience, form.timeline, form.additionalInfo
+        )
+
+    def report(self) -> Dict[str, Any]:
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        minutes = elapsed / 60
+        tokens = self.prompt_tokens + self.completion_tokens
+        return {
+            "status": self.status,
+            "total": self.total,
+            "skipped": self.skipped,
+            "completed": self.completed,
+            "failed": self.failed,
+            "throttled": self.throttled,
+            "elapsedSeconds": round(elapsed, 2),
+            "roadmapsPerMinute": round(self.completed / minutes, 2) if minutes else 0.0,
+            "tokensPerMinute": round(tokens / minutes, 1) if minutes else 0.0,
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+        }
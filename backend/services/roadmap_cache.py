@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import RoadmapStep
+from services.normalization import (
+    bucket_experience,
+    bucket_timeline,
+    canonicalize_role,
+    normalize_skills,
+    normalize_text,
+)
+from services.shared_state import worker_count
+
+logger = logging.getLogger(__name__)
+
+# Bump when the prompt or parsing changes enough to invalidate cached roadmaps
+CACHE_KEY_VERSION = "v1"
+
+CacheEntry = Tuple[float, List[RoadmapStep]]
+
+
+def roadmap_cache_key(
+    current_role: str,
+    current_skills: str,
+    dream_job: str,
+    experience: str,
+    timeline: str,
+    additional_info: Optional[str] = None
+) -> str:
+    """
+    Build a cache key from the normalized form fields so near-duplicate requests share an entry
+    """
+    normalized = {
+        "currentRole": canonicalize_role(current_role),
+        "currentSkills": normalize_skills(current_skills),
+        "dreamJob": canonicalize_role(dream_job),
+        "experience": bucket_experience(experience),
+        "timeline": bucket_timeline(timeline),
+        "additionalInfo": normalize_text(additional_info),
+    }
+    digest = hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"roadmap:{CACHE_KEY_VERSION}:{digest}"
+
+
+class InMemoryCacheBackend:
+    """
+    Process-local LRU store of parsed roadmap steps
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, steps: List[RoadmapStep], expires_at: float) -> int:
+        with self._lock:
+            self._entries[key] = (expires_at, steps)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+            return evicted
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+class SQLiteCacheBackend:
+    """
+    On-disk LRU store of roadmap steps, so cached roadmaps survive restarts
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS roadmap_cache (
+                key TEXT PRIMARY KEY,
+                steps TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS roadmap_cache_lru ON roadmap_cache (last_access)")
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT steps, expires_at FROM roadmap_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE roadmap_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        steps = [RoadmapStep.model_validate(step) for step in json.loads(row[0])]
+        return row[1], steps
+
+    def set(self, key: str, steps: List[RoadmapStep], expires_at: float) -> int:
+        payload = json.dumps([step.model_dump() for step in steps])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO roadmap_cache (key, steps, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, payload, expires_at, time.time())
+            )
+            overflow = self._count() - self.max_entries
+            if overflow <= 0:
+                return 0
+            self._conn.execute(
+                "DELETE FROM roadmap_cache WHERE key IN "
+                "(SELECT key FROM roadmap_cache ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+            return overflow
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM roadmap_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM roadmap_cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def _count(self) -> int:
+        # Callers hold _lock; the connection is shared between threads
+        return self._conn.execute("SELECT COUNT(*) FROM roadmap_cache").fetchone()[0]
+
+
+class RoadmapCache:
+    """
+    TTL cache of parsed roadmap steps in front of the LLM call
+    """
+
+    def __init__(self, backend: Any, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[List[RoadmapStep]]:
+        entry = self.backend.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, steps = entry
+        if expires_at <= time.time():
+            self.backend.delete(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return steps
+
+    def set(self, key: str, steps: List[RoadmapStep]) -> None:
+        self.evictions += self.backend.set(key, steps, time.time() + self.ttl)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def create_roadmap_cache() -> RoadmapCache:
+    """
+    Build the roadmap cache from ROADMAP_CACHE_* environment settings
+    """
+    # Worker processes only share cached roadmaps through the on-disk backend
+    default_backend = "sqlite" if worker_count() > 1 else "memory"
+    backend_name = os.getenv("ROADMAP_CACHE_BACKEND", default_backend).lower()
+    max_entries = int(os.getenv("ROADMAP_CACHE_MAX_ENTRIES", "1000"))
+    ttl = float(os.getenv("ROADMAP_CACHE_TTL", "86400"))
+
+    if backend_name == "sqlite":
+        backend = SQLiteCacheBackend(os.getenv("ROADMAP_CACHE_PATH", "roadmap_cache.db"), max_entries)
+    else:
+        backend = InMemoryCacheBackend(max_entries)
+        if worker_count() > 1:
+            logger.warning("Roadmap cache is per-process with several workers; set ROADMAP_CACHE_BACKEND=sqlite to share it")
+
+    logger.info(f"Roadmap cache: {type(backend).__name__} (max {max_entries} entries, ttl {ttl:.0f}s)")
+    return RoadmapCache(backend, ttl)
@@ -1,19 +1,67 @@
-import openai
-import os
-import json
+import asyncio
 import logging
-from typing import Dict, List, Any
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Any, Optional, Tuple
 from dotenv import load_dotenv
+from models import RoadmapStep
+from services.admission import AdmissionRejected, create_admission_controller, share_llm_priority
+from services.llm_client import LLMClient
+from services.metrics import metrics
+from services.model_router import RoutingRequest, create_model_router
+from services.prompt_builder import PromptBuilder, RoadmapPrompt
+from services.roadmap_parser import RoadmapParser, coerce_step, step_completeness
+from services.roadmap_cache import create_roadmap_cache, roadmap_cache_key
+from services.roadmap_store import create_precomputed_store
+from services.shared_state import LeaseCoordinator, SharedStateStore
+from services.single_flight import SingleFlight
+from services.skill_gap import SkillGap, SkillGapAnalyzer
+from services.stream_parser import IncrementalStepParser
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# A minimal model reply parsed once at startup so the parser's first real call is not its first call
+WARM_UP_REPLY = (
+    '{"steps": [{"phase": "Foundations", "duration": "1 month", "skills": ["Python"], '
+    '"courses": ["Intro"], "projects": ["Notebook"], "description": "Learn the basics."}]}'
+)
+
 class RoadmapGenerator:
-    def __init__(self):
-        self.client = openai.OpenAI(
-            api_key=os.getenv("OPENAI_API_KEY", "your-openai-api-key-here")
+    def __init__(
+        self,
+        shared_state: Optional[SharedStateStore] = None,
+        target_skills: Optional[Callable[[str], Awaitable[List[str]]]] = None
+    ):
+        self.client = LLMClient(admission=create_admission_controller(shared_state))
+        self.cache = create_roadmap_cache()
+        self.precomputed = create_precomputed_store()
+        # A flight started by batch work runs at interactive priority once an interactive request joins it
+        self.single_flight = SingleFlight("roadmap", share_context=share_llm_priority)
+        # Identical requests in other worker processes wait on the shared cache instead
+        self.leases = LeaseCoordinator(shared_state, "roadmap") if shared_state is not None else None
+        self.prompt_builder = PromptBuilder()
+        self.router = create_model_router(self.client)
+        self.parser = RoadmapParser()
+        self.min_parse_score = float(os.getenv("ROADMAP_MIN_PARSE_SCORE", "0.75"))
+        self.parse_retries = int(os.getenv("ROADMAP_PARSE_RETRIES", "1"))
+        self.results = metrics.counter("roadmap_results_total", "Roadmaps served, by where they came from", ("source",))
+        self.llm_tokens = metrics.counter("llm_tokens_total", "LLM tokens used for roadmaps", ("model", "kind"))
+        # In-demand skills of the target role, compared with the person's skills to focus the prompt
+        self.target_skills = target_skills
+        self.skill_gap = SkillGapAnalyzer()
+        self.skill_gap_timeout = float(os.getenv("SKILL_GAP_TIMEOUT", "2"))
+
+    def warm_up(self) -> None:
+        """
+        Do the one-off work of a first request ahead of time: SDK import, tokenizer load, skill gap, prompt and parse
+        """
+        self.client.client
+        skill_gap = self.skill_gap.analyze("Python, SQL", ["Python", "Machine Learning"])
+        self.prompt_builder.build(
+            "Software Engineer", "Python, SQL", "Data Scientist", "2 years", "6 months", skill_gap=skill_gap
         )
+        self.parser.parse(WARM_UP_REPLY)
     
     async def generate_roadmap(
         self,
@@ -27,41 +75,156 @@ class RoadmapGenerator:
         """
         Generate a personalized career roadmap using OpenAI GPT-4
         """
-        try:
-            # Create the prompt for GPT-4
-            prompt = self._create_roadmap_prompt(
-                current_role, current_skills, dream_job, experience, timeline, additional_info
+        cache_key = roadmap_cache_key(
+            current_role, current_skills, dream_job, experience, timeline, additional_info
+        )
+        with metrics.stage("roadmapLookup"):
+            # The cache and the precomputed store may be SQLite files shared with other workers
+            stored = await asyncio.to_thread(self._lookup_stored, cache_key)
+        if stored is not None:
+            steps, source = stored
+            logger.info(f"Roadmap {source} hit for: {current_role} -> {dream_job}")
+            self.results.inc(source=source)
+            return {"steps": steps, "source": source}
+
+        # Identical requests already waiting on the LLM share its result
+        result = await self.single_flight.do(
+            cache_key,
+            lambda: self._generate_coalesced(
+                cache_key, current_role, current_skills, dream_job, experience, timeline, additional_info
             )
-            
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert career counselor and AI assistant specializing in creating detailed, actionable career roadmaps. You provide practical, step-by-step guidance tailored to individual career transitions."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.7,
-                max_tokens=2000
+        )
+        self.results.inc(source="degraded" if result.get("degraded") else result["source"])
+        return result
+
+    async def _generate_coalesced(
+        self,
+        cache_key: str,
+        current_role: str,
+        current_skills: str,
+        dream_job: str,
+        experience: str,
+        timeline: str,
+        additional_info: str = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a roadmap, letting only one worker process call the LLM for a given key
+        """
+        def generate():
+            return self._generate_uncached(
+                cache_key, current_role, current_skills, dream_job, experience, timeline, additional_info
             )
+
+        if self.leases is None:
+            return await generate()
+
+        async def lookup() -> Optional[Dict[str, Any]]:
+            stored = await asyncio.to_thread(self._lookup_stored, cache_key)
+            return {"steps": stored[0], "source": "shared"} if stored is not None else None
+
+        return await self.leases.do(cache_key, generate, lookup, share=self._uncached_outcome)
+
+    def _uncached_outcome(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        A JSON copy of a result the cache will not hold (fallback or degraded), for workers waiting on it
+        """
+        if result.get("source") != "fallback" and not result.get("degraded"):
+            return None
+        steps = [step.model_dump() if isinstance(step, RoadmapStep) else step for step in result["steps"]]
+        return dict(result, steps=steps)
+
+    def _lookup_stored(self, cache_key: str) -> Optional[Tuple[List[RoadmapStep], str]]:
+        """
+        Look a roadmap up in the cache, then in the offline precomputed store
+        """
+        cached_steps = self.cache.get(cache_key)
+        if cached_steps is not None:
+            return cached_steps, "cache"
+
+        precomputed_steps = self.precomputed.get(cache_key)
+        if precomputed_steps is not None:
+            self.cache.set(cache_key, precomputed_steps)
+            return precomputed_steps, "precomputed"
+        return None
+
+    async def _generate_uncached(
+        self,
+        cache_key: str,
+        current_role: str,
+        current_skills: str,
+        dream_job: str,
+        experience: str,
+        timeline: str,
+        additional_info: str = None
+    ) -> Dict[str, Any]:
+        """
+        Call the LLM for a roadmap and store the parsed steps in the cache
+        """
+        try:
+            # Create the token-budgeted prompt and route it to a model tier
+            skill_gap = await self._analyze_skill_gap(current_skills, dream_job)
+            with metrics.stage("prompt"):
+                prompt = self._create_roadmap_prompt(
+                    current_role, current_skills, dream_job, experience, timeline, additional_info, skill_gap
+                )
+            request = RoutingRequest(
+                current_role, current_skills, dream_job, experience, prompt, additional_info
+            )
+
+            # Parse each reply; retry only when it is too incomplete to serve
+            usage = {"prompt_tokens": 0, "completion_tokens": 0}
+            for attempt in range(self.parse_retries + 1):
+                with metrics.stage("llm"):
+                    routed = await self.router.complete(request)
+                reply = routed.reply
+                usage["prompt_tokens"] += reply.prompt_tokens or 0
+                usage["completion_tokens"] += reply.completion_tokens or 0
+                self._log_usage(
+                    current_role, dream_job, prompt, routed.model, reply.prompt_tokens, reply.completion_tokens
+                )
+
+                with metrics.stage("parse"):
+                    attempt_parsed = self.parser.parse(reply.text)
+                if attempt == 0 or attempt_parsed.score > parsed.score:
+                    parsed = attempt_parsed
+                if parsed.acceptable(self.min_parse_score):
+                    break
+                logger.warning(
+                    f"Roadmap reply scored {attempt_parsed.score} ({', '.join(attempt_parsed.repairs) or 'incomplete'}), "
+                    f"attempt {attempt + 1}/{self.parse_retries + 1}"
+                )
+
+            if not parsed.steps:
+                raise ValueError("No usable roadmap steps in the model reply")
+
+            # Incomplete roadmaps are topped up from the fallback and not cached
+            degraded = not parsed.acceptable(self.min_parse_score)
+            steps = parsed.steps
+            if degraded:
+                steps = self._complete_from_fallback(steps, current_role, dream_job, timeline)
+            else:
+                await asyncio.to_thread(self.cache.set, cache_key, steps)
+
+            return {
+                "steps": steps,
+                "source": "llm",
+                "tier": routed.tier,
+                "model": routed.model,
+                "degraded": degraded,
+                "parseScore": parsed.score,
+                "usage": usage,
+            }
             
-            # Parse the response
-            roadmap_text = response.choices[0].message.content
-            roadmap = self._parse_roadmap_response(roadmap_text)
-            
-            return roadmap
-            
+        except AdmissionRejected:
+            # Over the LLM budget: the caller answers 429 with Retry-After
+            raise
         except Exception as e:
             logger.error(f"Error generating roadmap with OpenAI: {str(e)}")
+            self.router.record_fallback()
             # Return a fallback roadmap if OpenAI fails
-            return self._generate_fallback_roadmap(current_role, dream_job, timeline)
+            return dict(self._generate_fallback_roadmap(current_role, dream_job, timeline), source="fallback")
     
-    def _create_roadmap_prompt(
+    async def stream_roadmap(
         self,
         current_role: str,
         current_skills: str,
@@ -69,106 +232,205 @@ class RoadmapGenerator:
         experience: str,
         timeline: str,
         additional_info: str = None
-    ) -> str:
+    ) -> AsyncIterator[RoadmapStep]:
         """
-        Create a detailed prompt for GPT-4 to generate the roadmap
+        Stream roadmap steps as the LLM produces them, yielding each step once its JSON object closes
         """
-        prompt = f"""
-        Create a detailed career roadmap for someone transitioning from "{current_role}" to "{dream_job}".
+        cache_key = roadmap_cache_key(
+            current_role, current_skills, dream_job, experience, timeline, additional_info
+        )
+        with metrics.stage("roadmapLookup"):
+            # The cache and the precomputed store may be SQLite files shared with other workers
+            stored = await asyncio.to_thread(self._lookup_stored, cache_key)
+        if stored is not None:
+            steps, source = stored
+            logger.info(f"Roadmap {source} hit for: {current_role} -> {dream_job}")
+            self.results.inc(source=source)
+            for step in steps:
+                yield step
+            return
 
-        Current Situation:
-        - Current Role: {current_role}
-        - Current Skills: {current_skills}
-        - Experience Level: {experience}
-        - Timeline: {timeline}
-        {f"- Additional Information: {additional_info}" if additional_info else ""}
+        steps: List[RoadmapStep] = []
+        try:
+            skill_gap = await self._analyze_skill_gap(current_skills, dream_job)
+            with metrics.stage("prompt"):
+                prompt = self._create_roadmap_prompt(
+                    current_role, current_skills, dream_job, experience, timeline, additional_info, skill_gap
+                )
+            tier, chunks = await self.router.stream(RoutingRequest(
+                current_role, current_skills, dream_job, experience, prompt, additional_info
+            ))
 
-        Please provide a structured roadmap with 4 phases, each containing:
-        1. Phase name and duration
-        2. Key skills to learn
-        3. Recommended courses/resources
-        4. Practical projects to build
-        5. Brief description of the phase
+            parser = IncrementalStepParser()
+            try:
+                async for delta in chunks:
+                    for raw_step in parser.feed(delta):
+                        # Same bar as RoadmapParser.parse: mostly-empty steps are dropped
+                        if step_completeness(raw_step) < self.parser.min_step_completeness:
+                            continue
+                        step = coerce_step(raw_step, len(steps) + 1)
+                        if step is None:
+                            continue
+                        steps.append(step)
+                        yield step
+                        if len(steps) >= self.parser.expected_phases:
+                            break
+                    if len(steps) >= self.parser.expected_phases:
+                        # Anything past the requested phases is not served, so stop reading
+                        break
+            finally:
+                await chunks.aclose()
 
-        Format your response as a JSON object with this structure:
-        {{
-            "steps": [
-                {{
-                    "phase": "Phase Name",
-                    "duration": "X months",
-                    "skills": ["skill1", "skill2", "skill3"],
-                    "courses": ["course1", "course2"],
-                    "projects": ["project1", "project2"],
-                    "description": "Brief description of what this phase accomplishes"
-                }}
-            ]
-        }}
+            # Streamed responses carry no usage block, so count the completion locally
+            self._log_usage(
+                current_role, dream_job, prompt, self.router.backends[tier].model,
+                None, self.prompt_builder.counter.count(parser.buffer)
+            )
+
+            if not steps:
+                # Nothing parsed incrementally; fall back to parsing the whole response
+                parsed = self.parser.parse(parser.buffer)
+                for step in parsed.steps:
+                    steps.append(step)
+                    yield step
+
+            if len(steps) < self.parser.expected_phases:
+                raise ValueError(f"Streamed roadmap ended after {len(steps)} phases")
+
+            await asyncio.to_thread(self.cache.set, cache_key, steps)
+            self.results.inc(source="llm")
 
-        Make the roadmap:
-        - Realistic and achievable within the specified timeline
-        - Progressive (building from basics to advanced)
-        - Practical with hands-on projects
-        - Industry-relevant and current
-        - Tailored to the specific career transition
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.error(f"Error streaming roadmap with OpenAI: {str(e)}")
+            self.router.record_fallback()
+            self.results.inc(source="fallback")
+            # Complete the roadmap from the fallback phases that were not streamed yet
+            fallback = self._generate_fallback_roadmap(current_role, dream_job, timeline)
+            for raw_step in fallback["steps"][len(steps):]:
+                yield RoadmapStep.model_validate(raw_step)
+
+    async def regenerate_phases(
+        self,
+        current_role: str,
+        current_skills: str,
+        dream_job: str,
+        experience: str,
+        timeline: str,
+        additional_info: Optional[str],
+        steps: List[RoadmapStep],
+        phases: List[int]
+    ) -> Dict[str, Any]:
         """
-        
-        return prompt
-    
-    def _parse_roadmap_response(self, response_text: str) -> Dict[str, Any]:
+        Rewrite only the phases at `phases` (0-based) of an existing roadmap, keeping the rest as they are
+        """
+        replaced: Dict[int, RoadmapStep] = {}
+        try:
+            skill_gap = await self._analyze_skill_gap(current_skills, dream_job)
+            with metrics.stage("prompt"):
+                prompt = self.prompt_builder.build_partial(
+                    current_role, current_skills, dream_job, experience, timeline, additional_info, steps, phases,
+                    skill_gap
+                )
+            with metrics.stage("llm"):
+                routed = await self.router.complete(RoutingRequest(
+                    current_role, current_skills, dream_job, experience, prompt, additional_info
+                ))
+            reply = routed.reply
+            self._log_usage(current_role, dream_job, prompt, routed.model, reply.prompt_tokens, reply.completion_tokens)
+
+            with metrics.stage("parse"):
+                parsed = RoadmapParser(expected_phases=len(phases)).parse(reply.text)
+            # A short reply replaces what it covers; the remaining phases keep their old content
+            replaced = dict(zip(phases, parsed.steps))
+            logger.info(
+                f"Regenerated {len(replaced)} of {len(steps)} phases for {current_role} -> {dream_job} "
+                f"(asked for {len(phases)}, parse score {parsed.score})"
+            )
+            self.results.inc(source="partial")
+            usage = {"prompt_tokens": reply.prompt_tokens or 0, "completion_tokens": reply.completion_tokens or 0}
+            return {"replaced": replaced, "model": routed.model, "usage": usage}
+
+        except AdmissionRejected:
+            raise
+        except Exception as e:
+            logger.error(f"Error regenerating roadmap phases with OpenAI: {str(e)}")
+            self.results.inc(source="fallback")
+            # Keep the existing phases rather than swapping in generic ones
+            return {"replaced": replaced, "model": None, "usage": {"prompt_tokens": 0, "completion_tokens": 0}}
+
+    def _create_roadmap_prompt(
+        self,
+        current_role: str,
+        current_skills: str,
+        dream_job: str,
+        experience: str,
+        timeline: str,
+        additional_info: str = None,
+        skill_gap: Optional[SkillGap] = None
+    ) -> RoadmapPrompt:
+        """
+        Create a compact, token-budgeted prompt for GPT-4 to generate the roadmap
+        """
+        return self.prompt_builder.build(
+            current_role, current_skills, dream_job, experience, timeline, additional_info, skill_gap=skill_gap
+        )
+
+    async def _analyze_skill_gap(self, current_skills: str, dream_job: str) -> Optional[SkillGap]:
         """
-        Parse the GPT-4 response and extract the roadmap structure
+        Which of the target role's in-demand skills the person still lacks; None when unavailable
         """
+        if self.target_skills is None:
+            return None
         try:
-            # Try to extract JSON from the response
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx != -1:
-                json_str = response_text[start_idx:end_idx]
-                roadmap = json.loads(json_str)
-                return roadmap
-            else:
-                # If no JSON found, create a structured response from text
-                return self._parse_text_response(response_text)
-                
-        except json.JSONDecodeError:
-            logger.warning("Failed to parse JSON response, using text parsing")
-            return self._parse_text_response(response_text)
-    
-    def _parse_text_response(self, response_text: str) -> Dict[str, Any]:
-        """
-        Parse a text response and convert it to structured format
-        """
-        # This is a simplified parser - in production, you'd want more robust parsing
-        steps = []
-        
-        # Split response into phases (this is a basic implementation)
-        phases = response_text.split("Phase")
-        
-        for i, phase_text in enumerate(phases[1:], 1):  # Skip first empty split
-            step = {
-                "phase": f"Phase {i}",
-                "duration": "2-3 months",  # Default duration
-                "skills": ["Skill analysis from text"],
-                "courses": ["Course recommendations"],
-                "projects": ["Project suggestions"],
-                "description": "Phase description extracted from text"
-            }
-            steps.append(step)
-        
-        # Ensure we have at least 4 steps
-        while len(steps) < 4:
-            steps.append({
-                "phase": f"Phase {len(steps) + 1}",
-                "duration": "1-2 months",
-                "skills": ["Additional skills"],
-                "courses": ["Additional courses"],
-                "projects": ["Additional projects"],
-                "description": "Additional phase for comprehensive learning"
-            })
-        
-        return {"steps": steps[:4]}  # Limit to 4 phases
-    
+            with metrics.stage("skillGap"):
+                targets = await asyncio.wait_for(self.target_skills(dream_job), self.skill_gap_timeout)
+                skill_gap = self.skill_gap.analyze(current_skills, targets)
+            logger.info(
+                f"Skill gap for {dream_job}: {len(skill_gap.missing)} missing, "
+                f"{len(skill_gap.covered)} covered (coverage {skill_gap.coverage})"
+            )
+            return skill_gap
+        except Exception as e:
+            logger.warning(f"Skill gap analysis failed, prompting without it: {str(e)}")
+            return None
+
+    def _log_usage(
+        self,
+        current_role: str,
+        dream_job: str,
+        prompt: RoadmapPrompt,
+        model: str,
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int]
+    ):
+        """
+        Log token usage for one LLM call, falling back to the local prompt estimate
+        """
+        reported = prompt_tokens is not None
+        self.llm_tokens.inc(prompt_tokens if reported else prompt.prompt_tokens, model=model, kind="prompt")
+        self.llm_tokens.inc(completion_tokens or 0, model=model, kind="completion")
+        logger.info(
+            f"Roadmap LLM usage for {current_role} -> {dream_job} ({model}): "
+            f"prompt_tokens={prompt_tokens if reported else prompt.prompt_tokens}"
+            f"{'' if reported else ' (estimated)'}, "
+            f"completion_tokens={completion_tokens}, max_tokens={prompt.max_tokens}"
+        )
+
+    def _complete_from_fallback(
+        self,
+        steps: List[RoadmapStep],
+        current_role: str,
+        dream_job: str,
+        timeline: str
+    ) -> List[RoadmapStep]:
+        """
+        Append fallback phases after the parsed ones so the roadmap has every phase
+        """
+        fallback = self._generate_fallback_roadmap(current_role, dream_job, timeline)
+        return steps + [RoadmapStep.model_validate(step) for step in fallback["steps"][len(steps):]]
+
     def _generate_fallback_roadmap(self, current_role: str, dream_job: str, timeline: str) -> Dict[str, Any]:
         """
         Generate a basic fallback roadmap when OpenAI is not available
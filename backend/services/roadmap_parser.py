@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from models import RoadmapStep
+
+logger = logging.getLogger(__name__)
+
+LIST_FIELDS = ("skills", "courses", "projects")
+TEXT_FIELDS = ("phase", "duration", "description")
+STEP_FIELDS = TEXT_FIELDS + LIST_FIELDS
+
+# Keys models use instead of "steps" for the phase list
+STEP_LIST_KEYS = ("steps", "phases", "roadmap", "stages")
+
+_DECODER = json.JSONDecoder(strict=False)
+_LIST_SPLIT = re.compile(r"\s*(?:[,;\n]|\s-\s)\s*")
+_CLOSERS = {"{": "}", "[": "]"}
+_STRUCTURAL = re.compile(r'["{}\[\],`]')
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+
+
+class ParsedRoadmap:
+    def __init__(self, steps: List[RoadmapStep], score: float, repairs: List[str]):
+        self.steps = steps
+        self.score = score
+        self.repairs = repairs
+
+    def acceptable(self, min_score: float) -> bool:
+        return bool(self.steps) and self.score >= min_score
+
+
+class RoadmapParser:
+    """
+    Turn raw model output into validated RoadmapStep objects.
+
+    Well-formed output is decoded directly from the first brace, which skips
+    prose and code fences around it. Anything else goes through one repair scan
+    that drops trailing commas and records where each open container and
+    member starts, so truncated output can be closed off at the last complete
+    member. Each step is coerced into the schema and the roadmap gets a
+    completeness score, used by the caller to accept the result or retry.
+    """
+
+    def __init__(self, expected_phases: Optional[int] = None, min_step_completeness: float = 0.5):
+        self.expected_phases = expected_phases or int(os.getenv("ROADMAP_PHASES", "4"))
+        self.min_step_completeness = min_step_completeness
+
+    def parse(self, text: str) -> ParsedRoadmap:
+        repairs: List[str] = []
+        document = self._decode(text or "", repairs)
+        raw_steps = self._find_steps(document)
+
+        steps: List[RoadmapStep] = []
+        total = 0.0
+        for index, raw_step in enumerate(raw_steps[:self.expected_phases], 1):
+            completeness = step_completeness(raw_step)
+            if completeness < self.min_step_completeness:
+                repairs.append(f"droppedStep{index}")
+                continue
+            step = coerce_step(raw_step, index)
+            if step is None:
+                repairs.append(f"droppedStep{index}")
+                continue
+            steps.append(step)
+            total += completeness
+
+        score = round(total / self.expected_phases, 3)
+        return ParsedRoadmap(steps, score, repairs)
+
+    def _decode(self, text: str, repairs: List[str]) -> Any:
+        start = _first_container(text)
+        if start == -1:
+            repairs.append("noJson")
+            return None
+        try:
+            document, _ = _DECODER.raw_decode(text, start)
+            return document
+        except json.JSONDecodeError:
+            pass
+
+        repaired, truncated = _repair(text, start)
+        repairs.append("truncated" if truncated else "syntax")
+        for candidate in repaired:
+            try:
+                return json.loads(candidate, strict=False)
+            except json.JSONDecodeError:
+                continue
+        repairs.append("unrepairable")
+        return None
+
+    def _find_steps(self, document: Any) -> List[Dict[str, Any]]:
+        if isinstance(document, list):
+            return [step for step in document if isinstance(step, dict)]
+        if not isinstance(document, dict):
+            return []
+        for key in STEP_LIST_KEYS:
+            value = document.get(key)
+            if isinstance(value, list):
+                return [step for step in value if isinstance(step, dict)]
+            if isinstance(value, dict):
+                return self._find_steps(value)
+        return []
+
+
+def _first_container(text: str) -> int:
+    """
+    Index of the top-level JSON value: the first object, or an array if it opens with an object
+    """
+    brace = text.find("{")
+    bracket = text.find("[")
+    if bracket != -1 and (brace == -1 or bracket < brace) and text[bracket + 1:].lstrip().startswith("{"):
+        return bracket
+    return brace
+
+
+def _repair(text: str, start: int) -> Tuple[List[str], bool]:
+    """
+    Scan once from `start`, dropping trailing commas, and return candidate documents
+    (most to least complete) plus whether the input was truncated
+    """
+    out: List[str] = []
+    # Per open container: its opening char, where it starts in `out`, and where
+    # its last complete member ends (just before the separating comma).
+    # `out` holds text runs, whole strings and one entry per structural
+    # character, so the scan jumps between them instead of walking every char.
+    stack: List[List[Any]] = []
+    in_string = False
+    escape = False
+    pos = start
+    length = len(text)
+
+    while pos < length:
+        match = _STRUCTURAL.search(text, pos)
+        if match is None:
+            out.append(text[pos:])
+            break
+        i = match.start()
+        if i > pos:
+            out.append(text[pos:i])
+        char = text[i]
+        pos = i + 1
+
+        if char == '"':
+            string = _STRING.match(text, i)
+            if string is None:
+                # Truncated inside a string
+                out.append(text[i:])
+                in_string = True
+                escape = (len(text) - len(text.rstrip("\\"))) % 2 == 1
+                break
+            out.append(string.group())
+            pos = string.end()
+        elif char in "{[":
+            stack.append([char, len(out), None])
+            out.append(char)
+        elif char in "}]":
+            _strip_trailing_comma(out)
+            if stack:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                return ["".join(out)], False
+        elif char == ",":
+            _strip_trailing_comma(out)
+            if stack:
+                stack[-1][2] = len(out)
+            out.append(char)
+        else:
+            # A closing code fence after truncated JSON
+            break
+
+    # Truncated: first try closing everything where the text stopped, then cut
+    # back to the last complete member of each enclosing container in turn
+    candidates = []
+    tail = "".join(out)
+    if in_string:
+        # A dangling backslash would escape the closing quote
+        tail = (tail[:-1] if escape else tail) + '"'
+    candidates.append(_close(tail.rstrip().rstrip(",:"), stack))
+
+    for depth in range(len(stack) - 1, -1, -1):
+        opener, opened_at, member_end = stack[depth]
+        if member_end is not None:
+            candidates.append(_close("".join(out[:member_end]), stack[:depth + 1]))
+        else:
+            candidates.append(_close("".join(out[:opened_at + 1]), stack[:depth + 1]))
+    return candidates, True
+
+
+def _strip_trailing_comma(out: List[str]):
+    j = len(out) - 1
+    while j >= 0 and (not out[j] or out[j].isspace()):
+        j -= 1
+    if j >= 0 and out[j] == ",":
+        del out[j]
+
+
+def _close(text: str, stack: List[List[Any]]) -> str:
+    return text + "".join(_CLOSERS[frame[0]] for frame in reversed(stack))
+
+
+def step_completeness(raw_step: Dict[str, Any]) -> float:
+    """
+    Fraction of the step schema that is present and non-empty
+    """
+    present = 0
+    for field in STEP_FIELDS:
+        value = raw_step.get(field)
+        if isinstance(value, str):
+            present += bool(value.strip())
+        elif isinstance(value, list):
+            present += any(isinstance(item, str) and item.strip() for item in value)
+    return present / len(STEP_FIELDS)
+
+
+def coerce_step(raw_step: Dict[str, Any], index: int) -> Optional[RoadmapStep]:
+    """
+    Validate a raw step into a RoadmapStep, splitting string lists and filling gaps
+    """
+    step: Dict[str, Any] = {}
+    for field in TEXT_FIELDS:
+        value = raw_step.get(field)
+        step[field] = value.strip() if isinstance(value, str) else ("" if value is None else str(value))
+    for field in LIST_FIELDS:
+        value = raw_step.get(field)
+        if isinstance(value, str):
+            value = _LIST_SPLIT.split(value)
+        elif not isinstance(value, list):
+            value = []
+        step[field] = [str(item).strip() for item in value if str(item).strip()]
+    step["phase"] = step["phase"] or f"Phase {index}"
+
+    try:
+        return RoadmapStep.model_validate(step)
+    except ValidationError as e:
+        logger.warning(f"Dropping roadmap step {index}: {e}")
+        return None
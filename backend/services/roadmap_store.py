@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from models import RoadmapStep
+
+logger = logging.getLogger(__name__)
+
+
+class PrecomputedRoadmapStore:
+    """
+    SQLite store of roadmaps generated offline by the batch job, keyed by roadmap cache key.
+
+    Unlike the roadmap cache, entries never expire or get evicted; the online
+    path serves them directly and the batch job uses them as its checkpoint.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS precomputed_roadmaps (
+                key TEXT PRIMARY KEY,
+                form TEXT NOT NULL,
+                steps TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, key: str) -> Optional[List[RoadmapStep]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT steps FROM precomputed_roadmaps WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return [RoadmapStep.model_validate(step) for step in json.loads(row[0])]
+
+    def put(
+        self,
+        key: str,
+        form: Dict[str, Any],
+        steps: List[RoadmapStep],
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO precomputed_roadmaps "
+                "(key, form, steps, prompt_tokens, completion_tokens, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    json.dumps(form),
+                    json.dumps([step.model_dump() for step in steps]),
+                    prompt_tokens,
+                    completion_tokens,
+                    time.time(),
+                )
+            )
+
+    def existing_keys(self, keys: Iterable[str]) -> Set[str]:
+        """
+        Return the subset of keys that already have a stored roadmap
+        """
+        keys = list(keys)
+        found: Set[str] = set()
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key FROM precomputed_roadmaps WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(row[0] for row in rows)
+        return found
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM precomputed_roadmaps").fetchone()[0]
+
+
+def create_precomputed_store() -> PrecomputedRoadmapStore:
+    """
+    Open the precomputed roadmap store at PRECOMPUTED_ROADMAPS_PATH
+    """
+    path = os.getenv("PRECOMPUTED_ROADMAPS_PATH", "precomputed_roadmaps.db")
+    store = PrecomputedRoadmapStore(path)
+    logger.info(f"Precomputed roadmap store: {path} ({len(store)} roadmaps)")
+    return store
@@ -0,0 +1,189 @@
+import math
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.normalization import ROLE_ALIASES, canonicalize_role
+
+# Words that qualify a title without changing which role it is
+TITLE_STOPWORDS = {
+    "senior", "junior", "lead", "principal", "staff", "associate", "head", "chief",
+    "entry", "level", "mid", "intern", "trainee", "remote", "i", "ii", "iii", "of", "and", "the", "to",
+}
+
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+
+# A match must cover more than this share of both the query and the known title;
+# "security engineer" only shares the generic "engineer" with "devops engineer"
+ROLE_MATCH_MIN_SCORE = 0.5
+
+# Specializations answered with a known role's market data. They are not in
+# normalization.ROLE_ALIASES, which also keys cached roadmaps: a data engineer
+# shares a software engineer's job market but should not get their roadmap
+ROLE_INDEX_ALIASES = {
+    "backend engineer": "software engineer",
+    "backend developer": "software engineer",
+    "frontend engineer": "software engineer",
+    "frontend developer": "software engineer",
+    "front end developer": "software engineer",
+    "full stack engineer": "software engineer",
+    "full stack developer": "software engineer",
+    "fullstack developer": "software engineer",
+    "data engineer": "software engineer",
+}
+
+
+def tokenize_title(title: str) -> List[str]:
+    return [token for token in _TOKEN.findall(title.lower()) if token not in TITLE_STOPWORDS]
+
+
+def role_key(title: str) -> str:
+    """
+    Canonical title without seniority qualifiers, used to group roles the index does not know
+    """
+    return " ".join(tokenize_title(canonicalize_role(title)))
+
+
+class RoleIndex:
+    """
+    Inverted token index over known role titles, built once and queried per request.
+
+    Queries are canonicalized through the alias table first; an exact canonical
+    hit wins outright. A query that only names a title's field ("cybersecurity",
+    "data") matches that title if no other title shares it. Otherwise every role sharing a token with the query is
+    scored by the IDF weight of the shared tokens, normalized by the weight of
+    the role's own title, so "data engineer" prefers a role with the rarer
+    "data" token over the many "... engineer" roles. Ties break on the number
+    of shared tokens, then on the weaker of query and title coverage, then
+    alphabetically, so ranking never depends on insertion order or on which
+    title happens to be shorter.
+
+    Postings are NumPy arrays and scores are accumulated into a dense vector,
+    so a lookup costs a handful of vectorized operations per query token.
+    """
+
+    def __init__(self, titles: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        # numpy is imported on first use, keeping it off the app's import path
+        import numpy as np
+
+        self.aliases = dict(ROLE_ALIASES, **ROLE_INDEX_ALIASES) if aliases is None else dict(aliases)
+        self.titles: List[str] = []
+        self._title_ids: Dict[str, int] = {}
+        postings: Dict[str, List[int]] = defaultdict(list)
+
+        for title in titles:
+            canonical = canonicalize_role(title)
+            if canonical in self._title_ids:
+                continue
+            title_id = len(self.titles)
+            self._title_ids[canonical] = title_id
+            self.titles.append(canonical)
+            for token in set(tokenize_title(canonical)):
+                postings[token].append(title_id)
+
+        total = len(self.titles)
+        self._postings = {token: np.asarray(ids, dtype=np.int32) for token, ids in postings.items()}
+        self._idf = {token: math.log(1 + total / len(ids)) for token, ids in postings.items()}
+        self._unseen_idf = math.log(1 + total) if total else 0.0
+
+        title_weights = np.zeros(total)
+        for token, ids in self._postings.items():
+            title_weights[ids] += self._idf[token]
+        self._title_weights = np.where(title_weights > 0, title_weights, 1.0)
+
+        # Alphabetical position of each title, the last resort for breaking score ties
+        self._tie_rank = np.empty(total, dtype=np.int64)
+        self._tie_rank[sorted(range(total), key=lambda title_id: self.titles[title_id])] = np.arange(total)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """
+        Return up to `limit` (title, score) pairs, best first; scores are in (0, 1]
+        """
+        return [(title, score) for title, score, _ in self._rank(query, limit)]
+
+    def best_match(self, query: str, min_score: float = ROLE_MATCH_MIN_SCORE) -> Optional[str]:
+        """
+        Return the best matching known title, or None unless it covers more than min_score
+        of both the query and the title
+        """
+        results = self._rank(query, limit=1)
+        if not results:
+            return None
+        if results[0][2] > min_score:
+            return results[0][0]
+        return self._field_match(query)
+
+    def resolve(self, title: str) -> str:
+        """
+        Role a title is stored and looked up under: the confidently matched known role,
+        otherwise its own de-seniorized title. Postings are written and read through this
+        one function so both sides agree on the key.
+        """
+        return self.best_match(title) or role_key(title)
+
+    def _rank(self, query: str, limit: int) -> List[Tuple[str, float, float]]:
+        """
+        Up to `limit` (title, score, coverage) triples, best first; coverage is the smaller
+        of the shares of the query and of the title that the shared tokens make up
+        """
+        import numpy as np
+
+        canonical = self._canonical(query)
+        if canonical in self._title_ids:
+            return [(canonical, 1.0, 1.0)]
+
+        query_tokens = set(tokenize_title(canonical))
+        # Tokens the index has never seen count as maximally specific, so they dilute the score
+        query_weight = sum(self._idf.get(token, self._unseen_idf) for token in query_tokens)
+        known_tokens = [token for token in query_tokens if token in self._postings]
+        if not query_weight or not known_tokens:
+            return []
+
+        shared = np.zeros(len(self.titles))
+        shared_count = np.zeros(len(self.titles), dtype=np.int64)
+        for token in known_tokens:
+            shared[self._postings[token]] += self._idf[token]
+            shared_count[self._postings[token]] += 1
+        candidates = np.flatnonzero(shared)
+
+        # Harmonic mean of how much of the query and of the title the overlap covers
+        overlap = shared[candidates]
+        query_coverage = overlap / query_weight
+        title_coverage = overlap / self._title_weights[candidates]
+        scores = np.round(2 * query_coverage * title_coverage / (query_coverage + title_coverage), 9)
+        coverage = np.round(np.minimum(query_coverage, title_coverage), 9)
+        counts = shared_count[candidates]
+
+        if len(candidates) > limit:
+            # Keep everything tied with the limit-th best score so tie-breaking stays exact
+            threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            keep = scores >= threshold
+            candidates, scores, coverage, counts = candidates[keep], scores[keep], coverage[keep], counts[keep]
+
+        order = np.lexsort((self._tie_rank[candidates], -coverage, -counts, -scores))[:limit]
+        return [(self.titles[candidates[i]], float(scores[i]), float(coverage[i])) for i in order]
+
+    def _canonical(self, query: str) -> str:
+        canonical = canonicalize_role(query)
+        if canonical in self.aliases:
+            return self.aliases[canonical]
+        # Index-only aliases are also found behind seniority qualifiers ("senior backend engineer")
+        return self.aliases.get(" ".join(tokenize_title(canonical)), canonical)
+
+    def _field_match(self, query: str) -> Optional[str]:
+        """
+        The one title whose qualifying words (all but its final job noun) include every query token, if any
+        """
+        query_tokens = set(tokenize_title(self._canonical(query)))
+        if not query_tokens or not all(token in self._postings for token in query_tokens):
+            return None
+        candidates = set.intersection(*(set(self._postings[token].tolist()) for token in query_tokens))
+        if len(candidates) != 1:
+            # A field several titles share is ambiguous
+            return None
+        title = self.titles[candidates.pop()]
+        # A bare job noun ("engineer", "analyst") is not a field
+        return title if query_tokens <= set(tokenize_title(title)[:-1]) else None
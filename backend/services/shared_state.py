@@ -0,0 +1,341 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    """
+    Number of server worker processes configured through WEB_CONCURRENCY
+    """
+    return max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+
+
+class SharedStateStore:
+    """
+    Cross-process coordination state in one SQLite WAL database.
+
+    Holds leases (which worker is producing a key), rate-limit slots and token
+    buckets shared by every worker, and small JSON documents such as batch job
+    reports. Every operation is a single short transaction, but one can still
+    wait on another worker's write lock for up to `busy_timeout` seconds, so
+    async code calls them through run() on the store's own thread rather than
+    on the event loop.
+    """
+
+    def __init__(self, path: str, busy_timeout: Optional[float] = None):
+        self.path = path
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.busy_timeout = busy_timeout or float(os.getenv("SHARED_STATE_BUSY_TIMEOUT", "10"))
+        self._lock = threading.Lock()
+        # Operations are serialized by _lock anyway; one thread keeps them in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shared-state")
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=self.busy_timeout)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS leases (
+                key TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rate_slots (
+                name TEXT PRIMARY KEY,
+                next_slot REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                name TEXT PRIMARY KEY,
+                requests REAL NOT NULL,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            """
+        )
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run one of the store's operations on its own thread and await the result
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> "Future[Any]":
+        """
+        Queue an operation on the store's thread without waiting, e.g. from a sync callback on the event loop
+        """
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(_log_failure)
+        return future
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._conn.close()
+
+    def try_acquire(self, key: str, ttl: float) -> bool:
+        """
+        Take the lease on key unless another worker holds an unexpired one
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+                "WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+                (key, self.owner, now + ttl, now)
+            )
+            return cursor.rowcount == 1
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def reserve_slot(self, name: str, interval: float) -> float:
+        """
+        Reserve the next request slot on a shared schedule; returns seconds to wait for it
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT next_slot FROM rate_slots WHERE name = ?", (name,)).fetchone()
+                slot = max(now, row[0] if row else 0.0)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_slots (name, next_slot) VALUES (?, ?)", (name, slot + interval)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return slot - now
+
+    def take_from_buckets(
+        self,
+        name: str,
+        request_rate: float,
+        request_capacity: float,
+        token_rate: float,
+        token_capacity: float,
+        tokens: float
+    ) -> float:
+        """
+        Atomically refill a request/token bucket pair and take one request plus `tokens`;
+        returns 0 on success, else seconds until both are available
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT requests, tokens, updated_at FROM rate_buckets WHERE name = ?", (name,)
+                ).fetchone()
+                requests, available, updated_at = row if row else (request_capacity, token_capacity, now)
+                elapsed = max(0.0, now - updated_at)
+                requests = min(request_capacity, requests + elapsed * request_rate)
+                available = min(token_capacity, available + elapsed * token_rate)
+
+                wait = 0.0
+                if request_rate and requests < 1:
+                    wait = (1 - requests) / request_rate
+                if token_rate and available < tokens:
+                    wait = max(wait, (tokens - available) / token_rate)
+                if wait == 0.0:
+                    requests -= 1 if request_rate else 0
+                    available -= tokens
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, requests, tokens, updated_at) VALUES (?, ?, ?, ?)",
+                    (name, requests, available, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def adjust_bucket_tokens(self, name: str, tokens: float, token_capacity: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE rate_buckets SET tokens = MIN(?, tokens + ?) WHERE name = ?", (token_capacity, tokens, name)
+            )
+
+    def put_json(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+
+    def get_json(self, key: str, since: Optional[float] = None) -> Optional[Any]:
+        """
+        The document stored under key, or None if there is none (or it was written before `since`)
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value, updated_at FROM documents WHERE key = ?", (key,)).fetchone()
+        if row is None or (since is not None and row[1] < since):
+            return None
+        return json.loads(row[0])
+
+    def delete_json_older_than(self, prefix: str, before: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM documents WHERE key >= ? AND key < ? AND updated_at < ?",
+                (prefix, prefix + "\uffff", before)
+            )
+
+
+def _log_failure(future: "Future[Any]") -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning(f"Shared state update failed: {str(future.exception())}")
+
+
+class LeaseCoordinator:
+    """
+    Coalesce identical work across worker processes.
+
+    The worker that takes the lease on a key runs the work; the others poll
+    `lookup` (normally a shared cache) until the result shows up, and take over
+    if the lease is released or expires without one. Results that never reach
+    the cache (`share` returns a JSON-able copy of them, e.g. for fallbacks)
+    are published for `outcome_ttl` seconds, so waiting workers return the
+    leader's outcome instead of each redoing the work in turn. The holder
+    renews the lease every third of its TTL while the work runs, so a slow
+    generation is not mistaken for a dead worker. This sits behind the
+    in-process SingleFlight, so each worker polls at most once per key.
+    """
+
+    def __init__(
+        self,
+        store: SharedStateStore,
+        name: str,
+        ttl: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        outcome_ttl: Optional[float] = None
+    ):
+        self.store = store
+        self.name = name
+        self.ttl = ttl or float(os.getenv("SHARED_LEASE_TTL", "120"))
+        self.poll_interval = poll_interval or float(os.getenv("SHARED_LEASE_POLL_INTERVAL", "0.25"))
+        self.outcome_ttl = outcome_ttl or float(os.getenv("SHARED_OUTCOME_TTL", "30"))
+        self.leader_calls = 0
+        self.follower_hits = 0
+        self.shared_outcomes = 0
+        self.takeovers = 0
+        self.renewals = 0
+        self.lost_leases = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Optional[Any]]],
+        share: Optional[Callable[[Any], Optional[Any]]] = None
+    ) -> Any:
+        lease_key = f"{self.name}:{key}"
+        started = time.time()
+        waited = False
+        while not await self.store.run(self.store.try_acquire, lease_key, self.ttl):
+            waited = True
+            await asyncio.sleep(self.poll_interval)
+            found = await self._settled(lease_key, lookup, started)
+            if found is not None:
+                return found
+
+        if waited:
+            # The holder may have finished between the last poll and releasing the lease
+            found = await self._settled(lease_key, lookup, started)
+            if found is not None:
+                await self.store.run(self.store.release, lease_key)
+                return found
+            # The holder gave up or died without producing a result
+            self.takeovers += 1
+        self.leader_calls += 1
+        renewer = asyncio.create_task(self._renew(lease_key))
+        try:
+            result = await fn()
+            outcome = share(result) if share is not None else None
+            if outcome is not None:
+                await self._publish(lease_key, outcome)
+            return result
+        finally:
+            renewer.cancel()
+            await self.store.run(self.store.release, lease_key)
+
+    async def _settled(
+        self, lease_key: str, lookup: Callable[[], Awaitable[Optional[Any]]], since: float
+    ) -> Optional[Any]:
+        """
+        The result of work on key finished since `since`: from lookup, else an outcome the leader published
+        """
+        found = await lookup()
+        if found is not None:
+            self.follower_hits += 1
+            return found
+        outcome = await self.store.run(self.store.get_json, f"outcome:{lease_key}", since)
+        if outcome is not None:
+            self.shared_outcomes += 1
+        return outcome
+
+    async def _publish(self, lease_key: str, outcome: Any) -> None:
+        try:
+            await self.store.run(self.store.put_json, f"outcome:{lease_key}", outcome)
+            # Outcomes are only read by workers already waiting, so old ones can go
+            await self.store.run(
+                self.store.delete_json_older_than, f"outcome:{self.name}:", time.time() - self.outcome_ttl
+            )
+        except Exception as e:
+            logger.warning(f"Could not publish the outcome for {lease_key}: {str(e)}")
+
+    async def _renew(self, lease_key: str) -> None:
+        """
+        Keep extending the lease while its work runs; only the holder's own lease can be extended
+        """
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                renewed = await self.store.run(self.store.try_acquire, lease_key, self.ttl)
+            except Exception as e:
+                logger.warning(f"Could not renew lease {lease_key}: {str(e)}")
+                continue
+            if not renewed:
+                # Another worker took over after the lease lapsed; it will redo the work
+                self.lost_leases += 1
+                logger.warning(f"Lost lease {lease_key} while its work was still running")
+                return
+            self.renewals += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "leaderCalls": self.leader_calls,
+            "followerHits": self.follower_hits,
+            "sharedOutcomes": self.shared_outcomes,
+            "takeovers": self.takeovers,
+            "renewals": self.renewals,
+            "lostLeases": self.lost_leases,
+        }
+
+
+def create_shared_state() -> Optional[SharedStateStore]:
+    """
+    Open the shared store when running several workers (or when SHARED_STATE_PATH forces it)
+    """
+    path = os.getenv("SHARED_STATE_PATH")
+    if worker_count() == 1 and not path:
+        return None
+    store = SharedStateStore(path or "shared_state.db")
+    logger.info(f"Shared state: {store.path} (worker {os.getpid()} of {worker_count()})")
+    return store
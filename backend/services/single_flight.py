@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _InFlightCall:
+    def __init__(self, task: "asyncio.Task[Any]", context: contextvars.Context):
+        self.task = task
+        self.context = context
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key onto one shared in-flight task.
+
+    Every caller awaits the shared task through asyncio.shield, so one caller
+    being cancelled does not cancel the work for the others. The task itself is
+    only cancelled once every caller waiting on it has gone away. Exceptions
+    raised by the task propagate to all callers.
+
+    The task runs in a copy of its starter's context. `share_context`, if set,
+    is called from every caller's context (starter and joiners) with that copy,
+    so per-caller state such as the LLM priority can be merged into it.
+    """
+
+    def __init__(self, name: str, share_context: Optional[Callable[[contextvars.Context], None]] = None):
+        self.name = name
+        self.share_context = share_context
+        self._calls: Dict[str, _InFlightCall] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() for key, or join the call already in flight for it
+        """
+        self.calls += 1
+        call = self._calls.get(key)
+        if call is None:
+            context = contextvars.copy_context()
+            if self.share_context is not None:
+                self.share_context(context)
+            call = _InFlightCall(context.run(asyncio.ensure_future, fn()), context)
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+            if self.share_context is not None:
+                self.share_context(call.context)
+            logger.debug(f"{self.name}: joined in-flight call for {key}")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Last interested caller was cancelled; stop the shared work too
+                self._forget(key, call)
+                call.task.cancel()
+                self.abandoned += 1
+
+    def _forget(self, key: str, call: _InFlightCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "upstreamCalls": self.executions,
+            "upstreamCallsSaved": self.coalesced,
+            "abandoned": self.abandoned,
+            "inFlight": len(self._calls),
+        }
@@ -0,0 +1,149 @@
+import os
+import re
+import zlib
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from services.normalization import canonicalize_skill, split_skills
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Rows of the candidate matrix scored per matrix product, bounding peak memory for large skill sets
+SCORE_CHUNK_ROWS = 2048
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+
+class SkillVectorizer:
+    """
+    Map skill names onto fixed-size vectors of hashed character n-grams and words.
+
+    Hashing needs no fitted vocabulary, so skills never seen before (typos,
+    "PostgreSQL 15", "k8s operators") still land near the skills they share
+    n-grams with. Vectors are L2-normalized, so a dot product is the cosine
+    similarity. Per-skill hash indices are cached; building a matrix for a
+    batch is one scatter-add.
+    """
+
+    def __init__(self, dim: int = 1024, ngram: int = 3, word_weight: float = 2.0, cache_size: int = 50000):
+        self.dim = dim
+        self.ngram = ngram
+        self.word_weight = word_weight
+        self.cache_size = cache_size
+        self._features: Dict[str, Tuple["np.ndarray", "np.ndarray"]] = {}
+
+    def transform(self, skills: List[str]) -> "np.ndarray":
+        """
+        One L2-normalized float32 row per skill (skills are expected in canonical form)
+        """
+        # numpy is imported on first use, keeping it off the app's import path
+        import numpy as np
+
+        matrix = np.zeros((len(skills), self.dim), dtype=np.float32)
+        if not skills:
+            return matrix
+
+        features = [self._hashed(skill) for skill in skills]
+        rows = np.repeat(np.arange(len(skills)), [len(columns) for columns, _ in features])
+        columns = np.concatenate([columns for columns, _ in features])
+        weights = np.concatenate([weights for _, weights in features])
+        np.add.at(matrix, (rows, columns), weights)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms > 0, norms, 1.0)
+
+    def _hashed(self, skill: str) -> Tuple["np.ndarray", "np.ndarray"]:
+        cached = self._features.get(skill)
+        if cached is not None:
+            return cached
+
+        import numpy as np
+
+        padded = f" {skill} "
+        grams = [padded[i:i + self.ngram] for i in range(max(1, len(padded) - self.ngram + 1))]
+        words = [f"w:{word}" for word in _WORD.findall(skill)]
+        # crc32 rather than hash(): string hashing is salted per process
+        columns = np.array([zlib.crc32(feature.encode("utf-8")) % self.dim for feature in grams + words], dtype=np.int64)
+        weights = np.array([1.0] * len(grams) + [self.word_weight] * len(words), dtype=np.float32)
+
+        if len(self._features) >= self.cache_size:
+            self._features.clear()
+        self._features[skill] = (columns, weights)
+        return columns, weights
+
+
+class SkillGap:
+    def __init__(self, covered: List[Tuple[str, str, float]], missing: List[str], current: List[str]):
+        # (target skill, current skill that covers it, similarity)
+        self.covered = covered
+        self.missing = missing
+        self.current = current
+
+    @property
+    def coverage(self) -> float:
+        total = len(self.covered) + len(self.missing)
+        return round(len(self.covered) / total, 4) if total else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "covered": [{"skill": target, "matchedBy": current, "score": score} for target, current, score in self.covered],
+            "missing": self.missing,
+            "coverage": self.coverage,
+        }
+
+
+class SkillGapAnalyzer:
+    """
+    Compare a person's skills with the skills a target role asks for.
+
+    Both sides are canonicalized through the skill alias table and vectorized;
+    one matrix product scores every target skill against every current skill.
+    A target counts as covered when its best match reaches the threshold, so
+    "Python programming" covers "Python" and "data analytics" covers "Data
+    Analysis", while "Java" does not cover "JavaScript" nor "deep learning"
+    "Machine Learning".
+    """
+
+    def __init__(self, vectorizer: Optional[SkillVectorizer] = None, threshold: Optional[float] = None):
+        self.vectorizer = vectorizer or SkillVectorizer()
+        self.threshold = threshold if threshold is not None else float(os.getenv("SKILL_MATCH_THRESHOLD", "0.6"))
+
+    def analyze(self, current_skills: str, target_skills: Iterable[str]) -> SkillGap:
+        """
+        Split free-text current skills and find which target skills they already cover
+        """
+        current = split_skills(current_skills)
+        targets: Dict[str, str] = {}
+        for skill in target_skills:
+            targets.setdefault(canonicalize_skill(skill), skill)
+        target_names = [name for name in targets if name]
+
+        if not target_names:
+            return SkillGap([], [], current)
+        if not current:
+            return SkillGap([], [targets[name] for name in target_names], current)
+
+        scores = self.similarity(target_names, current)
+        best = scores.argmax(axis=1)
+        covered: List[Tuple[str, str, float]] = []
+        missing: List[str] = []
+        for row, name in enumerate(target_names):
+            score = float(scores[row, best[row]])
+            if score >= self.threshold:
+                covered.append((targets[name], current[best[row]], round(score, 3)))
+            else:
+                missing.append(targets[name])
+        return SkillGap(covered, missing, current)
+
+    def similarity(self, queries: List[str], candidates: List[str]) -> "np.ndarray":
+        """
+        Cosine similarity of every query skill against every candidate skill, (queries x candidates)
+        """
+        import numpy as np
+
+        query_matrix = self.vectorizer.transform(queries)
+        scores = np.empty((len(queries), len(candidates)), dtype=np.float32)
+        for start in range(0, len(candidates), SCORE_CHUNK_ROWS):
+            chunk = self.vectorizer.transform(candidates[start:start + SCORE_CHUNK_ROWS])
+            scores[:, start:start + len(chunk)] = query_matrix @ chunk.T
+        return scores
@@ -0,0 +1,128 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from services.roadmap_parser import STEP_LIST_KEYS
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementalStepParser:
+    """
+    Incrementally scan a streamed roadmap JSON document and return each object
+    in its phase list as soon as its closing brace arrives.
+
+    The phase list is the first array under one of the keys RoadmapParser
+    accepts ("steps", "phases", ...), at the top level or nested under another
+    of them. Only bracket nesting and string/escape state are tracked, and only
+    the text of the step still open is kept for scanning, so feeding a chunk
+    costs time proportional to the chunk and the current step, not to the
+    text seen so far. Any prose or code fence before the opening brace is
+    skipped.
+    """
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        # Unconsumed tail of the stream: the open step or key string, plus the latest chunk
+        self._window = ""
+        self._stack: List[str] = []
+        # Key each open container was opened under (None at the top level and inside arrays)
+        self._keys: List[Optional[str]] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._steps_depth: Optional[int] = None
+        self._step_start: Optional[int] = None
+
+    @property
+    def buffer(self) -> str:
+        """
+        Everything fed so far
+        """
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume the next chunk of text and return the step objects it completed
+        """
+        self._chunks.append(chunk)
+        window = self._window + chunk
+        completed = []
+
+        for i in range(len(self._window), len(window)):
+            char = window[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._stack and self._stack[-1] == "{":
+                        self._last_key = window[self._string_start:i]
+                continue
+
+            if not self._stack and char != "{":
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i + 1
+            elif char in "{[":
+                key = self._last_key if self._stack and self._stack[-1] == "{" else None
+                if (
+                    char == "{"
+                    and self._steps_depth is not None
+                    and len(self._stack) == self._steps_depth
+                ):
+                    self._step_start = i
+                elif (
+                    char == "["
+                    and self._steps_depth is None
+                    and key in STEP_LIST_KEYS
+                    and all(parent is None or parent in STEP_LIST_KEYS for parent in self._keys)
+                ):
+                    self._steps_depth = len(self._stack) + 1
+                self._stack.append(char)
+                self._keys.append(key)
+                self._last_key = None
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                    self._keys.pop()
+                if char == "]" and self._steps_depth is not None and len(self._stack) < self._steps_depth:
+                    self._steps_depth = None
+                elif (
+                    char == "}"
+                    and self._step_start is not None
+                    and self._steps_depth is not None
+                    and len(self._stack) == self._steps_depth
+                ):
+                    step = self._decode(window[self._step_start:i + 1])
+                    if step is not None:
+                        completed.append(step)
+                    self._step_start = None
+
+        # Drop scanned text no later chunk can need
+        keep = len(window)
+        if self._step_start is not None:
+            keep = self._step_start
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        self._window = window[keep:]
+        if self._step_start is not None:
+            self._step_start -= keep
+        self._string_start -= keep
+        return completed
+
+    def _decode(self, text: str) -> Optional[Dict[str, Any]]:
+        try:
+            step = json.loads(text)
+        except json.JSONDecodeError:
+            logger.warning("Skipping streamed step that is not valid JSON")
+            return None
+        return step if isinstance(step, dict) else None
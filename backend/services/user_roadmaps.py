@@ -0,0 +1,241 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from models import CareerFormData, RoadmapStep, TrackedRoadmapStep, UserRoadmap
+from services.normalization import split_skills
+
+logger = logging.getLogger(__name__)
+
+
+class StoredRoadmap:
+    def __init__(
+        self,
+        id: str,
+        user_id: str,
+        form: CareerFormData,
+        title: str,
+        steps: List[RoadmapStep],
+        completed: List[bool],
+        created_at: float,
+        updated_at: float
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.form = form
+        self.title = title
+        self.steps = steps
+        self.completed = completed
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def to_model(self, regenerated: Optional[List[int]] = None) -> UserRoadmap:
+        steps = [
+            TrackedRoadmapStep(**step.model_dump(), completed=done) for step, done in zip(self.steps, self.completed)
+        ]
+        return UserRoadmap(
+            id=self.id,
+            userId=self.user_id,
+            title=self.title,
+            timeline=self.form.timeline,
+            form=self.form,
+            steps=steps,
+            progress=round(sum(self.completed) / len(self.completed), 4) if self.completed else 0.0,
+            createdAt=self.created_at,
+            updatedAt=self.updated_at,
+            regeneratedPhases=regenerated
+        )
+
+
+class UserRoadmapRepository:
+    """
+    SQLite repository of roadmaps saved by users, with per-step completion state.
+
+    A roadmap row holds the form it was generated from; its steps live in a
+    child table keyed by position so a single phase can be marked done or
+    replaced without rewriting the others.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS user_roadmaps (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                form TEXT NOT NULL,
+                title TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS user_roadmaps_by_user ON user_roadmaps (user_id, created_at);
+            CREATE TABLE IF NOT EXISTS user_roadmap_steps (
+                roadmap_id TEXT NOT NULL REFERENCES user_roadmaps (id) ON DELETE CASCADE,
+                position INTEGER NOT NULL,
+                step TEXT NOT NULL,
+                completed INTEGER NOT NULL DEFAULT 0,
+                completed_at REAL,
+                PRIMARY KEY (roadmap_id, position)
+            );
+            """
+        )
+
+    def create(self, user_id: str, form: CareerFormData, title: str, steps: List[RoadmapStep]) -> StoredRoadmap:
+        roadmap_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO user_roadmaps (id, user_id, form, title, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (roadmap_id, user_id, form.model_dump_json(), title, now, now)
+                )
+                self._conn.executemany(
+                    "INSERT INTO user_roadmap_steps (roadmap_id, position, step) VALUES (?, ?, ?)",
+                    [(roadmap_id, position, step.model_dump_json()) for position, step in enumerate(steps)]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return StoredRoadmap(roadmap_id, user_id, form, title, list(steps), [False] * len(steps), now, now)
+
+    def get(self, user_id: str, roadmap_id: str) -> Optional[StoredRoadmap]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, user_id, form, title, created_at, updated_at FROM user_roadmaps WHERE id = ? AND user_id = ?",
+                (roadmap_id, user_id)
+            ).fetchone()
+            if row is None:
+                return None
+            step_rows = self._conn.execute(
+                "SELECT step, completed FROM user_roadmap_steps WHERE roadmap_id = ? ORDER BY position", (roadmap_id,)
+            ).fetchall()
+        return self._load(row, step_rows)
+
+    def list_for_user(self, user_id: str) -> List[StoredRoadmap]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, user_id, form, title, created_at, updated_at FROM user_roadmaps "
+                "WHERE user_id = ? ORDER BY created_at DESC",
+                (user_id,)
+            ).fetchall()
+            steps_by_roadmap: Dict[str, List[tuple]] = {row[0]: [] for row in rows}
+            if rows:
+                placeholders = ",".join("?" * len(rows))
+                for roadmap_id, step, completed in self._conn.execute(
+                    f"SELECT roadmap_id, step, completed FROM user_roadmap_steps "
+                    f"WHERE roadmap_id IN ({placeholders}) ORDER BY roadmap_id, position",
+                    list(steps_by_roadmap)
+                ):
+                    steps_by_roadmap[roadmap_id].append((step, completed))
+        return [self._load(row, steps_by_roadmap[row[0]]) for row in rows]
+
+    def set_step_completed(self, user_id: str, roadmap_id: str, position: int, completed: bool) -> Optional[StoredRoadmap]:
+        """
+        Mark one step done or not done; returns None when the roadmap or step does not exist
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE user_roadmap_steps SET completed = ?, completed_at = ? "
+                "WHERE roadmap_id = (SELECT id FROM user_roadmaps WHERE id = ? AND user_id = ?) AND position = ?",
+                (int(completed), now if completed else None, roadmap_id, user_id, position)
+            )
+            if cursor.rowcount == 0:
+                return None
+            self._conn.execute("UPDATE user_roadmaps SET updated_at = ? WHERE id = ?", (now, roadmap_id))
+        return self.get(user_id, roadmap_id)
+
+    def update(self, roadmap: StoredRoadmap, form: CareerFormData, replaced: Dict[int, RoadmapStep]) -> StoredRoadmap:
+        """
+        Save a new form and replace the steps at the given positions, resetting their completion
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "UPDATE user_roadmaps SET form = ?, updated_at = ? WHERE id = ?",
+                    (form.model_dump_json(), now, roadmap.id)
+                )
+                self._conn.executemany(
+                    "UPDATE user_roadmap_steps SET step = ?, completed = 0, completed_at = NULL "
+                    "WHERE roadmap_id = ? AND position = ?",
+                    [(step.model_dump_json(), roadmap.id, position) for position, step in replaced.items()]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        steps = [replaced.get(position, step) for position, step in enumerate(roadmap.steps)]
+        completed = [done and position not in replaced for position, done in enumerate(roadmap.completed)]
+        return StoredRoadmap(roadmap.id, roadmap.user_id, form, roadmap.title, steps, completed, roadmap.created_at, now)
+
+    def _load(self, row: tuple, step_rows: List[tuple]) -> StoredRoadmap:
+        roadmap_id, user_id, form, title, created_at, updated_at = row
+        return StoredRoadmap(
+            roadmap_id,
+            user_id,
+            CareerFormData.model_validate_json(form),
+            title,
+            [RoadmapStep.model_validate(json.loads(step)) for step, _ in step_rows],
+            [bool(completed) for _, completed in step_rows],
+            created_at,
+            updated_at
+        )
+
+
+def affected_phases(steps: List[RoadmapStep], completed: List[bool], old_skills: str, new_skills: str) -> List[int]:
+    """
+    Positions of the uncompleted phases a skills update invalidates.
+
+    A phase is affected when it teaches a skill the person has just added
+    (it now repeats what they know). Skills that were removed need teaching
+    again: if no remaining phase covers one, the earliest uncompleted phase is
+    rewritten to pick it up. Completed phases are never touched.
+    """
+    old = set(split_skills(old_skills))
+    new = set(split_skills(new_skills))
+    added, removed = new - old, old - new
+    open_positions = [position for position, done in enumerate(completed) if not done]
+
+    affected = [
+        position for position in open_positions
+        if any(_teaches(steps[position], skill) for skill in added)
+    ]
+    uncovered = [
+        skill for skill in removed
+        if not any(_teaches(steps[position], skill) for position in open_positions if position not in affected)
+    ]
+    if uncovered and open_positions and open_positions[0] not in affected:
+        affected.insert(0, open_positions[0])
+    return sorted(affected)
+
+
+def _teaches(step: RoadmapStep, skill: str) -> bool:
+    pattern = re.compile(rf"(?<!\w){re.escape(skill)}(?!\w)")
+    return any(
+        skill in split_skills(entry) or pattern.search(entry.lower()) for entry in step.skills
+    )
+
+
+def create_user_roadmap_repository() -> UserRoadmapRepository:
+    """
+    Open the user roadmap database at USER_ROADMAPS_PATH
+    """
+    path = os.getenv("USER_ROADMAPS_PATH", "user_roadmaps.db")
+    logger.info(f"User roadmaps: {path}")
+    return UserRoadmapRepository(path)
@@ -0,0 +1,78 @@
+import asyncio
+import inspect
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StartupWarmup:
+    """
+    Ordered warm-up steps run once the server is accepting connections.
+
+    Each step is a callable doing work a first request would otherwise pay
+    for (imports, index builds, connection pools). Plain functions run in a
+    thread so /health stays responsive while they import; coroutines run on
+    the loop. A failed step is logged and recorded but does not keep the
+    worker out of rotation, since every step has a lazy path at request time.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None):
+        self.enabled = enabled if enabled is not None else os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+        self.steps: List[Tuple[str, Callable[[], Any]]] = []
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.ready = False
+        self.process_started = time.time()
+        self.ready_after: Optional[float] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def step(self, name: str, fn: Callable[[], Any]) -> None:
+        self.steps.append((name, fn))
+
+    def start(self) -> None:
+        """
+        Run the steps in the background; the app reports ready when they finish
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        if self.enabled:
+            for name, fn in self.steps:
+                start = time.perf_counter()
+                try:
+                    if inspect.iscoroutinefunction(fn):
+                        await fn()
+                    else:
+                        await asyncio.to_thread(fn)
+                except Exception as e:
+                    self.errors[name] = str(e)
+                    logger.warning(f"Warm-up step '{name}' failed: {str(e)}")
+                self.timings[name] = round((time.perf_counter() - start) * 1000, 1)
+
+        self.ready = True
+        self.ready_after = round(time.time() - self.process_started, 3)
+        logger.info(f"Warm-up finished {self.ready_after}s after process start: {self.timings}")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        done = set(self.timings)
+        return {
+            "ready": self.ready,
+            "enabled": self.enabled,
+            "pending": [name for name, _ in self.steps if name not in done] if self.enabled and not self.ready else [],
+            "stepsMs": self.timings,
+            "errors": self.errors,
+            "readyAfterSeconds": self.ready_after,
+        }
@@ -0,0 +1,27 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from services.job_scraper import JobScraper
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOB_POSTINGS_PATH", str(tmp_path / "postings.db"))
+    return JobScraper()
+
+
+@pytest.fixture(scope="session")
+def api(tmp_path_factory):
+    tmp = tmp_path_factory.mktemp("api")
+    with pytest.MonkeyPatch.context() as env:
+        env.setenv("ROADMAP_CACHE_BACKEND", "memory")
+        env.setenv("STARTUP_WARMUP", "false")
+        env.setenv("SHARED_STATE_PATH", "")
+        env.setenv("USER_ROADMAPS_PATH", str(tmp / "user_roadmaps.db"))
+        env.setenv("JOB_POSTINGS_PATH", str(tmp / "job_postings.db"))
+        env.setenv("PRECOMPUTED_ROADMAPS_PATH", str(tmp / "precomputed.db"))
+        main = importlib.import_module("main")
+        with TestClient(main.app) as client:
+            yield main, client
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.admission import (
+    PRIORITY_BATCH, PRIORITY_INTERACTIVE, AdmissionController, AdmissionRejected, RateBuckets, SharedRateBuckets,
+    llm_priority, share_llm_priority
+)
+from services.shared_state import SharedStateStore
+from services.single_flight import SingleFlight
+
+
+class FakeBuckets:
+    """
+    A budget of `available` calls that only grows when a test refills it
+    """
+
+    def __init__(self, available=0, request_rate=10.0):
+        self.available = available
+        self.request_rate = request_rate
+        self.token_rate = 0.0
+        self.adjusted = []
+
+    async def try_acquire(self, tokens):
+        if self.available > 0:
+            self.available -= 1
+            return 0.0
+        return 0.01
+
+    def adjust(self, tokens):
+        self.adjusted.append(tokens)
+
+
+def test_rate_buckets_admit_up_to_their_burst_then_report_the_wait():
+    buckets = RateBuckets(requests_per_minute=60, tokens_per_minute=6000, burst_seconds=2)
+    assert asyncio.run(buckets.try_acquire(10)) == 0
+    assert asyncio.run(buckets.try_acquire(10)) == 0
+    wait = asyncio.run(buckets.try_acquire(10))
+    assert 0 < wait <= 1.0
+
+
+def test_admits_immediately_while_there_is_budget():
+    controller = AdmissionController(FakeBuckets(available=1), max_queue=10, max_wait=1)
+    ticket = asyncio.run(controller.acquire(100))
+    controller.settle(ticket, 40)
+    assert controller.buckets.adjusted == [60]
+    assert controller.stats()["admitted"] == 1 and controller.stats()["queued"] == 0
+
+
+def test_queued_calls_are_admitted_in_priority_order():
+    buckets = FakeBuckets()
+    controller = AdmissionController(buckets, max_queue=10, max_wait=5)
+    admitted = []
+
+    async def call(name, priority):
+        await controller.acquire(1, priority=priority)
+        admitted.append(name)
+
+    async def run():
+        tasks = [
+            asyncio.create_task(call("batch", PRIORITY_BATCH)),
+            asyncio.create_task(call("interactive-1", PRIORITY_INTERACTIVE)),
+            asyncio.create_task(call("interactive-2", PRIORITY_INTERACTIVE)),
+        ]
+        await asyncio.sleep(0.02)
+        buckets.available = 3
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert admitted == ["interactive-1", "interactive-2", "batch"]
+    assert controller.stats()["maxQueueDepthSeen"] == 3
+
+
+def test_full_queue_sheds_batch_work_for_interactive_calls():
+    controller = AdmissionController(FakeBuckets(), max_queue=1, max_wait=5)
+
+    async def run():
+        batch = asyncio.create_task(controller.acquire(1, priority=PRIORITY_BATCH))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(controller.acquire(1, priority=PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as shed:
+            await batch
+        controller.buckets.available = 1
+        await interactive
+        return shed.value
+
+    shed = asyncio.run(run())
+    assert shed.reason == "shed"
+    assert controller.stats()["shed"] == 1
+
+
+def test_full_queue_rejects_calls_that_cannot_shed_anything():
+    controller = AdmissionController(FakeBuckets(), max_queue=1, max_wait=5)
+
+    async def run():
+        waiting = asyncio.create_task(controller.acquire(1))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire(1, priority=PRIORITY_BATCH)
+        with pytest.raises(AdmissionRejected):
+            controller.check_capacity(PRIORITY_INTERACTIVE)
+        waiting.cancel()
+        return rejected.value
+
+    assert asyncio.run(run()).reason == "queueFull"
+    assert controller.stats()["rejected"] == {"queueFull": 2}
+
+
+def test_calls_that_would_wait_too_long_are_rejected_up_front():
+    # One request per minute: the next slot is a minute away
+    controller = AdmissionController(FakeBuckets(request_rate=1 / 60), max_queue=10, max_wait=5)
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(controller.acquire(1))
+    assert rejected.value.reason == "overBudget"
+    assert rejected.value.retry_after >= 60
+
+
+def test_waiters_give_up_after_max_wait():
+    controller = AdmissionController(FakeBuckets(request_rate=100), max_queue=10, max_wait=1)
+    with pytest.raises(AdmissionRejected) as rejected:
+        asyncio.run(controller.acquire(1))
+    assert rejected.value.reason == "waitTimeout"
+    assert controller.stats()["queueDepth"] == 0
+
+
+def test_priority_defaults_to_the_calling_task():
+    buckets = FakeBuckets()
+    controller = AdmissionController(buckets, max_queue=10, max_wait=5)
+    admitted = []
+
+    async def call(name, priority):
+        llm_priority.set(priority)
+        await controller.acquire(1)
+        admitted.append(name)
+
+    async def run():
+        tasks = [asyncio.create_task(call("batch", PRIORITY_BATCH)), asyncio.create_task(call("interactive", PRIORITY_INTERACTIVE))]
+        await asyncio.sleep(0.02)
+        buckets.available = 2
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert admitted == ["interactive", "batch"]
+
+
+def test_shared_buckets_are_checked_off_the_event_loop(tmp_path):
+    store = SharedStateStore(str(tmp_path / "shared_state.db"))
+    buckets = SharedRateBuckets(store, "llm", requests_per_minute=600, tokens_per_minute=0, burst_seconds=0.1)
+    checked_on = []
+    take_from_buckets = store.take_from_buckets
+
+    def recording(*args):
+        checked_on.append(threading.current_thread())
+        return take_from_buckets(*args)
+
+    store.take_from_buckets = recording
+    controller = AdmissionController(buckets, max_queue=10, max_wait=5)
+
+    async def run():
+        # The burst allows one request; the second waits in the queue for the refill
+        await asyncio.gather(controller.acquire(1), controller.acquire(1))
+
+    try:
+        asyncio.run(run())
+    finally:
+        store.close()
+    assert controller.stats()["queued"] == 1
+    assert checked_on and threading.main_thread() not in checked_on
+
+
+def test_interactive_caller_joining_batch_work_raises_its_priority():
+    buckets = FakeBuckets()
+    controller = AdmissionController(buckets, max_queue=10, max_wait=5)
+    flight = SingleFlight("test", share_context=share_llm_priority)
+    admitted = []
+
+    async def call(name):
+        await controller.acquire(1)
+        admitted.append(name)
+        return name
+
+    async def batch_caller():
+        llm_priority.set(PRIORITY_BATCH)
+        return await flight.do("shared", lambda: call("shared"))
+
+    async def batch_only():
+        llm_priority.set(PRIORITY_BATCH)
+        return await call("other batch")
+
+    async def run():
+        other = asyncio.create_task(batch_only())
+        await asyncio.sleep(0)
+        shared = asyncio.create_task(batch_caller())
+        await asyncio.sleep(0.02)
+        # An interactive request for the same key joins the flight started by batch work
+        joined = asyncio.create_task(flight.do("shared", lambda: call("never")))
+        await asyncio.sleep(0)
+        buckets.available = 1
+        await asyncio.wait_for(joined, timeout=1)
+        buckets.available = 1
+        await asyncio.gather(other, shared)
+
+    asyncio.run(run())
+    assert admitted == ["shared", "other batch"]
@@ -0,0 +1,75 @@
+import time
+import types
+
+import pytest
+
+from services import insights_aggregator
+from services.insights_aggregator import GROWTH_WINDOW_SECONDS, InsightsAggregator
+from services.job_ingestion import PostingStore
+
+DAY = 24 * 3600
+
+
+def make_posting(number, role="data scientist", company="Acme", salary=(100000, 120000), requirements=("Python",), age=0.0):
+    return {
+        "dedupe_key": f"posting-{number}",
+        "source": "test",
+        "title": role.title(),
+        "company": company,
+        "location": "Remote",
+        "salary": f"${salary[0]} - ${salary[1]}",
+        "salary_min": salary[0],
+        "salary_max": salary[1],
+        "requirements": list(requirements),
+        "description": "",
+        "posted_date": "today",
+        "url": f"https://example.com/{number}",
+        "role": role,
+        "industry": "technology",
+        "fetched_at": time.time() - age,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PostingStore(str(tmp_path / "postings.db"))
+
+
+def test_refresh_folds_in_only_postings_added_since_the_watermark(store):
+    aggregator = InsightsAggregator(store, min_postings=2)
+    store.add_many([make_posting(i, company="Acme", requirements=("Python", "3+ years experience")) for i in range(3)])
+
+    assert aggregator.refresh() == 3
+    assert aggregator.watermark == store.max_id()
+    assert aggregator.refresh() == 0 and not aggregator.has_new_postings()
+
+    store.add_many([make_posting(i, company="Globex", salary=(140000, 160000), requirements=("SQL",)) for i in range(3, 7)])
+    assert aggregator.has_new_postings()
+    assert aggregator.refresh() == 4
+
+    insights = aggregator.role_insights("data scientist")
+    assert insights["postings"] == 7
+    assert insights["topCompanies"] == ["Globex", "Acme"]
+    assert insights["inDemandSkills"] == ["SQL", "Python"]
+    assert insights["salaryPercentiles"]["p50"] == 150000
+    assert aggregator.industry_insights("technology")["postings"] == 7
+
+
+def test_groups_below_the_minimum_have_no_insights(store):
+    aggregator = InsightsAggregator(store, min_postings=5)
+    store.add_many([make_posting(i) for i in range(4)])
+    aggregator.refresh()
+    assert aggregator.role_insights("data scientist") is None
+
+
+def test_job_growth_is_relative_to_the_time_of_the_read(store, monkeypatch):
+    aggregator = InsightsAggregator(store, min_postings=1)
+    # Two postings in the last 30 days, one in the 30 days before
+    store.add_many([make_posting(1, age=DAY), make_posting(2, age=2 * DAY), make_posting(3, age=40 * DAY)])
+    aggregator.refresh()
+    assert aggregator.role_insights("data scientist")["jobGrowth"].startswith("+100%")
+
+    # A month on with no new postings, the recent ones fall into the prior window
+    later = time.time() + GROWTH_WINDOW_SECONDS
+    monkeypatch.setattr(insights_aggregator, "time", types.SimpleNamespace(time=lambda: later))
+    assert aggregator.role_insights("data scientist")["jobGrowth"].startswith("-100%")
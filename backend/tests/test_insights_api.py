@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def counted_lookups(api, monkeypatch):
+    main, _ = api
+    titles = []
+    lookup = main.job_scraper._lookup_market_insights
+
+    async def counting(job_title):
+        titles.append(job_title)
+        return await lookup(job_title)
+
+    monkeypatch.setattr(main.job_scraper, "_lookup_market_insights", counting)
+    return titles
+
+
+def test_batch_resolves_each_distinct_title_once_in_request_order(api, counted_lookups):
+    _, client = api
+    titles = ["Software Engineer", "Data Scientist", "data  scientist", "Software Engineer"]
+
+    response = client.post("/job-insights/batch", json={"jobTitles": titles})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert list(results) == ["Software Engineer", "Data Scientist", "data  scientist"]
+    assert results["Data Scientist"] == results["data  scientist"]
+    assert counted_lookups == ["Software Engineer", "Data Scientist"]
+
+
+def test_trending_skills_batch_keys_by_industry_as_given(api):
+    _, client = api
+
+    response = client.post("/trending-skills/batch", json={"industries": ["Finance", "technology", "Finance"]})
+
+    assert response.status_code == 200
+    assert list(response.json()["results"]) == ["Finance", "technology"]
+
+
+def test_batch_over_the_configured_limit_is_rejected(api, monkeypatch):
+    main, client = api
+    monkeypatch.setattr(main, "INSIGHTS_BATCH_MAX_ITEMS", 2)
+
+    assert client.post("/job-insights/batch", json={"jobTitles": ["a", "b", "c"]}).status_code == 413
+    assert client.post("/trending-skills/batch", json={"industries": ["a", "b", "c"]}).status_code == 413
+
+
+def test_batch_over_the_model_bound_fails_validation(api):
+    main, client = api
+    titles = [f"Role {i}" for i in range(main.INSIGHTS_BATCH_ITEMS_LIMIT + 1)]
+    assert client.post("/job-insights/batch", json={"jobTitles": titles}).status_code == 422
+
+
+def test_large_batches_are_gzipped_for_clients_that_accept_it(api, monkeypatch):
+    main, client = api
+    monkeypatch.setattr(main, "COMPRESS_MIN_BYTES", 0)
+    body = {"jobTitles": ["Data Scientist"]}
+
+    compressed = client.post("/job-insights/batch", json=body, headers={"Accept-Encoding": "gzip"})
+    plain = client.post("/job-insights/batch", json=body, headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == plain.json()
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+
+def test_msgpack_is_served_when_accepted(api):
+    msgpack = pytest.importorskip("msgpack")
+    _, client = api
+
+    response = client.post(
+        "/job-insights/batch", json={"jobTitles": ["Data Scientist"]}, headers={"Accept": "application/msgpack"}
+    )
+
+    assert response.headers["content-type"] == "application/msgpack"
+    assert list(msgpack.unpackb(response.content)["results"]) == ["Data Scientist"]
+
+
+def test_msgpack_requests_fall_back_to_json_without_msgpack(api, monkeypatch):
+    main, client = api
+    monkeypatch.setattr(main, "msgpack", None)
+
+    response = client.post(
+        "/job-insights/batch", json={"jobTitles": ["Data Scientist"]}, headers={"Accept": "application/msgpack"}
+    )
+
+    assert response.headers["content-type"] == "application/json"
+    assert list(response.json()["results"]) == ["Data Scientist"]
+
+
+def test_batch_lookups_join_concurrent_single_title_lookups(scraper, monkeypatch):
+    calls = []
+
+    async def slow_lookup(job_title):
+        calls.append(job_title)
+        await asyncio.sleep(0.05)
+        return {"title": job_title}
+
+    monkeypatch.setattr(scraper, "_lookup_market_insights", slow_lookup)
+
+    async def run():
+        return await asyncio.gather(
+            scraper.get_market_insights("Data Scientist"),
+            scraper.get_market_insights_batch(["data scientist", "Data Scientist"]),
+        )
+
+    single, batch = asyncio.run(run())
+    assert calls == ["Data Scientist"]
+    assert batch == {"data scientist": single, "Data Scientist": single}
+    assert scraper.single_flight.coalesced == 1
+
+
+def test_generic_insights_are_the_same_for_the_same_title(scraper):
+    async def run():
+        return [await scraper._get_generic_insights(title) for title in ("Underwater Welder", "underwater  welder", "Beekeeper")]
+
+    first, again, other = asyncio.run(run())
+    assert first == again
+    assert first != other
+
+
+def test_unchanged_insights_are_revalidated_with_a_304(api):
+    _, client = api
+    response = client.get("/job-insights/Underwater Welder")
+    etag = response.headers["etag"]
+    assert response.status_code == 200 and client.get("/job-insights/Underwater Welder").headers["etag"] == etag
+
+    for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}', "*"):
+        revalidated = client.get("/job-insights/Underwater Welder", headers={"If-None-Match": if_none_match})
+        assert revalidated.status_code == 304, if_none_match
+        assert revalidated.headers["etag"] == etag and revalidated.content == b""
+
+    assert client.get("/job-insights/Underwater Welder", headers={"If-None-Match": '"stale"'}).status_code == 200
@@ -0,0 +1,135 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import pytest
+
+from services.job_ingestion import (
+    HostRateLimiter, IngestionPipeline, JobSource, PostingStore, RobotsPolicy, parse_postings_page
+)
+from services.role_index import RoleIndex
+from services.shared_state import SharedStateStore
+
+RESULTS_PAGE = """
+<ul>
+  <li class="job">
+    <a class="title" href="/jobs/1">Senior Data Scientist</a>
+    <span class="company">Acme</span><span class="location">Remote</span><span class="salary">$120k - $150k</span>
+    <ul><li class="req">Python</li><li class="req">SQL</li></ul>
+  </li>
+  <li class="job">
+    <a class="title" href="/jobs/2">Data Scientist</a>
+    <span class="company">Globex</span><span class="location">Remote</span><span class="salary">$60/hr</span>
+  </li>
+  <li class="job"><span class="company">No title</span></li>
+</ul>
+"""
+
+SELECTORS = {
+    "posting": "li.job",
+    "title": ".title",
+    "company": ".company",
+    "location": ".location",
+    "salary": ".salary",
+    "requirements": ".req",
+    "link": "a.title",
+}
+
+
+def mock_client(routes, requests=None):
+    def handler(request):
+        if requests is not None:
+            requests.append(str(request.url))
+        status, text = routes.get(request.url.path, (404, ""))
+        return httpx.Response(status, text=text)
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def check(policy, urls):
+    async def run():
+        return [await policy.allowed(url) for url in urls]
+    return asyncio.run(run())
+
+
+def test_robots_rules_are_fetched_once_per_host_and_applied():
+    requests = []
+    client = mock_client({"/robots.txt": (200, "User-agent: *\nDisallow: /private\n")}, requests)
+    policy = RobotsPolicy(client, "pathpilot")
+
+    urls = ["https://jobs.test/search", "https://jobs.test/private/1", "https://jobs.test/other"]
+    assert check(policy, urls) == [True, False, True]
+    assert requests == ["https://jobs.test/robots.txt"]
+
+
+@pytest.mark.parametrize("status, allowed", [(404, True), (503, False)])
+def test_missing_robots_allows_crawling_and_a_failing_one_does_not(status, allowed):
+    policy = RobotsPolicy(mock_client({"/robots.txt": (status, "")}), "pathpilot")
+    assert check(policy, ["https://jobs.test/search"]) == [allowed]
+
+
+def test_requests_to_one_host_are_spaced_out():
+    limiter = HostRateLimiter(requests_per_second=20)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*[limiter.wait("a.test") for _ in range(3)])
+        same_host = time.monotonic() - start
+        start = time.monotonic()
+        await asyncio.gather(limiter.wait("b.test"), limiter.wait("c.test"))
+        return same_host, time.monotonic() - start
+
+    same_host, other_hosts = asyncio.run(run())
+    assert same_host >= 0.09
+    assert other_hosts < 0.04
+
+
+def test_shared_schedule_spaces_requests_across_processes(tmp_path):
+    path = str(tmp_path / "shared_state.db")
+    first_store, second_store = SharedStateStore(path), SharedStateStore(path)
+    # Two limiters on one store file stand in for two worker processes
+    first, second = HostRateLimiter(20, first_store), HostRateLimiter(20, second_store)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(first.wait("a.test"), second.wait("a.test"), first.wait("a.test"))
+        return time.monotonic() - start
+
+    try:
+        assert asyncio.run(run()) >= 0.09
+    finally:
+        first_store.close()
+        second_store.close()
+
+
+def test_parse_postings_page_extracts_plain_postings():
+    postings, seconds = parse_postings_page(RESULTS_PAGE, SELECTORS, "https://jobs.test/search?page=1")
+    assert [posting["title"] for posting in postings] == ["Senior Data Scientist", "Data Scientist", ""]
+    assert postings[0]["requirements"] == ["Python", "SQL"]
+    assert postings[0]["url"] == "https://jobs.test/jobs/1"
+    assert seconds >= 0
+
+
+def test_pipeline_parses_pages_in_a_process_pool_and_stores_postings(tmp_path):
+    store = PostingStore(str(tmp_path / "postings.db"))
+    source = JobSource("test", "https://jobs.test/search?q={query}&page={page}", SELECTORS, pages=2, industry="technology")
+    executor = ProcessPoolExecutor(max_workers=1)
+    pipeline = IngestionPipeline([source], store, RoleIndex(["data scientist"]), parse_executor=executor)
+    pipeline._client = mock_client({"/robots.txt": (404, ""), "/search": (200, RESULTS_PAGE)})
+
+    async def run():
+        try:
+            return await pipeline.run("data scientist", "Remote")
+        finally:
+            await pipeline.aclose()
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+    # Both pages list the same two titled postings, so the second page's are duplicates
+    assert (report["pages"], report["postingsParsed"], report["postingsInserted"], report["duplicates"]) == (2, 4, 2, 2)
+    stored = store.search("data scientist", "Data Scientist")
+    assert sorted(posting["company"] for posting in stored) == ["Acme", "Globex"]
+    assert store.rows_since(0)[0][4:6] == (120000.0, 150000.0)
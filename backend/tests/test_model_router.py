@@ -0,0 +1,173 @@
+import asyncio
+import json
+
+import pytest
+
+from services.admission import AdmissionRejected
+from services.model_router import (
+    FAST_TIER, QUALITY_TIER, TEMPLATE_TIER, ChatModelBackend, ModelRouter, RoutingRequest, TemplateBackend
+)
+from services.prompt_builder import RoadmapPrompt
+
+PROMPT = RoadmapPrompt([{"role": "user", "content": "roadmap please"}], max_tokens=100, prompt_tokens=3, truncated=[])
+STEPS = [{"phase": "Foundations", "duration": "1 month", "skills": ["SQL"], "courses": ["Intro"], "projects": ["Report"], "description": "Basics."}]
+
+
+class FakeUsage:
+    def __init__(self, prompt_tokens, completion_tokens):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = prompt_tokens + completion_tokens
+
+
+class FakeMessage:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeChoice:
+    def __init__(self, content):
+        self.message = FakeMessage(content)
+
+
+class FakeCompletion:
+    def __init__(self, content):
+        self.choices = [FakeChoice(content)]
+        self.usage = FakeUsage(10, 20)
+
+
+class FakeLLMClient:
+    """
+    Stands in for LLMClient: each model answers after its delay, or raises its error
+    """
+
+    def __init__(self, behaviours):
+        self.behaviours = behaviours
+        self.calls = []
+        self.cancelled = []
+
+    async def create_chat_completion(self, **kwargs):
+        model = kwargs["model"]
+        self.calls.append(model)
+        delay, outcome = self.behaviours[model]
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return FakeCompletion(outcome)
+
+
+def make_router(behaviours, slos=None, templates=None):
+    client = FakeLLMClient(behaviours)
+    backends = {
+        FAST_TIER: ChatModelBackend(client, "fast-model"),
+        QUALITY_TIER: ChatModelBackend(client, "quality-model"),
+    }
+    if templates:
+        backends[TEMPLATE_TIER] = TemplateBackend(templates)
+    router = ModelRouter(backends, slos=slos or {FAST_TIER: 0.05, QUALITY_TIER: 0.05}, mode="tiered")
+    return router, client
+
+
+def simple_request(**overrides):
+    fields = dict(
+        current_role="Analyst", current_skills="Excel, SQL", dream_job="Data Scientist",
+        experience="2 years", prompt=PROMPT, additional_info=None
+    )
+    fields.update(overrides)
+    return RoutingRequest(**fields)
+
+
+def test_routes_simple_requests_to_the_fast_tier_and_complex_ones_to_quality():
+    router, _ = make_router({})
+    assert router.choose_tier(simple_request()) == FAST_TIER
+    assert router.choose_tier(simple_request(dream_job="Quantum Chef")) == QUALITY_TIER
+    assert router.choose_tier(simple_request(experience="Senior")) == QUALITY_TIER
+    assert router.stats()["complexityReasons"] == {"uncommonTarget": 1, "seniority": 1}
+
+
+def test_known_transitions_are_answered_from_templates():
+    router, client = make_router({}, templates={"analyst->data scientist": STEPS})
+    result = asyncio.run(router.complete(simple_request()))
+    assert result.tier == TEMPLATE_TIER
+    assert json.loads(result.reply.text) == {"steps": STEPS}
+    assert client.calls == []
+
+
+def test_primary_within_its_slo_is_not_hedged():
+    router, client = make_router({"fast-model": (0.0, "fast answer"), "quality-model": (0.0, "quality answer")})
+    result = asyncio.run(router.complete(simple_request()))
+    assert (result.tier, result.model, result.hedged) == (FAST_TIER, "fast-model", False)
+    assert result.reply.text == "fast answer"
+    assert result.reply.prompt_tokens == 10 and result.reply.completion_tokens == 20
+    assert client.calls == ["fast-model"]
+
+
+def test_slow_primary_is_hedged_and_the_loser_cancelled():
+    router, client = make_router({"fast-model": (5.0, "fast answer"), "quality-model": (0.0, "quality answer")})
+
+    async def run():
+        result = await router.complete(simple_request())
+        # Let the cancelled primary unwind
+        await asyncio.sleep(0)
+        return result
+
+    result = asyncio.run(run())
+    assert (result.tier, result.hedged) == (QUALITY_TIER, True)
+    assert client.calls == ["fast-model", "quality-model"]
+    assert client.cancelled == ["fast-model"]
+    stats = router.stats()
+    assert stats["hedged"] == 1 and stats["secondaryWins"] == 1
+
+
+def test_primary_answering_first_after_hedging_still_wins():
+    router, client = make_router({"fast-model": (0.1, "fast answer"), "quality-model": (5.0, "quality answer")})
+
+    async def run():
+        result = await router.complete(simple_request())
+        await asyncio.sleep(0)
+        return result
+
+    result = asyncio.run(run())
+    assert (result.tier, result.hedged) == (FAST_TIER, True)
+    assert client.cancelled == ["quality-model"]
+    assert router.stats()["secondaryWins"] == 0
+
+
+def test_failed_primary_fails_over_to_the_secondary():
+    router, client = make_router({"fast-model": (0.0, RuntimeError("upstream 500")), "quality-model": (0.0, "quality answer")})
+    result = asyncio.run(router.complete(simple_request()))
+    assert result.tier == QUALITY_TIER
+    assert result.reply.text == "quality answer"
+    assert router.stats()["failovers"] == 1
+
+
+def test_first_error_is_raised_when_every_tier_fails():
+    router, _ = make_router({"fast-model": (0.0, RuntimeError("fast down")), "quality-model": (0.0, RuntimeError("quality down"))})
+    with pytest.raises(RuntimeError, match="fast down"):
+        asyncio.run(router.complete(simple_request()))
+
+
+def test_admission_rejection_is_not_failed_over():
+    router, client = make_router({"fast-model": (0.0, AdmissionRejected("queueFull", 5)), "quality-model": (0.0, "quality answer")})
+    with pytest.raises(AdmissionRejected):
+        asyncio.run(router.complete(simple_request()))
+    assert client.calls == ["fast-model"]
+
+
+def test_single_tier_mode_never_hedges():
+    client = FakeLLMClient({"quality-model": (0.1, "quality answer")})
+    router = ModelRouter({QUALITY_TIER: ChatModelBackend(client, "quality-model")}, slos={QUALITY_TIER: 0.01}, mode="single")
+    result = asyncio.run(router.complete(simple_request()))
+    assert (result.tier, result.hedged) == (QUALITY_TIER, False)
+
+
+def test_fallbacks_are_reported_as_a_rate_of_routed_requests():
+    router, _ = make_router({"fast-model": (0.0, "fast answer")})
+    asyncio.run(router.complete(simple_request()))
+    asyncio.run(router.complete(simple_request()))
+    router.record_fallback()
+    assert router.stats()["fallbackRate"] == 0.5
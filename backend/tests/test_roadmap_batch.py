@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from models import CareerFormData, RoadmapBatchRequest, ROADMAP_BATCH_MAX_ITEMS
+from services.roadmap_batch import BatchRunner
+from services.roadmap_store import PrecomputedRoadmapStore
+
+FORM = {
+    "currentRole": "Analyst",
+    "currentSkills": "Excel",
+    "dreamJob": "Data Scientist",
+    "experience": "2 years",
+    "timeline": "1 year",
+}
+
+
+class FailingGenerator:
+    """
+    Fails the first form and blocks forever on every other one
+    """
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+
+    async def generate_roadmap(self, **kwargs):
+        self.started += 1
+        if self.started == 1:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def test_batch_request_bounds():
+    RoadmapBatchRequest(items=[FORM], concurrency=4, requestsPerMinute=60)
+    with pytest.raises(ValidationError):
+        RoadmapBatchRequest(items=[FORM] * (ROADMAP_BATCH_MAX_ITEMS + 1))
+    for bad in ({"concurrency": 0}, {"concurrency": 10000}, {"requestsPerMinute": 0}, {"requestsPerMinute": 1e9}):
+        with pytest.raises(ValidationError):
+            RoadmapBatchRequest(items=[FORM], **bad)
+
+
+def test_failed_batch_cancels_remaining_workers(tmp_path):
+    generator = FailingGenerator()
+    store = PrecomputedRoadmapStore(str(tmp_path / "precomputed.db"))
+    forms = [CareerFormData(**dict(FORM, dreamJob=f"Role {i}")) for i in range(3)]
+    runner = BatchRunner(generator, store, concurrency=3, requests_per_minute=0)
+
+    report = asyncio.run(asyncio.wait_for(runner.run(forms), timeout=5))
+
+    assert report["status"] == "failed"
+    assert generator.started == 3
+    assert generator.cancelled == 2
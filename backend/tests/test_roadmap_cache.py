@@ -0,0 +1,93 @@
+import types
+
+import pytest
+
+from models import RoadmapStep
+from services import roadmap_cache
+from services.roadmap_cache import InMemoryCacheBackend, RoadmapCache, SQLiteCacheBackend, roadmap_cache_key
+
+
+def make_steps(name):
+    return [RoadmapStep(
+        phase=name, duration="1 month", skills=["Python"], courses=["Course"], projects=["Project"], description=name
+    )]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A fake clock so TTLs and SQLite access times advance only when a test says so
+    now = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(roadmap_cache, "time", types.SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryCacheBackend(max_entries=2)
+    return SQLiteCacheBackend(str(tmp_path / "cache.db"), max_entries=2)
+
+
+def test_entries_expire_after_the_ttl(backend, clock):
+    cache = RoadmapCache(backend, ttl=60)
+    cache.set("a", make_steps("A"))
+
+    clock.value += 59
+    assert [step.phase for step in cache.get("a")] == ["A"]
+    clock.value += 2
+    assert cache.get("a") is None
+
+    assert len(backend) == 0
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(backend, clock):
+    cache = RoadmapCache(backend, ttl=60)
+    for key in ("a", "b"):
+        clock.value += 1
+        cache.set(key, make_steps(key))
+    clock.value += 1
+    cache.get("a")
+    clock.value += 1
+    cache.set("c", make_steps("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert len(backend) == 2
+    stats = cache.stats()
+    assert stats["evictions"] == 1 and stats["expirations"] == 0
+    assert (stats["hits"], stats["misses"], stats["hitRate"]) == (3, 1, 0.75)
+
+
+def key(**overrides):
+    form = dict(
+        current_role="Analyst", current_skills="Python, SQL", dream_job="Data Scientist",
+        experience="2 years", timeline="1 year"
+    )
+    form.update(overrides)
+    return roadmap_cache_key(**form)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"dream_job": "DS"},
+    {"dream_job": "  data   SCIENTIST "},
+    {"current_skills": "sql; py"},
+    {"current_skills": "SQL, Python, python3"},
+    {"experience": "3 yrs"},
+    {"experience": "Mid-level"},
+    {"timeline": "12 months"},
+    {"timeline": "14 months"},
+])
+def test_equivalent_forms_share_a_key(overrides):
+    assert key(**overrides) == key()
+
+
+@pytest.mark.parametrize("overrides", [
+    {"dream_job": "Product Manager"},
+    {"current_skills": "Python, SQL, Excel"},
+    {"experience": "6 years"},
+    {"timeline": "6 months"},
+    {"additional_info": "Prefers remote roles"},
+])
+def test_different_forms_get_different_keys(overrides):
+    assert key(**overrides) != key()
@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+
+from services.model_router import FAST_TIER, QUALITY_TIER, ModelReply, ModelRouter
+from services.roadmap_generator import RoadmapGenerator
+from services.roadmap_parser import RoadmapParser
+
+
+def make_step(index):
+    return {
+        "phase": f"Phase {index}",
+        "duration": "1 month",
+        "skills": ["SQL", "Python"],
+        "courses": ["Intro course"],
+        "projects": ["Portfolio project"],
+        "description": f"Work through phase {index}.",
+    }
+
+
+FULL_REPLY = json.dumps({"steps": [make_step(i) for i in range(1, 5)]})
+PARTIAL_REPLY = json.dumps({"steps": [make_step(1)]})
+
+
+def test_parses_fenced_json_with_surrounding_prose():
+    parsed = RoadmapParser(expected_phases=4).parse(f"Here is the plan:\n```json\n{FULL_REPLY}\n```\nGood luck!")
+    assert [step.phase for step in parsed.steps] == ["Phase 1", "Phase 2", "Phase 3", "Phase 4"]
+    assert parsed.score == 1.0 and parsed.repairs == []
+
+
+def test_repairs_truncated_output_up_to_the_last_complete_step():
+    parsed = RoadmapParser(expected_phases=4).parse(FULL_REPLY[:FULL_REPLY.index("Phase 3") + 20])
+    assert [step.phase for step in parsed.steps] == ["Phase 1", "Phase 2"]
+    assert "truncated" in parsed.repairs
+    assert not parsed.acceptable(0.75)
+
+
+def test_accepts_other_phase_list_keys_and_trailing_commas():
+    text = '{"roadmap": {"phases": [' + json.dumps(make_step(1)) + ',]}}'
+    parsed = RoadmapParser(expected_phases=1).parse(text)
+    assert [step.phase for step in parsed.steps] == ["Phase 1"]
+
+
+def test_scores_missing_output_as_zero():
+    parsed = RoadmapParser(expected_phases=4).parse("Sorry, I cannot help with that.")
+    assert parsed.steps == [] and parsed.score == 0.0 and "noJson" in parsed.repairs
+
+
+class ScriptedBackend:
+    """
+    Replies with the next scripted text (or raises it) on each call
+    """
+
+    def __init__(self, model, replies):
+        self.model = model
+        self.replies = list(replies)
+        self.calls = 0
+
+    async def complete(self, request):
+        self.calls += 1
+        reply = self.replies.pop(0)
+        if isinstance(reply, BaseException):
+            raise reply
+        return ModelReply(reply, 100, 200)
+
+    async def stream(self, request):
+        reply = (await self.complete(request)).text
+        for start in range(0, len(reply), 16):
+            yield reply[start:start + 16]
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.setenv("ROADMAP_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("PRECOMPUTED_ROADMAPS_PATH", str(tmp_path / "precomputed.db"))
+    monkeypatch.setenv("ROADMAP_PHASES", "4")
+    monkeypatch.setenv("ROADMAP_PARSE_RETRIES", "1")
+    return RoadmapGenerator()
+
+
+def route_to(generator, fast_replies, quality_replies=()):
+    fast = ScriptedBackend("fast-model", fast_replies)
+    quality = ScriptedBackend("quality-model", quality_replies)
+    generator.router = ModelRouter({FAST_TIER: fast, QUALITY_TIER: quality}, slos={FAST_TIER: 5, QUALITY_TIER: 5}, mode="tiered")
+    return fast, quality
+
+
+def generate(generator, dream_job="Data Scientist"):
+    return asyncio.run(generator.generate_roadmap("Analyst", "Excel, SQL", dream_job, "2 years", "1 year"))
+
+
+def test_incomplete_reply_is_retried_and_the_better_one_served(generator):
+    fast, _ = route_to(generator, [PARTIAL_REPLY, FULL_REPLY])
+    result = generate(generator)
+    assert fast.calls == 2
+    assert result["source"] == "llm" and not result["degraded"]
+    assert len(result["steps"]) == 4
+    assert result["usage"] == {"prompt_tokens": 200, "completion_tokens": 400}
+    # Acceptable roadmaps are cached
+    assert generate(generator)["source"] == "cache"
+
+
+def test_still_incomplete_after_retries_is_topped_up_and_not_cached(generator):
+    fast, _ = route_to(generator, [PARTIAL_REPLY, "not json at all", PARTIAL_REPLY, PARTIAL_REPLY])
+    result = generate(generator)
+    assert fast.calls == 2
+    assert result["degraded"] and result["parseScore"] == 0.25
+    assert [step.phase for step in result["steps"]][0] == "Phase 1"
+    assert len(result["steps"]) == 4
+    assert generate(generator)["source"] == "llm"
+
+
+def test_failed_fast_tier_escalates_to_quality(generator):
+    fast, quality = route_to(generator, [RuntimeError("fast down")], [FULL_REPLY])
+    result = generate(generator)
+    assert (fast.calls, quality.calls) == (1, 1)
+    assert result["tier"] == QUALITY_TIER and result["model"] == "quality-model"
+    assert generator.router.stats()["failovers"] == 1
+
+
+def test_every_tier_failing_serves_the_fallback_roadmap(generator):
+    route_to(generator, [RuntimeError("fast down")], [RuntimeError("quality down")])
+    result = generate(generator)
+    assert result["source"] == "fallback"
+    assert generator.router.stats()["fallbacks"] == 1
+
+
+def stream(generator):
+    async def collect():
+        return [step async for step in generator.stream_roadmap("Analyst", "Excel, SQL", "Data Scientist", "2 years", "1 year")]
+    return asyncio.run(collect())
+
+
+def test_stream_drops_sparse_steps_and_stops_at_the_expected_phases(generator):
+    sparse = {"phase": "Sparse", "duration": "", "skills": [], "courses": [], "projects": [], "description": ""}
+    reply = json.dumps({"steps": [make_step(1), sparse] + [make_step(i) for i in range(2, 7)]})
+    route_to(generator, [reply])
+    steps = stream(generator)
+    assert [step.phase for step in steps] == ["Phase 1", "Phase 2", "Phase 3", "Phase 4"]
+    assert generator.router.stats()["fallbacks"] == 0
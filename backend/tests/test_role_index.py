@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from services.job_ingestion import JobSource
+from services.role_index import RoleIndex
+
+KNOWN_ROLES = ["software engineer", "data scientist", "product manager", "ux designer", "devops engineer", "cybersecurity analyst"]
+
+
+@pytest.mark.parametrize("title, role", [
+    ("Software Engineer", "software engineer"),
+    ("Software Developer", "software engineer"),
+    ("Sr. SWE", "software engineer"),
+    ("Senior Software Engineer Backend", "software engineer"),
+    ("Senior Data Scientist", "data scientist"),
+    ("Technical Product Manager", "product manager"),
+    ("Lead UX Designer", "ux designer"),
+    ("SRE", "devops engineer"),
+    ("Cybersecurity Analyst II", "cybersecurity analyst"),
+    ("Backend Engineer", "software engineer"),
+    ("Senior Backend Engineer", "software engineer"),
+    ("Frontend Developer", "software engineer"),
+    ("Data Engineer", "software engineer"),
+    ("Cybersecurity", "cybersecurity analyst"),
+    ("data", "data scientist"),
+    ("Product", "product manager"),
+])
+def test_resolves_variants_of_known_roles(title, role):
+    assert RoleIndex(KNOWN_ROLES).best_match(title) == role
+
+
+@pytest.mark.parametrize("title", [
+    "Security Engineer",
+    "Sales Manager",
+    "ML Engineer",
+    "Business Analyst",
+    "Product Designer",
+    "Data Analyst",
+    "Engineer",
+    "Analyst",
+])
+def test_titles_sharing_only_a_generic_token_do_not_match(title):
+    assert RoleIndex(KNOWN_ROLES).best_match(title) is None
+
+
+def test_ties_do_not_depend_on_title_length():
+    index = RoleIndex(["devops engineer", "software engineer"])
+    assert [title for title, _ in index.search("engineer", 2)] == ["devops engineer", "software engineer"]
+
+    # Sharing more tokens wins over a shorter title with the same score
+    index = RoleIndex(["cloud engineer", "cloud platform engineer"])
+    assert index.search("cloud platform engineer lead")[0][0] == "cloud platform engineer"
+
+
+def test_unmatched_titles_get_generic_insights(scraper):
+    for title in ("Security Engineer", "ML Engineer", "Data Analyst", "Business Analyst"):
+        insights = asyncio.run(scraper.get_market_insights(title))
+        assert insights != scraper.mock_job_data["devops engineer"], title
+        assert insights != scraper.mock_job_data["data scientist"], title
+        assert insights != scraper.mock_job_data["cybersecurity analyst"], title
+
+
+@pytest.mark.parametrize("title, role", [
+    ("Senior Data Scientist", "data scientist"),
+    ("Cybersecurity", "cybersecurity analyst"),
+    ("data", "data scientist"),
+    ("Backend Engineer", "software engineer"),
+    ("Data Engineer", "software engineer"),
+])
+def test_known_titles_get_their_role_insights(scraper, title, role):
+    insights = asyncio.run(scraper.get_market_insights(title))
+    assert insights == scraper.mock_job_data[role]
+
+
+@pytest.mark.parametrize("posted, searched", [
+    ("Senior Backend Engineer", "Backend Engineer"),
+    ("Senior Data Scientist", "Data Scientist"),
+    ("ML Engineer II", "ML Engineer"),
+])
+def test_postings_are_read_under_the_role_they_were_stored_under(scraper, posted, searched):
+    raw = {
+        "title": posted, "company": "Acme", "location": "Remote", "salary": "$100k - $120k",
+        "requirements": [], "description": "", "posted_date": "today", "url": "https://example.com/1",
+    }
+    scraper.posting_store.add_many([scraper.ingestion._normalize(raw, JobSource("test", "https://example.com", {}))])
+
+    postings = asyncio.run(scraper.scrape_job_postings(searched))
+    assert [posting["title"] for posting in postings] == [posted]
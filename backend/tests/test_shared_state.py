@@ -0,0 +1,161 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.shared_state import LeaseCoordinator, SharedStateStore
+
+
+def returning(value):
+    async def lookup():
+        return value() if callable(value) else value
+    return lookup
+
+
+@pytest.fixture
+def stores(tmp_path):
+    # Two stores on one file stand in for two worker processes
+    path = str(tmp_path / "shared_state.db")
+    first, second = SharedStateStore(path), SharedStateStore(path)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_operations_run_off_the_event_loop(stores):
+    store, _ = stores
+
+    async def run():
+        loop_thread = threading.current_thread()
+        threads = []
+
+        def operation():
+            threads.append(threading.current_thread())
+            return store.try_acquire("key", 10)
+
+        assert await store.run(operation)
+        await store.run(store.put_json, "doc", {"done": True})
+        return loop_thread, threads, await store.run(store.get_json, "doc")
+
+    loop_thread, threads, document = asyncio.run(run())
+    assert threads and threads[0] is not loop_thread
+    assert document == {"done": True}
+
+
+def test_followers_wait_for_the_leaders_result(stores):
+    leader_store, follower_store = stores
+    results = {}
+    leader = LeaseCoordinator(leader_store, "test", ttl=10, poll_interval=0.01)
+    follower = LeaseCoordinator(follower_store, "test", ttl=10, poll_interval=0.01)
+
+    async def produce():
+        await asyncio.sleep(0.05)
+        results["key"] = "generated"
+        return "generated"
+
+    async def never():
+        raise AssertionError("the follower should not generate")
+
+    async def run():
+        first = asyncio.create_task(leader.do("key", produce, returning(lambda: results.get("key"))))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(first, follower.do("key", never, returning(lambda: results.get("key"))))
+
+    assert asyncio.run(run()) == ["generated", "generated"]
+    assert leader.leader_calls == 1 and follower.follower_hits == 1
+
+
+def test_lease_is_renewed_while_slow_work_runs(stores):
+    leader_store, follower_store = stores
+    leader = LeaseCoordinator(leader_store, "test", ttl=0.1, poll_interval=0.01)
+    follower = LeaseCoordinator(follower_store, "test", ttl=0.1, poll_interval=0.01)
+    generated = []
+
+    async def slow():
+        # Several TTLs long: without renewal the follower would take over and generate too
+        await asyncio.sleep(0.4)
+        generated.append("leader")
+        return "leader"
+
+    async def duplicate():
+        generated.append("follower")
+        return "follower"
+
+    async def run():
+        first = asyncio.create_task(leader.do("key", slow, returning(None)))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(follower.do("key", duplicate, returning(lambda: "leader" if generated else None)))
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(run()) == ["leader", "leader"]
+    assert generated == ["leader"]
+    assert leader.renewals >= 2 and follower.takeovers == 0
+
+
+def test_released_lease_is_taken_over(stores):
+    first_store, second_store = stores
+    first = LeaseCoordinator(first_store, "test", ttl=10, poll_interval=0.01)
+    second = LeaseCoordinator(second_store, "test", ttl=10, poll_interval=0.01)
+
+    async def failing():
+        await asyncio.sleep(0.03)
+        raise RuntimeError("generation failed")
+
+    async def succeeding():
+        return "second"
+
+    async def run():
+        task = asyncio.create_task(first.do("key", failing, returning(None)))
+        await asyncio.sleep(0.01)
+        result = await second.do("key", succeeding, returning(None))
+        with pytest.raises(RuntimeError):
+            await task
+        return result
+
+    assert asyncio.run(run()) == "second"
+    assert second.takeovers == 1
+
+
+def test_followers_return_the_leaders_uncached_outcome(stores):
+    leader_store, follower_store = stores
+    leader = LeaseCoordinator(leader_store, "test", ttl=10, poll_interval=0.01)
+    follower = LeaseCoordinator(follower_store, "test", ttl=10, poll_interval=0.01)
+
+    async def fallback():
+        # Nothing reaches the cache, so lookup keeps returning None
+        await asyncio.sleep(0.05)
+        return {"source": "fallback"}
+
+    async def never():
+        raise AssertionError("the follower should not regenerate")
+
+    def share(result):
+        return result if result["source"] == "fallback" else None
+
+    async def run():
+        first = asyncio.create_task(leader.do("key", fallback, returning(None), share=share))
+        await asyncio.sleep(0.01)
+        return await asyncio.gather(first, follower.do("key", never, returning(None), share=share))
+
+    assert asyncio.run(run()) == [{"source": "fallback"}, {"source": "fallback"}]
+    assert leader.leader_calls == 1 and follower.shared_outcomes == 1 and follower.takeovers == 0
+
+
+def test_outcomes_from_earlier_generations_are_ignored(stores):
+    holder_store, waiter_store = stores
+    waiter = LeaseCoordinator(waiter_store, "test", ttl=10, poll_interval=0.01)
+    holder_store.put_json("outcome:test:key", {"source": "fallback"})
+    holder_store.try_acquire("test:key", 10)
+
+    async def fresh():
+        return {"source": "llm"}
+
+    async def run():
+        task = asyncio.create_task(waiter.do("key", fresh, returning(None)))
+        await asyncio.sleep(0.03)
+        # The holder dies without a result; the outcome it published earlier must not be served
+        await holder_store.run(holder_store.release, "test:key")
+        return await task
+
+    assert asyncio.run(run()) == {"source": "llm"}
+    assert waiter.shared_outcomes == 0 and waiter.takeovers == 1
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+class Upstream:
+    def __init__(self, delay=0.02, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def fetch(self):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return {"value": self.calls}
+
+
+def test_concurrent_calls_share_one_execution():
+    flight, upstream = SingleFlight("test"), Upstream()
+
+    async def run():
+        return await asyncio.gather(*(flight.do("key", upstream.fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert results == [{"value": 1}] * 5
+    assert upstream.calls == 1
+    assert flight.stats() == {"calls": 5, "upstreamCalls": 1, "upstreamCallsSaved": 4, "abandoned": 0, "inFlight": 0}
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flight, upstream = SingleFlight("test"), Upstream(delay=0)
+
+    async def run():
+        await asyncio.gather(flight.do("a", upstream.fetch), flight.do("b", upstream.fetch))
+        await flight.do("a", upstream.fetch)
+
+    asyncio.run(run())
+    assert upstream.calls == 3
+
+
+def test_one_cancelled_caller_does_not_cancel_the_others():
+    flight, upstream = SingleFlight("test"), Upstream(delay=0.05)
+
+    async def run():
+        first = asyncio.create_task(flight.do("key", upstream.fetch))
+        second = asyncio.create_task(flight.do("key", upstream.fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == {"value": 1}
+    assert not upstream.cancelled
+    assert flight.stats()["abandoned"] == 0
+
+
+def test_work_is_cancelled_once_every_caller_has_gone():
+    flight, upstream = SingleFlight("test"), Upstream(delay=5)
+
+    async def run():
+        callers = [asyncio.create_task(flight.do("key", upstream.fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert upstream.cancelled
+    assert flight.stats()["abandoned"] == 1 and flight.stats()["inFlight"] == 0
+
+
+def test_errors_reach_every_caller_and_are_not_remembered():
+    flight, upstream = SingleFlight("test"), Upstream(error=RuntimeError("upstream down"))
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("key", upstream.fetch) for _ in range(3)), return_exceptions=True)
+        upstream.error = None
+        return results, await flight.do("key", upstream.fetch)
+
+    results, retried = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == {"value": 2}
+    assert upstream.calls == 2
+
+
+def test_cancelling_a_caller_propagates_to_it():
+    flight, upstream = SingleFlight("test"), Upstream(delay=5)
+
+    async def run():
+        caller = asyncio.create_task(flight.do("key", upstream.fetch))
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        await caller
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(run())
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from services.roadmap_generator import RoadmapGenerator
+from services.skill_gap import SkillGapAnalyzer
+
+
+@pytest.fixture
+def generator(scraper, tmp_path, monkeypatch):
+    monkeypatch.setenv("ROADMAP_CACHE_BACKEND", "memory")
+    monkeypatch.setenv("PRECOMPUTED_ROADMAPS_PATH", str(tmp_path / "precomputed.db"))
+    return RoadmapGenerator(target_skills=scraper.in_demand_skills)
+
+
+def prompt_text(generator, dream_job, current_skills="Python, SQL"):
+    async def build():
+        skill_gap = await generator._analyze_skill_gap(current_skills, dream_job)
+        return generator._create_roadmap_prompt("Analyst", current_skills, dream_job, "2 years", "1 year", None, skill_gap)
+
+    return "\n".join(message["content"] for message in asyncio.run(build()).messages)
+
+
+def test_covered_and_missing_skills():
+    gap = SkillGapAnalyzer().analyze("Python programming, data analytics, Java", ["Python", "Data Analysis", "JavaScript", "Machine Learning"])
+    assert [target for target, _, _ in gap.covered] == ["Python", "Data Analysis"]
+    assert gap.missing == ["JavaScript", "Machine Learning"]
+    assert gap.coverage == 0.5
+
+
+@pytest.mark.parametrize("title, role", [
+    ("Data Scientist", "data scientist"),
+    ("Senior Data Scientist", "data scientist"),
+    ("Software Developer", "software engineer"),
+    ("Sr. SWE", "software engineer"),
+    ("Technical Product Manager", "product manager"),
+    ("SRE", "devops engineer"),
+    ("Backend Engineer", "software engineer"),
+    ("Data Engineer", "software engineer"),
+    ("Cybersecurity", "cybersecurity analyst"),
+])
+def test_target_skills_come_from_the_matched_role(scraper, title, role):
+    assert asyncio.run(scraper.in_demand_skills(title)) == scraper.mock_job_data[role]["inDemandSkills"]
+
+
+@pytest.mark.parametrize("title", ["ML Engineer", "Security Engineer", "Data Analyst", "Business Analyst", "Sales Manager"])
+def test_no_target_skills_without_a_confident_match(scraper, title):
+    assert asyncio.run(scraper.in_demand_skills(title)) == []
+
+
+def test_prompt_names_the_gap_for_a_known_role(generator, scraper):
+    text = prompt_text(generator, "Senior Data Scientist")
+    assert "Skill gap to close:" in text
+    missing = text.split("Skill gap to close:")[1].splitlines()[0]
+    assert all(skill in scraper.mock_job_data["data scientist"]["inDemandSkills"] for skill in missing.strip().split(", "))
+
+
+def test_prompt_has_no_gap_section_for_an_unmatched_role(generator, scraper):
+    text = prompt_text(generator, "ML Engineer")
+    assert "Skill gap to close:" not in text
+    for skill in scraper.mock_job_data["devops engineer"]["inDemandSkills"]:
+        assert skill not in text
@@ -0,0 +1,107 @@
+import asyncio
+import json
+
+from services.llm_client import LLMClient
+from services.stream_parser import IncrementalStepParser
+
+STEP = {
+    "phase": "Foundations",
+    "duration": "1 month",
+    "skills": ["Python", "SQL {joins}"],
+    "courses": ["Intro \"quoted\""],
+    "projects": ["Notebook [draft]"],
+    "description": "Learn the basics.",
+}
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalStepParser()
+    steps = []
+    for start in range(0, len(text), size):
+        steps.extend(parser.feed(text[start:start + size]))
+    return parser, steps
+
+
+def test_yields_each_step_once_for_any_chunk_size():
+    text = "Here you go:\n```json\n" + json.dumps({"steps": [STEP, dict(STEP, phase="Advanced")]}) + "\n```"
+    for size in (1, 3, 16, len(text)):
+        parser, steps = feed_in_chunks(text, size)
+        assert [step["phase"] for step in steps] == ["Foundations", "Advanced"]
+        assert steps[0] == STEP
+        assert parser.buffer == text
+
+
+def test_accepts_the_same_phase_keys_as_the_full_parser():
+    for document in ({"phases": [STEP]}, {"roadmap": [STEP]}, {"roadmap": {"steps": [STEP]}}):
+        _, steps = feed_in_chunks(json.dumps(document), 7)
+        assert steps == [STEP], document
+
+
+def test_ignores_arrays_under_other_keys():
+    document = {"notes": [{"phase": "not a step"}], "meta": {"steps": [STEP]}, "steps": [STEP]}
+    _, steps = feed_in_chunks(json.dumps(document), 5)
+    assert steps == [STEP]
+
+
+def test_scan_window_is_bounded_by_the_open_step():
+    parser = IncrementalStepParser()
+    parser.feed('{"steps": [')
+    for _ in range(200):
+        assert parser.feed(json.dumps(STEP) + ", ") == [STEP]
+        assert len(parser._window) < len(json.dumps(STEP)) + 10
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(0)
+            yield chunk
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def create(self, stream=False, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0)
+        self.active -= 1
+        return FakeStream(["a", "b"]) if stream else "done"
+
+
+class FakeOpenAI:
+    def __init__(self):
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = FakeCompletions()
+
+
+def test_stream_holds_its_concurrency_slot_until_consumed():
+    async def scenario():
+        llm = LLMClient(api_key="test", max_concurrency=1, max_retries=0)
+        llm._client = FakeOpenAI()
+        stream = await llm.create_chat_completion(model="m", messages=[], stream=True)
+
+        waiting = asyncio.create_task(llm.create_chat_completion(model="m", messages=[]))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        assert [chunk async for chunk in stream] == ["a", "b"]
+        assert await asyncio.wait_for(waiting, 1) == "done"
+
+    asyncio.run(scenario())
+
+
+def test_closing_a_stream_early_releases_its_slot():
+    async def scenario():
+        llm = LLMClient(api_key="test", max_concurrency=1, max_retries=0)
+        llm._client = FakeOpenAI()
+        stream = await llm.create_chat_completion(model="m", messages=[], stream=True)
+        await stream.aclose()
+        assert await asyncio.wait_for(llm.create_chat_completion(model="m", messages=[]), 1) == "done"
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+import pytest
+
+from models import RoadmapStep
+
+FORM = {
+    "currentRole": "Analyst",
+    "currentSkills": "Excel",
+    "dreamJob": "Data Scientist",
+    "experience": "2 years",
+    "timeline": "1 year",
+}
+
+
+def make_step(index, skills):
+    return {
+        "phase": f"Phase {index}",
+        "duration": "1 month",
+        "skills": skills,
+        "courses": ["Course"],
+        "projects": ["Project"],
+        "description": f"Phase {index}.",
+    }
+
+
+STEPS = [make_step(1, ["Python"]), make_step(2, ["SQL"]), make_step(3, ["Statistics"]), make_step(4, ["Machine Learning"])]
+
+
+@pytest.fixture
+def saved_roadmap(api, monkeypatch):
+    main, client = api
+
+    async def generate_roadmap(**kwargs):
+        return {"steps": STEPS, "source": "llm"}
+
+    monkeypatch.setattr(main.roadmap_generator, "generate_roadmap", generate_roadmap)
+    response = client.post("/users/u1/roadmaps", json=FORM)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def regenerating(replace):
+    async def regenerate_phases(**kwargs):
+        return {"replaced": {phase: RoadmapStep.model_validate(make_step(phase + 1, ["New"])) for phase in kwargs["phases"] if phase in replace}}
+    return regenerate_phases
+
+
+def test_skills_are_saved_when_every_affected_phase_is_regenerated(api, saved_roadmap, monkeypatch):
+    main, client = api
+    monkeypatch.setattr(main.roadmap_generator, "regenerate_phases", regenerating({0, 1}))
+
+    response = client.patch(f"/users/u1/roadmaps/{saved_roadmap}/skills", json={"currentSkills": "Excel, Python, SQL"})
+
+    assert response.status_code == 200
+    assert response.json()["form"]["currentSkills"] == "Excel, Python, SQL"
+    assert [step["skills"] for step in response.json()["steps"][:2]] == [["New"], ["New"]]
+
+
+@pytest.mark.parametrize("replace", [set(), {0}])
+def test_incomplete_regeneration_saves_nothing(api, saved_roadmap, monkeypatch, replace):
+    main, client = api
+    monkeypatch.setattr(main.roadmap_generator, "regenerate_phases", regenerating(replace))
+
+    response = client.patch(f"/users/u1/roadmaps/{saved_roadmap}/skills", json={"currentSkills": "Excel, Python, SQL"})
+
+    assert response.status_code == 502
+    stored = client.get(f"/users/u1/roadmaps/{saved_roadmap}").json()
+    assert stored["form"]["currentSkills"] == "Excel"
+    assert [step["skills"] for step in stored["steps"]] == [step["skills"] for step in STEPS]
+
+
+@pytest.mark.parametrize("result", [
+    {"steps": STEPS, "source": "fallback"},
+    {"steps": STEPS, "source": "llm", "degraded": True},
+])
+def test_fallback_or_degraded_roadmaps_are_not_saved(api, monkeypatch, result):
+    main, client = api
+
+    async def generate_roadmap(**kwargs):
+        return result
+
+    monkeypatch.setattr(main.roadmap_generator, "generate_roadmap", generate_roadmap)
+    before = client.get("/users/u2/roadmaps").json()
+
+    response = client.post("/users/u2/roadmaps", json=FORM)
+
+    assert response.status_code == 502
+    assert client.get("/users/u2/roadmaps").json() == before == []